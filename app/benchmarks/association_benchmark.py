@@ -0,0 +1,94 @@
+"""Association graph queries on a synthetic population of a million criminals.
+
+Builds mvc.models.association_graph.AssociationGraph from generated memberships (gangs of
+skewed sizes, birthplaces and residences over 20k cities, two million crimes), then times
+k-hop neighbourhoods, shortest paths and connected components between random criminals,
+and an incremental update of a few criminals followed by the same queries.
+
+Run from the app directory: python -m benchmarks.association_benchmark
+"""
+import statistics
+import time
+
+import numpy as np
+
+from mvc.models.association_graph import AssociationGraph
+from mvc.models.associations import (
+    ALL_RELATIONS, RELATION_BIRTHPLACE, RELATION_CRIME, RELATION_GANG, RELATION_RESIDENCE
+)
+
+CRIMINALS = 1_000_000
+GANGS = 5_000
+CITIES = 20_000
+CRIMES = 2_000_000
+LOCATIONS = 50_000
+DAYS = 3_650
+QUERIES = 20
+
+def make_rows(rng):
+    ids = np.arange(1, CRIMINALS + 1)
+    in_gang = ids[rng.random(CRIMINALS) < 0.3]
+    crime_criminals = rng.integers(1, CRIMINALS + 1, CRIMES)
+
+    parts = [
+        (ids, np.zeros(CRIMINALS), np.zeros(CRIMINALS), np.zeros(CRIMINALS)),
+        (in_gang, np.full(len(in_gang), RELATION_GANG), rng.zipf(1.5, len(in_gang)) % GANGS + 1, np.zeros(len(in_gang))),
+        (ids, np.full(CRIMINALS, RELATION_BIRTHPLACE), rng.integers(1, CITIES + 1, CRIMINALS), np.zeros(CRIMINALS)),
+        (ids, np.full(CRIMINALS, RELATION_RESIDENCE), rng.integers(1, CITIES + 1, CRIMINALS), np.zeros(CRIMINALS)),
+        (crime_criminals, np.full(CRIMES, RELATION_CRIME), rng.integers(1, LOCATIONS + 1, CRIMES), rng.integers(15_000, 15_000 + DAYS, CRIMES))
+    ]
+    return np.concatenate([np.column_stack(part) for part in parts]).astype(np.int64)
+
+def median_ms(function, arguments):
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        function(*argument)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def run_queries(graph, rng):
+    pairs = rng.integers(1, CRIMINALS + 1, (QUERIES, 2)).tolist()
+    results = {}
+    for hops in (1, 2):
+        results[f"{hops}-hop, gang and crimes"] = median_ms(
+            lambda a, b: graph.neighbourhood(a, hops, RELATION_GANG | RELATION_CRIME), pairs
+        )
+    results["2-hop, all relations"] = median_ms(lambda a, b: graph.neighbourhood(a, 2, ALL_RELATIONS), pairs)
+    results["path, crimes only"] = median_ms(lambda a, b: graph.shortest_path(a, b, RELATION_CRIME), pairs)
+    results["path, all relations"] = median_ms(lambda a, b: graph.shortest_path(a, b), pairs)
+    results["component, gang and crimes"] = median_ms(
+        lambda a, b: graph.component(a, RELATION_GANG | RELATION_CRIME), pairs[:5]
+    )
+    return results
+
+def main():
+    rng = np.random.default_rng(42)
+    rows = make_rows(rng)
+
+    start = time.perf_counter()
+    graph = AssociationGraph.from_rows([rows])
+    print(f"build: {graph.node_count} criminals, {graph.membership_count} memberships, "
+          f"{time.perf_counter() - start:.2f} s")
+
+    base = run_queries(graph, np.random.default_rng(1))
+
+    changed = rng.integers(1, CRIMINALS + 1, 50).tolist()
+    update_rows = rows[np.isin(rows[:, 0], changed)].copy()
+    # Everyone changed moves to another city of residence
+    moved = update_rows[:, 1] == RELATION_RESIDENCE
+    update_rows[moved, 2] = rng.integers(1, CITIES + 1, int(moved.sum()))
+
+    start = time.perf_counter()
+    graph.update_criminals(changed, update_rows)
+    print(f"update of {len(changed)} criminals: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    updated = run_queries(graph, np.random.default_rng(1))
+
+    print(f"median of {QUERIES} queries")
+    print(f"{'':<28} {'ms':>8} {'updated ms':>11}")
+    for name in base:
+        print(f"{name:<28} {base[name]:8.1f} {updated[name]:11.1f}")
+
+if __name__ == "__main__":
+    main()
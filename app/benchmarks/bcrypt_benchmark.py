@@ -0,0 +1,58 @@
+"""bcrypt hash and verify time per work factor on this machine.
+
+Every login verifies one hash and every registration or password change creates one, so
+the cost should be as high as users will tolerate waiting. Prints the highest cost whose
+verification stays under the target latency; set it as BCRYPT_ROUNDS in .env. Users
+whose stored hash has another cost are rehashed on their next successful login.
+
+Run from the app directory: python -m benchmarks.bcrypt_benchmark [target ms, default 250]
+"""
+import statistics
+import sys
+import time
+
+import bcrypt
+
+from mvc.models.users import DEFAULT_BCRYPT_ROUNDS
+
+ROUNDS = range(10, 16)
+REPEATS = 3
+PASSWORD = "correct horse battery staple".encode("utf-8")
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def measure(rounds):
+    """Median (hash seconds, verify seconds) for one work factor."""
+    hash_times, verify_times = [], []
+    for _ in range(REPEATS):
+        hash_time, hashed = timed(bcrypt.hashpw, PASSWORD, bcrypt.gensalt(rounds=rounds))
+        verify_time, _ = timed(bcrypt.checkpw, PASSWORD, hashed)
+        hash_times.append(hash_time)
+        verify_times.append(verify_time)
+    return statistics.median(hash_times), statistics.median(verify_times)
+
+def main():
+    target = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.25
+    print(f"{'rounds':>6} {'hash ms':>8} {'verify ms':>10}")
+
+    recommended = None
+    for rounds in ROUNDS:
+        hash_time, verify_time = measure(rounds)
+        print(f"{rounds:>6} {hash_time * 1000:8.0f} {verify_time * 1000:10.0f}")
+        if verify_time <= target:
+            recommended = rounds
+        else:
+            # Each extra round doubles the time, so no higher cost can meet the target
+            break
+
+    print()
+    if recommended is None:
+        print(f"No cost in {ROUNDS.start}-{ROUNDS.stop - 1} verifies within {target * 1000:.0f} ms")
+    else:
+        print(f"BCRYPT_ROUNDS={recommended} (target {target * 1000:.0f} ms, default {DEFAULT_BCRYPT_ROUNDS})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Rows read, markers drawn, build time and page payload of the dashboard crime map.
+
+The map is drawn from per-city and per-country counts (CityModel.get_city_counts and
+get_country_counts), one marker per city however many crimes there are. Compares that,
+for 1M synthetic crimes spread over 30k cities, with reading one row per crime and either
+plotting every crime as a point or counting them per city in Python first.
+
+Run from the app directory: python -m benchmarks.crime_map_benchmark
+"""
+import json
+import time
+
+import numpy as np
+from bokeh.embed import json_item
+from bokeh.plotting import figure
+
+from mvc.views.dashboard.bokeh_dashboard import CriminalDashboard
+
+CRIMES = 1_000_000
+CITIES = 30_000
+COUNTRIES = 40
+
+def make_counts():
+    rng = np.random.default_rng(42)
+    latitudes = rng.uniform(35, 70, CITIES)
+    longitudes = rng.uniform(-10, 40, CITIES)
+    countries = rng.integers(0, COUNTRIES, CITIES)
+    # A few large cities hold most of the crimes
+    weights = rng.zipf(1.5, CITIES).astype(np.float64)
+    crime_cities = rng.choice(CITIES, CRIMES, p=weights / weights.sum())
+    metrics = {
+        "crimes": np.bincount(crime_cities, minlength=CITIES),
+        "births": rng.integers(0, 50, CITIES),
+        "residents": rng.integers(0, 50, CITIES),
+        "gangs": rng.integers(0, 3, CITIES)
+    }
+
+    cities = [
+        {"id": city, "name": f"Місто {city}", "country": f"Країна {countries[city]}",
+         "latitude": float(latitudes[city]), "longitude": float(longitudes[city]),
+         **{metric: int(values[city]) for metric, values in metrics.items()}}
+        for city in range(CITIES)
+    ]
+
+    # Country_counts: sums of the city rows, at the mean position of the cities
+    cities_per_country = np.bincount(countries, minlength=COUNTRIES)
+    country_latitudes = np.bincount(countries, weights=latitudes, minlength=COUNTRIES) / cities_per_country
+    country_longitudes = np.bincount(countries, weights=longitudes, minlength=COUNTRIES) / cities_per_country
+    country_totals = {metric: np.bincount(countries, weights=values, minlength=COUNTRIES)
+                      for metric, values in metrics.items()}
+    country_rows = [
+        {"id": country, "name": f"Країна {country}",
+         "latitude": float(country_latitudes[country]), "longitude": float(country_longitudes[country]),
+         **{metric: int(totals[country]) for metric, totals in country_totals.items()}}
+        for country in range(COUNTRIES)
+    ]
+    return {"cities": cities, "countries": country_rows}, latitudes[crime_cities], longitudes[crime_cities]
+
+def raw_points_item(latitudes, longitudes):
+    p = figure(height=350, match_aspect=True)
+    p.scatter(longitudes, latitudes, size=3, alpha=0.3)
+    return json_item(p)
+
+def binned_in_python_item(counts, latitudes, longitudes):
+    """Per-city crime counts computed from the crime rows, then drawn like the aggregates."""
+    positions = np.stack([latitudes, longitudes], axis=1)
+    located, crimes = np.unique(positions, axis=0, return_counts=True)
+    by_position = {(latitude, longitude): int(count) for (latitude, longitude), count in zip(located, crimes)}
+    cities = [dict(city, crimes=by_position.get((city["latitude"], city["longitude"]), 0)) for city in counts["cities"]]
+    return CriminalDashboard([{}], {"city_counts": dict(counts, cities=cities)}).get_chart_item("crime_map")
+
+def measure(build):
+    start = time.perf_counter()
+    item = build()
+    elapsed = time.perf_counter() - start
+    return elapsed, len(json.dumps(item))
+
+def main():
+    counts, latitudes, longitudes = make_counts()
+    cities = sum(1 for city in counts["cities"] if city["crimes"] > 0)
+    print(f"{CRIMES} crimes in {cities} of {CITIES} cities and {COUNTRIES} countries")
+    print(f"{'':<18} {'rows read':>10} {'markers':>8} {'build s':>8} {'payload MB':>11}")
+
+    for name, rows, markers, build in (
+        ("aggregates", CITIES + COUNTRIES, cities,
+         lambda: CriminalDashboard([{}], {"city_counts": counts}).get_chart_item("crime_map")),
+        ("binned in Python", CRIMES, cities, lambda: binned_in_python_item(counts, latitudes, longitudes)),
+        ("raw points", CRIMES, CRIMES, lambda: raw_points_item(latitudes, longitudes)),
+    ):
+        elapsed, size = measure(build)
+        print(f"{name:<18} {rows:>10} {markers:>8} {elapsed:8.2f} {size / 2**20:11.1f}")
+
+if __name__ == "__main__":
+    main()
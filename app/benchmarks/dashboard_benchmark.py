@@ -0,0 +1,197 @@
+"""Age and temporal aggregation time and peak memory over 1M synthetic dashboard rows.
+
+Compares the previous CriminalDashboard code (copy of the whole frame, per-row age lambda,
+helper columns added to the frame) with the vectorized functions in dashboard_analytics,
+which only read the date column they need.
+
+Also times building the cross-filter cube, and selections made over it by the page's own
+dashboardFilter script, run in Node.js against stand-ins for the chart sources (skipped
+when node is not on the PATH). Bokeh's redraw of the updated charts is not included.
+
+Run from the app directory: python -m benchmarks.dashboard_benchmark
+"""
+import json
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from mvc.views.dashboard.bokeh_dashboard import cross_filter_script
+from mvc.views.dashboard.dashboard_analytics import (
+    AGE_LABELS, age_group_counts, crime_cube, monthly_counts, parse_dates, yearly_counts
+)
+
+ROWS = 1_000_000
+TODAY = datetime(2025, 6, 15)
+
+def make_frame(count):
+    random.seed(42)
+    start = date(1940, 1, 1)
+    crime_start = date(2000, 1, 1)
+
+    def random_date(first, days):
+        return (first + timedelta(days=random.randrange(days))).strftime("%Y-%m-%d")
+
+    return pd.DataFrame({
+        "ID": range(count),
+        "Прізвище": [random.choice(["Коваленко", "Шевченко", "Бондар"]) for _ in range(count)],
+        "Місце проживання": [random.choice(["Київ", "Львів", "Одеса"]) for _ in range(count)],
+        "Професії": [random.choice(["", "Водій", "Водій, Механік"]) for _ in range(count)],
+        "Тип злочину": [random.choice(["", "Крадіжка", "Грабіж", "Шахрайство", "Вбивство"]) for _ in range(count)],
+        "Угруповання": [random.choice(["", "", f"Угруповання {random.randrange(40)}"]) for _ in range(count)],
+        "Дата народження": [random_date(start, 25_000) if random.random() > 0.05 else "" for _ in range(count)],
+        "Дата останньої справи": [random_date(crime_start, 9_000) if random.random() > 0.2 else "" for _ in range(count)],
+    })
+
+def legacy_age(df):
+    df_valid = df.copy()
+    df_valid['birth_date'] = pd.to_datetime(df_valid['Дата народження'], errors='coerce')
+    df_valid = df_valid[df_valid['birth_date'].notna()]
+    today = TODAY
+    df_valid['age'] = df_valid['birth_date'].apply(lambda x: today.year - x.year -
+                                               ((today.month, today.day) < (x.month, x.day)))
+    age_bins = [0, 18, 25, 35, 45, 55, 65, 100]
+    age_labels = ["До 18", "18-25", "26-35", "36-45", "46-55", "56-65", "65+"]
+    df_valid['age_group'] = pd.cut(df_valid['age'], bins=age_bins, labels=age_labels, right=False)
+    age_counts = df_valid['age_group'].value_counts().reset_index()
+    age_counts.columns = ['age_group', 'count']
+    return age_counts.sort_values('age_group')
+
+def legacy_temporal(df):
+    df['date'] = pd.to_datetime(df['Дата останньої справи'], errors='coerce')
+    df_dates = df[df['date'].notna()].copy()
+    df_dates['year'] = df_dates['date'].dt.year
+    df_dates['month'] = df_dates['date'].dt.month
+    df_dates['year_month'] = df_dates['date'].dt.to_period('M')
+    yearly = df_dates.groupby('year').size().reset_index()
+    yearly.columns = ['year', 'count']
+    monthly = df_dates.groupby('year_month').size().reset_index()
+    monthly.columns = ['year_month', 'count']
+    return yearly.sort_values('year'), monthly.sort_values('year_month')
+
+def vectorized_age(df):
+    return age_group_counts(df['Дата народження'], TODAY)
+
+def vectorized_temporal(df):
+    dates = parse_dates(df['Дата останньої справи'])
+    return yearly_counts(dates), monthly_counts(dates)
+
+def measure(function, df):
+    """(seconds, peak bytes allocated above the starting point, result)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(df)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+# Runs dashboardFilter as the page does: setCubes once, then select() per click, each of
+# which re-totals the cube and assigns new counts to every bound source
+NODE_HARNESS = """
+const fs = require("fs");
+const input = JSON.parse(fs.readFileSync(process.argv[2], "utf8"));
+const sources = {};
+for (const [name, data] of Object.entries(input.sources)) {
+    sources[name] = {data};
+}
+globalThis.window = globalThis;
+globalThis.Bokeh = {documents: [{get_model_by_name: name => sources[name] || null}]};
+eval(input.script);
+
+window.dashboardFilter.setCubes({criminals: input.cube});
+const samples = [];
+for (const [dimension, keys] of input.selections) {
+    const start = process.hrtime.bigint();
+    window.dashboardFilter.select(dimension, keys, false);
+    samples.push(Number(process.hrtime.bigint() - start) / 1e6);
+}
+samples.sort((a, b) => a - b);
+console.log(JSON.stringify({median: samples[samples.length >> 1], max: samples[samples.length - 1]}));
+"""
+
+def time_page_selections(cube):
+    """(median, max) milliseconds of a dashboardFilter.select() call in Node.js, or None without node."""
+    node = shutil.which("node")
+    if node is None:
+        return None
+
+    crime_types = [label for label in cube["labels"]["crime_type"] if label]
+    gangs = [label for label in cube["labels"]["gang"] if label][:10]
+    months = sorted({month for month in cube["month"] if month >= 0})
+    sources = {
+        "crime_types_source": {"crime_type": crime_types},
+        "age_source": {"age_group": AGE_LABELS},
+        "gangs_source": {"name": gangs},
+        "temporal_monthly_source": {"month_key": months},
+        "temporal_yearly_source": {"year": sorted({month // 12 for month in months})}
+    }
+
+    # Select in each chart, then clear the selections again, a few times over
+    selections = []
+    for turn in range(5):
+        selections += [
+            ["crime_type", [crime_types[turn % len(crime_types)]]],
+            ["age_group", AGE_LABELS[2:4]],
+            ["gang", gangs[turn:turn + 1]],
+            ["month", months[-24:]],
+            ["crime_type", []], ["age_group", []], ["gang", []], ["month", []]
+        ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        harness = Path(directory) / "harness.js"
+        harness.write_text(NODE_HARNESS, encoding="utf-8")
+        data = Path(directory) / "input.json"
+        data.write_text(json.dumps({
+            "script": cross_filter_script(), "cube": cube, "sources": sources, "selections": selections
+        }), encoding="utf-8")
+
+        result = json.loads(subprocess.run([node, str(harness), str(data)], check=True,
+                                           capture_output=True, text=True).stdout)
+    return result["median"], result["max"]
+
+def bench_cross_filter(df):
+    start = time.perf_counter()
+    cube = crime_cube(df['Тип злочину'], df['Дата народження'], df['Угруповання'],
+                      df['Дата останньої справи'], TODAY)
+    build_time = time.perf_counter() - start
+    print(f"cross-filter cube: {len(cube['count'])} rows from {len(df)} records, built in {build_time:.2f} s")
+
+    timings = time_page_selections(cube)
+    if timings is None:
+        print("node not found: page selection timing skipped")
+    else:
+        print(f"page dashboardFilter.select() in Node.js: median {timings[0]:.1f} ms, max {timings[1]:.1f} ms")
+
+def main():
+    df = make_frame(ROWS)
+    print(f"{ROWS} rows")
+    print(f"{'':<10} {'legacy s':>9} {'new s':>7} {'legacy MB':>10} {'new MB':>8}")
+
+    for name, legacy, vectorized in (
+        ("age", legacy_age, vectorized_age),
+        ("temporal", legacy_temporal, vectorized_temporal),
+    ):
+        legacy_time, legacy_peak, legacy_result = measure(legacy, df.copy())
+        new_time, new_peak, new_result = measure(vectorized, df)
+
+        if name == "age":
+            assert legacy_result['count'].tolist() == new_result['count'].tolist()
+        else:
+            assert legacy_result[0]['count'].tolist() == new_result[0]['count'].tolist()
+            assert legacy_result[1]['count'].tolist() == new_result[1]['count'].tolist()
+
+        print(f"{name:<10} {legacy_time:9.2f} {new_time:7.2f} "
+              f"{legacy_peak / 2**20:10.1f} {new_peak / 2**20:8.1f}")
+
+    print()
+    bench_cross_filter(df)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Per-keystroke filter time over 100k criminal rows.
+
+Compares the previous approach (format the cell for display, then lowercase, split and
+float() the filter text for every row) with predicates compiled once by utils.filter_utils,
+and with incremental narrowing, where only rows passing the previous filter are re-tested.
+
+Run from the app directory: python -m benchmarks.filter_benchmark
+"""
+import random
+import time
+
+from utils.filter_utils import NUMBER, TEXT, compile_filter, is_narrowing
+
+ROWS = 100_000
+KEYSTROKES = {
+    "last_name": (TEXT, ["к", "ко", "ков", "кова", "коваль"]),
+    "height": (NUMBER, ["1", "17", "170", "170-", "170-1", "170-18", "170-185"]),
+}
+
+def make_rows(count):
+    random.seed(42)
+    names = ["Коваленко", "Шевченко", "Бондар", "Ткаченко", "Мельник", "Коваль", "Кравець"]
+    return [
+        {"last_name": random.choice(names), "height": random.randint(150, 200)}
+        for _ in range(count)
+    ]
+
+def legacy_accepts(display, filter_text, numeric):
+    data_str = str(display).lower()
+    filter_text = filter_text.lower()
+    if not numeric:
+        return filter_text in data_str
+    try:
+        numeric_part = ''.join(c for c in data_str if c.isdigit() or c == '.')
+        if not numeric_part:
+            return False
+        value = float(numeric_part)
+        if '-' in filter_text and not filter_text.startswith('>') and not filter_text.startswith('<'):
+            min_val, max_val = filter_text.split('-')
+            min_val = float(min_val.strip()) if min_val.strip() else 0
+            max_val = float(max_val.strip()) if max_val.strip() else float('inf')
+            return min_val <= value <= max_val
+        if filter_text.isdigit():
+            return value == float(filter_text)
+        return filter_text in data_str
+    except ValueError:
+        return filter_text in data_str
+
+def display_value(row, key):
+    # What the table model used to hand to the proxy for every cell
+    if key == "height":
+        return f"{row['height']} см" if row.get('height') else ""
+    return row.get(key, "")
+
+def bench_legacy(rows, key, kind, text):
+    numeric = kind == NUMBER
+    start = time.perf_counter()
+    matched = sum(1 for row in rows if legacy_accepts(display_value(row, key), text, numeric))
+    return time.perf_counter() - start, matched
+
+def bench_compiled(rows, key, kind, text):
+    start = time.perf_counter()
+    predicate = compile_filter(text, kind)
+    matched = sum(1 for row in rows if predicate(row[key]))
+    return time.perf_counter() - start, matched
+
+def bench_incremental(rows, key, kind, keystrokes):
+    """Total time for typing all keystrokes, re-testing only surviving rows when possible."""
+    accepted = None
+    previous = None
+    start = time.perf_counter()
+    for text in keystrokes:
+        predicate = compile_filter(text, kind)
+        if accepted is not None and is_narrowing(previous, text, kind):
+            accepted = [row for row in accepted if predicate(row[key])]
+        else:
+            accepted = [row for row in rows if predicate(row[key])]
+        previous = text
+    return time.perf_counter() - start, len(accepted)
+
+def main():
+    rows = make_rows(ROWS)
+    print(f"{ROWS} rows, time per keystroke (ms)")
+    print(f"{'column':<10} {'filter':<10} {'legacy':>8} {'compiled':>9} {'speedup':>8}")
+    for key, (kind, keystrokes) in KEYSTROKES.items():
+        for text in keystrokes:
+            legacy_time, legacy_matched = bench_legacy(rows, key, kind, text)
+            compiled_time, compiled_matched = bench_compiled(rows, key, kind, text)
+            assert legacy_matched == compiled_matched, (key, text, legacy_matched, compiled_matched)
+            print(f"{key:<10} {text:<10} {legacy_time * 1000:8.1f} {compiled_time * 1000:9.1f} "
+                  f"{legacy_time / compiled_time:7.1f}x")
+    
+    print()
+    print("whole typing sequence (ms)")
+    for key, (kind, keystrokes) in KEYSTROKES.items():
+        full_time = sum(bench_compiled(rows, key, kind, text)[0] for text in keystrokes)
+        incremental_time, _ = bench_incremental(rows, key, kind, keystrokes)
+        print(f"{key:<10} full re-filter {full_time * 1000:7.1f}   incremental {incremental_time * 1000:7.1f}")
+
+if __name__ == "__main__":
+    main()
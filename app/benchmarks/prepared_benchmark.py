@@ -0,0 +1,83 @@
+"""Per-call latency of hot model statements with and without server-side prepared statements.
+
+Times a criminal detail lookup, a next id lookup and the statements a login runs before
+checking the password, on one pooled psycopg 3 connection, first with preparing disabled and
+then with the application's prepare_threshold. Then lists pg_prepared_statements for the
+connection: generic_plans counts executions that reused the cached plan.
+
+Needs a database with the application schema; uses the DB_* settings from .env unless a
+URI is given. Run from the app directory: python -m benchmarks.prepared_benchmark [URI]
+"""
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, make_url, text
+
+from mvc.models.criminals import CriminalModel
+from mvc.models.database import database_uri
+from mvc.models.statements import PREPARE_THRESHOLD, prepared_statement_stats, read_only
+from mvc.models.users import LOCKOUT_QUERY, USER_BY_NAME_QUERY, UserModel
+
+CALLS = 500
+
+def login_lookup(model, username):
+    with model.engine.connect() as conn:
+        conn.execute(LOCKOUT_QUERY, model._throttle_params(username)).scalar()
+        conn.execute(USER_BY_NAME_QUERY, {"username": username}).fetchone()
+        # A successful login commits; a rollback would deallocate the prepared statements
+        conn.commit()
+
+def time_calls(function):
+    """Median microseconds per call after a warm-up longer than the prepare threshold."""
+    for _ in range(PREPARE_THRESHOLD + 3):
+        function()
+
+    samples = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1_000_000
+
+def run(uri, threshold):
+    # One connection, so every call runs on the session holding the prepared statements
+    engine = create_engine(uri, pool_size=1, max_overflow=0, connect_args={"prepare_threshold": threshold})
+    criminals = CriminalModel(engine)
+    users = UserModel(engine)
+
+    with read_only(engine).connect() as conn:
+        criminal_id = conn.execute(text('SELECT MIN(id_criminal) FROM "Criminals"')).scalar()
+        username = conn.execute(text('SELECT MIN(username) FROM "Users"')).scalar() or "nobody"
+
+    timings = {
+        "criminal detail": time_calls(lambda: criminals.get_criminal_by_id(criminal_id)),
+        "next id": time_calls(lambda: criminals.get_next_id("Crimes", "id_crime")),
+        "login lookup": time_calls(lambda: login_lookup(users, username))
+    }
+
+    with read_only(engine).connect() as conn:
+        stats = prepared_statement_stats(conn)
+    engine.dispose()
+    return timings, stats
+
+def main():
+    load_dotenv()
+    uri = make_url(sys.argv[1] if len(sys.argv) > 1 else database_uri()).set(drivername="postgresql+psycopg")
+
+    unprepared, _ = run(uri, None)
+    prepared, stats = run(uri, PREPARE_THRESHOLD)
+
+    print(f"median of {CALLS} calls, prepare_threshold={PREPARE_THRESHOLD}")
+    print(f"{'':<16} {'off µs':>8} {'on µs':>8}")
+    for name in unprepared:
+        print(f"{name:<16} {unprepared[name]:8.0f} {prepared[name]:8.0f}")
+
+    print()
+    print(f"{'generic':>8} {'custom':>7}  statement")
+    for row in stats:
+        print(f"{row['generic_plans']:8} {row['custom_plans']:7}  {row['statement'][:90]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Mapping time and retained memory per row of the criminal list: dicts versus records.
+
+Compares the dicts CriminalModel.get_all_criminals used to build (strftime on every date)
+with CriminalRecord rows from mvc.models.records, which keep the driver's values. Rows come
+from an in-memory SQLite database through SQLAlchemy, so no Postgres server is needed.
+
+Run from the app directory: python -m benchmarks.record_benchmark
+"""
+import gc
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from sqlalchemy import Date, create_engine, text
+
+from mvc.models.criminals import CriminalRecord
+from mvc.models.records import row_mapper
+
+ROWS = 100_000
+
+QUERY = text("""
+    SELECT id_criminal, first_name, last_name, nickname, is_archived, birth_place,
+           residence, date_of_birth, height, weight, id_group, role, group_name
+    FROM criminals
+""").columns(date_of_birth=Date)
+
+def make_rows(count):
+    random.seed(42)
+    engine = create_engine("sqlite://")
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE criminals (
+                id_criminal INTEGER, first_name TEXT, last_name TEXT, nickname TEXT,
+                is_archived BOOLEAN, birth_place TEXT, residence TEXT, date_of_birth DATE,
+                height INTEGER, weight INTEGER, id_group INTEGER, role TEXT, group_name TEXT
+            )
+        """))
+        conn.execute(text("INSERT INTO criminals VALUES (:id, :first, :last, :nick, :archived, :birth, :residence, :dob, :height, :weight, :grp, :role, :group_name)"), [
+            {
+                "id": number,
+                "first": random.choice(["Іван", "Петро", "Олена", "Марія"]),
+                "last": f"Прізвище{number}",
+                "nick": random.choice([None, "Сірий", "Кіт"]),
+                "archived": random.random() < 0.1,
+                "birth": random.choice(["Київ", "Львів", "Одеса"]),
+                "residence": random.choice(["Київ", "Львів", "Одеса"]),
+                "dob": (date(1940, 1, 1) + timedelta(days=random.randrange(25_000))).isoformat(),
+                "height": random.randrange(150, 200),
+                "weight": random.randrange(50, 120),
+                "grp": random.choice([None, 1, 2]),
+                "role": random.choice([None, "Член", "лідер"]),
+                "group_name": random.choice([None, "Тіні", "Вовки"])
+            }
+            for number in range(count)
+        ])
+
+    with engine.connect() as conn:
+        result = conn.execute(QUERY)
+        return list(result.keys()), result.fetchall()
+
+def legacy_dicts(columns, rows):
+    return [
+        {
+            "id_criminal": row[0],
+            "first_name": row[1],
+            "last_name": row[2],
+            "nickname": row[3],
+            "is_archived": row[4],
+            "birth_place": row[5],
+            "residence": row[6],
+            "date_of_birth": row[7].strftime("%Y-%m-%d") if row[7] else None,
+            "height": row[8],
+            "weight": row[9],
+            "id_group": row[10],
+            "role": row[11],
+            "group_name": row[12]
+        }
+        for row in rows
+    ]
+
+def records(columns, rows):
+    return list(map(row_mapper(CriminalRecord, columns), rows))
+
+def measure(function, columns, rows):
+    """(seconds, bytes still allocated per row while the result is kept)."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    start = time.perf_counter()
+    result = function(columns, rows)
+    elapsed = time.perf_counter() - start
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(result) == len(rows)
+    return elapsed, (after - before) / len(rows)
+
+def main():
+    columns, rows = make_rows(ROWS)
+    print(f"{ROWS} rows")
+    print(f"{'':<10} {'ms':>8} {'bytes/row':>10}")
+
+    for name, function in (("dicts", legacy_dicts), ("records", records)):
+        elapsed, per_row = measure(function, columns, rows)
+        print(f"{name:<10} {elapsed * 1000:8.1f} {per_row:10.0f}")
+
+    # Same values once the record's date is formatted the way the dict stored it
+    legacy = legacy_dicts(columns, rows[:100])
+    mapped = [dict(record, date_of_birth=record.date_of_birth.strftime("%Y-%m-%d")) for record in records(columns, rows[:100])]
+    assert legacy == mapped
+
+if __name__ == "__main__":
+    main()
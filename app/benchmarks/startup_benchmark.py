@@ -0,0 +1,68 @@
+"""Time to the first (login) window, asserted against a budget.
+
+Starts main.py offscreen with STARTUP_PROFILE=exit, so it quits as soon as the login
+window is shown, and reads the "first window shown" time from its profile report.
+create_engine does not connect, so no database is needed. Also times importing the
+stacks that are deferred until the dashboard or an export is first used.
+
+Run from the app directory: python -m benchmarks.startup_benchmark [budget s, default 1.5]
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+DEFERRED_MODULES = ["pandas", "bokeh.plotting", "PySide6.QtWebEngineWidgets"]
+
+def startup_env():
+    env = dict(os.environ)
+    env.update({
+        "QT_QPA_PLATFORM": "offscreen",
+        "STARTUP_PROFILE": "exit",
+        "DB_USER": "benchmark", "DB_PASSWORD": "benchmark",
+        "DB_HOST": "localhost", "DB_PORT": "5432", "DB_NAME": "benchmark"
+    })
+    return env
+
+def time_to_first_window():
+    """Seconds until the login window was shown, and the full profile report."""
+    result = subprocess.run(
+        [sys.executable, "main.py"], env=startup_env(),
+        capture_output=True, text=True, timeout=120
+    )
+    match = re.search(r"([\d.]+) s  first window shown", result.stderr)
+    if match is None:
+        raise RuntimeError(f"main.py exited with {result.returncode} before showing a window:\n{result.stderr}")
+    return float(match.group(1)), result.stderr
+
+def deferred_import_time(module):
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    return float(result.stdout) if result.returncode == 0 else None
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 1.5
+    
+    times = []
+    for _ in range(RUNS):
+        elapsed, report = time_to_first_window()
+        times.append(elapsed)
+    
+    print(report)
+    print(f"time to first window over {RUNS} runs: median {statistics.median(times):.3f} s, "
+          f"max {max(times):.3f} s (budget {budget:.3f} s)")
+    
+    print("deferred until first use:")
+    for module in DEFERRED_MODULES:
+        elapsed = deferred_import_time(module)
+        print(f"  {module:<30} {'not importable here' if elapsed is None else f'{elapsed:.3f} s'}")
+    
+    assert statistics.median(times) <= budget, "time to first window is over budget"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Memory, paint and sort cost of CriminalTableModel over 100k rows.
+
+Compares the previous list-of-dicts model (one dict per row, display strings formatted in
+every data() call, sort by Python key function) with the columnar model: memory retained
+per row once the query result is released, time to fetch every visible cell of a viewport,
+and time to sort by a text and a numeric column.
+
+Run from the app directory: python -m benchmarks.table_model_benchmark
+"""
+import gc
+import random
+import time
+import tracemalloc
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from mvc.views.criminals.criminals_table import SORT_KEYS, CriminalTableModel
+
+ROWS = 100_000
+VIEWPORT_ROWS = 40
+VIEWPORTS = 500
+
+class LegacyCriminalTableModel(QAbstractTableModel):
+    """The list-of-dicts model as it was before the columnar store."""
+    def __init__(self, data):
+        super().__init__()
+        self._data = data
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._data)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(SORT_KEYS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or \
+        not (0 <= index.row() < len(self._data)) or \
+        not (0 <= index.column() < len(SORT_KEYS)):
+            return None
+
+        col = index.column()
+        criminal = self._data[index.row()]
+
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return str(criminal.get("id_criminal", ""))
+            elif col == 7:
+                return f"{criminal.get('height', '')} см" if criminal.get('height') else ""
+            elif col == 8:
+                return f"{criminal.get('weight', '')} кг" if criminal.get('weight') else ""
+            elif col == 9:
+                if criminal.get("group_name"):
+                    role_info = f" ({criminal.get('role')})" if criminal.get('role') else ""
+                    return f"{criminal.get('group_name')}{role_info}"
+                return ""
+            return criminal.get(SORT_KEYS[col], "")
+
+    def sort(self, column, order):
+        self.layoutAboutToBeChanged.emit()
+        key = SORT_KEYS[column]
+        self._data.sort(
+            key=lambda x: (x.get(key) is None, x.get(key)),
+            reverse=order == Qt.DescendingOrder
+        )
+        self.layoutChanged.emit()
+
+def make_rows(count):
+    random.seed(42)
+    first_names = ["Іван", "Петро", "Олена", "Марія", "Андрій", "Оксана", "Тарас"]
+    last_names = ["Коваленко", "Шевченко", "Бондар", "Ткаченко", "Мельник", "Коваль", "Кравець"]
+    cities = ["Київ", "Львів", "Одеса", "Харків", "Дніпро", "Запоріжжя"]
+    gangs = [None, None, "Чорні вовки", "Тіні", "Південний синдикат"]
+    rows = []
+    for criminal_id in range(1, count + 1):
+        gang = random.choice(gangs)
+        rows.append({
+            "id_criminal": criminal_id,
+            "first_name": random.choice(first_names),
+            "last_name": random.choice(last_names),
+            "nickname": random.choice([None, f"Кличка{criminal_id % 500}"]),
+            "date_of_birth": f"{random.randint(1950, 2005)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+            "birth_place": random.choice(cities),
+            "residence": random.choice(cities),
+            "height": random.choice([None, random.randint(150, 200)]),
+            "weight": random.randint(50, 120),
+            "group_name": gang,
+            "role": random.choice(["Лідер", "Член"]) if gang else None,
+            "status": "Активний",
+            "created_at": "2024-01-01"
+        })
+    return rows
+
+def retained_bytes(model_class):
+    """Bytes still allocated after the model is built and the query result is dropped."""
+    gc.collect()
+    tracemalloc.start()
+    rows = make_rows(ROWS)
+    model = model_class(rows)
+    del rows
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, model
+
+def bench_paint(model):
+    """Milliseconds of data() calls to paint every cell of one viewport."""
+    random.seed(7)
+    columns = model.columnCount()
+    viewports = []
+    for _ in range(VIEWPORTS):
+        top = random.randrange(ROWS - VIEWPORT_ROWS)
+        viewports.append([
+            model.index(row, col)
+            for row in range(top, top + VIEWPORT_ROWS) for col in range(columns)
+        ])
+
+    start = time.perf_counter()
+    for indexes in viewports:
+        for index in indexes:
+            model.data(index, Qt.DisplayRole)
+    return (time.perf_counter() - start) * 1000 / VIEWPORTS
+
+def bench_sort(model, column):
+    start = time.perf_counter()
+    model.sort(column, Qt.AscendingOrder)
+    model.sort(column, Qt.DescendingOrder)
+    return (time.perf_counter() - start) * 1000 / 2
+
+def main():
+    legacy_bytes, legacy = retained_bytes(LegacyCriminalTableModel)
+    columnar_bytes, columnar = retained_bytes(CriminalTableModel)
+
+    print(f"{ROWS} rows")
+    print(f"{'':<22} {'legacy':>10} {'columnar':>10}")
+    print(f"{'bytes per row':<22} {legacy_bytes / ROWS:10.0f} {columnar_bytes / ROWS:10.0f}")
+    print(f"{'viewport paint (ms)':<22} {bench_paint(legacy):10.2f} {bench_paint(columnar):10.2f}")
+    for column in (2, 7):
+        label = f"sort {SORT_KEYS[column]} (ms)"
+        print(f"{label:<22} {bench_sort(legacy, column):10.1f} {bench_sort(columnar, column):10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,17 @@
 import sys
 import os
+
+# Installed before the other imports so they show up in the STARTUP_PROFILE report
+from utils import startup_profiler
+startup_profiler.install()
+
 from dotenv import load_dotenv
 from PySide6.QtWidgets import QApplication, QMessageBox
 from PySide6.QtCore import QTimer
 
-from mvc.models.database import DatabaseConnector
-from mvc.models.users import UserModel
-from mvc.models.criminals import CriminalModel
-from mvc.models.cities import CityModel
-from mvc.models.languages import LanguageModel
-from mvc.models.professions import ProfessionModel
-from mvc.models.criminal_gangs import CriminalGroupModel
+from mvc.models.database import DatabaseConnector, database_uri, replica_uris
+from mvc.models.users import DEFAULT_BCRYPT_ROUNDS
+from mvc.models.data_service import DataServiceClient, create_models, ensure_crime_partitions
 
 from mvc.controllers.authcontroller import AuthController
 from mvc.controllers.criminalcontroller import CriminalController
@@ -20,47 +21,64 @@ from mvc.controllers.dashboardcontroller import DashboardController
 from mvc.controllers.usercontroller import UserController
 from mvc.controllers.userlistcontroller import UserListController
 
-from mvc.views.auth.register.register import RegisterView
 from mvc.views.auth.login.login import LoginView
-from mvc.views.auth.changepassword.changepassword import ChangePasswordView
-from mvc.views.users.users import UsersView
-from mvc.views.criminals.criminal_info import CriminalsView
-from mvc.views.gangs.gang_info import GangsView
-from mvc.views.archive.archive_info import ArchiveView
-from mvc.views.criminals.criminal_detail import CriminalDetailView
-from mvc.views.dashboard.dashboard_view import DashboardView
-from mvc.views.mainwindow import MainWindow
-
-from mvc.views.criminals.criminal_manipulation.criminal_add_form import CriminalAddForm
-from mvc.views.criminals.criminal_manipulation.criminal_edit_form import CriminalEditForm
-from mvc.views.gangs.gang_manipulation.gang_add_form import GangAddForm
-from mvc.views.gangs.gang_manipulation.gang_edit_form import GangEditForm
-
 from mvc.views.navigate.navigation_service import NavigationService
+from utils.async_utils import create_event_loop
 
 load_dotenv()
+startup_profiler.mark("imports done")
 
 def main() -> int:
     app = QApplication(sys.argv)
+    loop = create_event_loop(app)
+    startup_profiler.mark("QApplication created")
     
     navigation_service = NavigationService()
     
     db_connector = DatabaseConnector()
-    db_uri = f"""postgresql://{os.getenv("DB_USER")}:{os.getenv("DB_PASSWORD")}@{os.getenv("DB_HOST")}:{os.getenv("DB_PORT")}/{os.getenv("DB_NAME")}"""
-    connected = db_connector.connect_engine(db_uri)
-    
-    if not connected:
-        QMessageBox.critical(None, "Database Error", "Could not connect to database. Please check your connection settings.")
-        return 1
+    data_service_socket = os.getenv("DATA_SERVICE_SOCKET")
+    data_service = DataServiceClient(data_service_socket) if data_service_socket else None
+    
+    if data_service is not None and data_service.connect():
+        # Models are hosted by the shared data service (python -m mvc.models.data_service)
+        models = data_service.models()
+    else:
+        db_uri = database_uri()
+        connected = db_connector.connect_engine(db_uri)
+        
+        if not connected:
+            QMessageBox.critical(None, "Database Error", "Could not connect to database. Please check your connection settings.")
+            return 1
+        
+        if loop is not None:
+            db_connector.connect_async_engine(db_uri)
+        
+        # Read-only queries go to the replicas in DB_REPLICA_HOSTS, if any
+        db_connector.connect_replicas(replica_uris())
+        
+        models = create_models(
+            db_connector.engine,
+            db_connector.async_engine,
+            int(os.getenv("BCRYPT_ROUNDS", DEFAULT_BCRYPT_ROUNDS)),
+            db_connector.read_engine
+        )
+        ensure_crime_partitions(models["crimes"])
     
     # Initialize models
-    user_model = UserModel(db_connector.engine)
-    criminal_model = CriminalModel(db_connector.engine)
-    city_model = CityModel(db_connector.engine)
-    language_model = LanguageModel(db_connector.engine)
-    profession_model = ProfessionModel(db_connector.engine)
-    criminal_group_model = CriminalGroupModel(db_connector.engine)
-    dashboard_controller = DashboardController(criminal_model, city_model)
+    user_model = models["users"]
+    criminal_model = models["criminals"]
+    city_model = models["cities"]
+    language_model = models["languages"]
+    profession_model = models["professions"]
+    criminal_group_model = models["criminal_groups"]
+    data_version_model = models["data_versions"]
+    crime_model = models["crimes"]
+    dashboard_controller = DashboardController(
+        criminal_model,
+        city_model,
+        crime_model=crime_model,
+        data_version_model=data_version_model
+    )
     
     # Initialize controllers
     auth_controller = AuthController(user_model)
@@ -69,44 +87,241 @@ def main() -> int:
         city_model,
         profession_model,
         language_model,
-        criminal_group_model
+        criminal_group_model,
+        models["associations"]
     )
     gang_controller = GangController(criminal_group_model, city_model)
     archive_controller = ArchiveController(criminal_model)
     user_controller = UserController(user_model)
     user_list_controller = UserListController(user_model)
     
-    # Initialize views
-    register_view = RegisterView()
+    startup_profiler.mark("models and controllers created")
+    
+    # Only the login window is built at startup; every other view (and the heavy modules
+    # it imports, such as QtWebEngine, pandas and bokeh for the dashboard) is built the
+    # first time it is navigated to or requested through view()
+    view = navigation_service.get_view
+    
     login_view = LoginView()
-    criminals_view = CriminalsView()
-    gangs_view = GangsView()
-    archive_view = ArchiveView()
-    criminal_detail_view = CriminalDetailView()
-    dashboard_view = DashboardView()
-    change_password_view = ChangePasswordView()
-    users_view = UsersView()
-    main_view = MainWindow()
-    
-    criminal_add_form = CriminalAddForm()
-    criminal_edit_form = CriminalEditForm()
-    gang_add_form = GangAddForm()
-    gang_edit_form = GangEditForm()
-
     navigation_service.register_view("login", login_view)
-    navigation_service.register_view("register", register_view)
-    navigation_service.register_view("main", main_view)
-    navigation_service.register_view("criminals", criminals_view)
-    navigation_service.register_view("criminal_detail", criminal_detail_view)
-    navigation_service.register_view("gangs", gangs_view)
-    navigation_service.register_view("archive", archive_view)
-    navigation_service.register_view("criminal_add", criminal_add_form)
-    navigation_service.register_view("criminal_edit", criminal_edit_form)
-    navigation_service.register_view("gang_add", gang_add_form)
-    navigation_service.register_view("gang_edit", gang_edit_form)
-    navigation_service.register_view("change_password", change_password_view)
-    navigation_service.register_view("dashboard", dashboard_view)
-    navigation_service.register_view("users", users_view)
+    
+    def create_register_view():
+        from mvc.views.auth.register.register import RegisterView
+        register_view = RegisterView()
+        
+        register_view.register_requested.connect(auth_controller.register_user)
+        register_view.return_to_users_view_requested.connect(lambda: (
+            navigation_service.navigate_to("users", "register")
+        ))
+        return register_view
+    
+    def create_main_view():
+        from mvc.views.mainwindow import MainWindow
+        main_view = MainWindow()
+        
+        main_view.open_users_requested.connect(lambda: (
+            user_list_controller.get_all_users(),
+            navigation_service.navigate_to("users", "main")
+        ) if user_controller.is_admin() else None)
+        
+        main_view.open_dashboard_requested.connect(lambda: (
+            dashboard_controller.refresh_data_versions(),
+            view("dashboard").set_dashboard_data(
+                dashboard_controller.get_dashboard_data(),
+                dashboard_controller.get_dashboard_frequencies(),
+                dashboard_controller.get_chart_versions()
+            ),
+            navigation_service.navigate_to("dashboard", "main")
+        ))
+        
+        main_view.open_criminals_requested.connect(lambda: navigation_service.navigate_to("criminals", "main"))
+        main_view.open_groups_requested.connect(lambda: (
+            view("gangs").set_gangs_data(gang_controller.get_all_gangs()),
+            navigation_service.navigate_to("gangs", "main")
+        ))
+        
+        main_view.open_change_password_requested.connect(lambda: navigation_service.navigate_to("change_password", "main"))
+        
+        main_view.open_archive_requested.connect(lambda: (
+            view("archive").set_archive_data(
+                archive_controller.get_archived_criminals(), archive_controller.get_archived_criminals
+            ),
+            navigation_service.navigate_to("archive", "main")
+        ))
+        return main_view
+    
+    def create_users_view():
+        from mvc.views.users.users import UsersView
+        users_view = UsersView()
+        
+        users_view.add_user_requested.connect(lambda: (
+            view("register").clear(),
+            navigation_service.navigate_to("register", "users")
+        ))
+        users_view.delete_user_requested.connect(user_list_controller.delete_user)
+        users_view.search_user_requested.connect(user_list_controller.search_users)
+        return users_view
+    
+    def create_change_password_view():
+        from mvc.views.auth.changepassword.changepassword import ChangePasswordView
+        change_password_view = ChangePasswordView()
+        
+        change_password_view.change_password_requested.connect(user_controller.change_password)
+        return change_password_view
+    
+    def create_dashboard_view():
+        from mvc.views.dashboard.dashboard_view import DashboardView
+        return DashboardView()
+    
+    def create_criminals_view():
+        from mvc.views.criminals.criminal_info import CriminalsView
+        criminals_view = CriminalsView()
+        
+        def open_criminal_form(name, criminal_id=None):
+            # Callbacks carry the form's load generation, so a slow earlier load is dropped
+            form = view(name)
+            generation = form.show_loading_placeholders()
+            navigation_service.navigate_to(name, "criminals")
+            criminal_controller.load_reference_data(
+                lambda kind, items: form.set_reference_data(kind, items, generation),
+                criminal_id,
+                lambda criminal: form.set_criminal_data(criminal_id, criminal, generation),
+                on_error=lambda _: form.show_load_error(generation)
+            )
+        
+        criminals_view.add_criminal_requested.connect(lambda: open_criminal_form("criminal_add"))
+        criminals_view.edit_criminal_requested.connect(lambda criminal_id: open_criminal_form("criminal_edit", criminal_id))
+        
+        criminals_view.show_associations_requested.connect(lambda criminal_id: (
+            view("associations").set_criminal(criminal_id),
+            navigation_service.navigate_to("associations", "criminals")
+        ))
+        
+        criminals_view.show_criminal_details_requested.connect(lambda criminal_id: (
+            view("criminal_detail").set_criminal_data(criminal_controller.get_criminal(criminal_id)),
+            navigation_service.navigate_to("criminal_detail", "criminals")
+        ))
+        
+        criminals_view.export_criminals_requested.connect(lambda include_archived: (
+            criminals_view.export_criminals_data(
+                *criminal_controller.stream_criminals_for_export(include_archived)
+            )
+        ))
+        
+        criminals_view.archive_criminal_requested.connect(criminal_controller.archive_criminal)
+        criminals_view.delete_criminal_requested.connect(criminal_controller.delete_criminal)
+        
+        criminals_view.set_criminals_data(criminal_controller.get_all_criminals())
+        return criminals_view
+    
+    def create_association_view():
+        from mvc.views.associations.association_view import AssociationView
+        association_view = AssociationView()
+        
+        association_view.associates_requested.connect(lambda criminal_id, hops, relations: (
+            association_view.show_associates(*criminal_controller.get_associates(criminal_id, hops, relations))
+        ))
+        association_view.component_requested.connect(lambda criminal_id, relations: (
+            association_view.show_component(*criminal_controller.get_association_component(criminal_id, relations))
+        ))
+        association_view.path_requested.connect(lambda from_id, to_id, relations: (
+            association_view.show_path(criminal_controller.get_association_path(from_id, to_id, relations))
+        ))
+        association_view.reload_requested.connect(criminal_controller.reload_association_graph)
+        criminal_controller.association_graph_loading.connect(association_view.show_graph_loading)
+        criminal_controller.association_graph_ready.connect(association_view.set_graph_ready)
+        criminal_controller.load_association_graph()
+        return association_view
+    
+    def create_criminal_detail_view():
+        from mvc.views.criminals.criminal_detail import CriminalDetailView
+        return CriminalDetailView()
+    
+    def create_criminal_add_form():
+        from mvc.views.criminals.criminal_manipulation.criminal_add_form import CriminalAddForm
+        criminal_add_form = CriminalAddForm()
+        
+        criminal_add_form.save_requested.connect(criminal_controller.add_criminal)
+        return criminal_add_form
+    
+    def create_criminal_edit_form():
+        from mvc.views.criminals.criminal_manipulation.criminal_edit_form import CriminalEditForm
+        criminal_edit_form = CriminalEditForm()
+        
+        criminal_edit_form.update_requested.connect(criminal_controller.update_criminal)
+        return criminal_edit_form
+    
+    def create_gangs_view():
+        from mvc.views.gangs.gang_info import GangsView
+        gangs_view = GangsView()
+        
+        gangs_view.add_gang_requested.connect(lambda: (
+            view("gang_add").load_reference_data(gang_controller.get_cities()),
+            navigation_service.navigate_to("gang_add", "gangs")
+        ))
+        
+        gangs_view.edit_gang_requested.connect(lambda gang_id: (
+            view("gang_edit").load_reference_data(gang_controller.get_cities()),
+            view("gang_edit").set_gang_data(gang_id, gang_controller.get_gang(gang_id)),
+            navigation_service.navigate_to("gang_edit", "gangs")
+        ))
+        
+        gangs_view.delete_gang_requested.connect(gang_controller.delete_gang)
+        
+        gangs_view.show_gang_details_requested.connect(lambda gang_id: (
+            view("gang_detail").set_gang_data(
+                *gang_controller.get_gang_details(gang_id),
+                lambda sort_key, descending, after: gang_controller.get_gang_members_page(gang_id, sort_key, descending, after)
+            ),
+            navigation_service.navigate_to("gang_detail", "gangs")
+        ))
+        gangs_view.gang_hovered.connect(gang_controller.prefetch_gang_members)
+        
+        gangs_view.export_gangs_requested.connect(lambda: (
+            gangs_view.export_gangs_data(*gang_controller.stream_gangs_for_export())
+        ))
+        return gangs_view
+    
+    def create_gang_detail_view():
+        from mvc.views.gangs.gang_detail import GangDetailView
+        return GangDetailView()
+    
+    def create_gang_add_form():
+        from mvc.views.gangs.gang_manipulation.gang_add_form import GangAddForm
+        gang_add_form = GangAddForm()
+        
+        gang_add_form.save_requested.connect(gang_controller.add_gang)
+        return gang_add_form
+    
+    def create_gang_edit_form():
+        from mvc.views.gangs.gang_manipulation.gang_edit_form import GangEditForm
+        gang_edit_form = GangEditForm()
+        
+        gang_edit_form.update_requested.connect(gang_controller.update_gang)
+        return gang_edit_form
+    
+    def create_archive_view():
+        from mvc.views.archive.archive_info import ArchiveView
+        archive_view = ArchiveView()
+        
+        archive_view.delete_archived_criminal_requested.connect(archive_controller.delete_archived_criminal)
+        return archive_view
+    
+    navigation_service.register_view_factory("register", create_register_view)
+    navigation_service.register_view_factory("main", create_main_view)
+    navigation_service.register_view_factory("criminals", create_criminals_view)
+    navigation_service.register_view_factory("criminal_detail", create_criminal_detail_view)
+    navigation_service.register_view_factory("associations", create_association_view)
+    navigation_service.register_view_factory("gangs", create_gangs_view)
+    navigation_service.register_view_factory("archive", create_archive_view)
+    navigation_service.register_view_factory("criminal_add", create_criminal_add_form)
+    navigation_service.register_view_factory("criminal_edit", create_criminal_edit_form)
+    navigation_service.register_view_factory("gang_detail", create_gang_detail_view)
+    navigation_service.register_view_factory("gang_add", create_gang_add_form)
+    navigation_service.register_view_factory("gang_edit", create_gang_edit_form)
+    navigation_service.register_view_factory("change_password", create_change_password_view)
+    navigation_service.register_view_factory("dashboard", create_dashboard_view)
+    navigation_service.register_view_factory("users", create_users_view)
 
     navigation_service.register_transition("main", "criminals")
     navigation_service.register_transition("main", "gangs")
@@ -124,9 +339,13 @@ def main() -> int:
     navigation_service.register_transition("criminals", "criminal_edit")
     navigation_service.register_transition("criminals", "criminal_detail")
     navigation_service.register_transition("criminal_detail", "criminals")
+    navigation_service.register_transition("criminals", "associations")
+    navigation_service.register_transition("associations", "criminals")
     navigation_service.register_transition("criminal_add", "criminals")
     navigation_service.register_transition("criminal_edit", "criminals")
     
+    navigation_service.register_transition("gangs", "gang_detail")
+    navigation_service.register_transition("gang_detail", "gangs")
     navigation_service.register_transition("gangs", "gang_add")
     navigation_service.register_transition("gangs", "gang_edit")
     navigation_service.register_transition("gang_add", "gangs")
@@ -145,54 +364,25 @@ def main() -> int:
     auth_controller.login_success.connect(lambda _: login_view.clear())
     auth_controller.login_failed.connect(login_view.show_error)
     
-    register_view.register_requested.connect(auth_controller.register_user)
-
-    register_view.return_to_users_view_requested.connect(lambda: (
-        navigation_service.navigate_to("users", "register")
-    ))
-    
-    auth_controller.registration_success.connect(lambda _: register_view.show_success())
-    auth_controller.registration_failed.connect(register_view.show_error)
-
-    main_view.open_users_requested.connect(lambda: (
-        user_list_controller.get_all_users(),
-        navigation_service.navigate_to("users", "main")
-    ) if user_controller.is_admin() else None)
-
-    main_view.open_dashboard_requested.connect(lambda: (
-        dashboard_view.set_dashboard_data(dashboard_controller.get_dashboard_data()),
-        navigation_service.navigate_to("dashboard", "main")
-    ))
-
-    users_view.add_user_requested.connect(lambda: (
-        register_view.clear(),
-        navigation_service.navigate_to("register", "users")
-    ))
-
-    users_view.add_user_requested.connect(lambda: (
-        register_view.clear(),
-        navigation_service.navigate_to("register", "users")
-    ))
+    auth_controller.registration_success.connect(lambda _: view("register").show_success())
+    auth_controller.registration_failed.connect(lambda message: view("register").show_error(message))
 
     auth_controller.registration_success.connect(lambda: (
-        register_view.show_success("Користувача успішно додано!"),
+        view("register").show_success("Користувача успішно додано!"),
         QTimer.singleShot(1000, lambda: (
             navigation_service.navigate_to("users", "register"),
             user_list_controller.get_all_users()
         ))
     ))
 
-    users_view.delete_user_requested.connect(user_list_controller.delete_user)
-    users_view.search_user_requested.connect(user_list_controller.search_users)
-
-    user_list_controller.users_loaded.connect(users_view.set_users_data)
+    user_list_controller.users_loaded.connect(lambda users: view("users").set_users_data(users))
     user_list_controller.user_deleted.connect(lambda _: (
-        QMessageBox.information(users_view, "Успіх", "Користувача успішно видалено"),
+        QMessageBox.information(view("users"), "Успіх", "Користувача успішно видалено"),
         user_list_controller.get_all_users()
     ))
     
     user_list_controller.operation_error.connect(lambda message: 
-        QMessageBox.critical(users_view, "Помилка", message)
+        QMessageBox.critical(view("users"), "Помилка", message)
     )
 
 
@@ -202,106 +392,37 @@ def main() -> int:
     ))
 
     user_controller.user_role_changed.connect(lambda username, is_admin: (
-        main_view.set_user_role(username)
+        view("main").set_user_role(username)
     ))
 
     auth_controller.show_main_window.connect(lambda: navigation_service.navigate_to("main", "login"))
     
-    main_view.open_criminals_requested.connect(lambda: navigation_service.navigate_to("criminals", "main"))
-    main_view.open_groups_requested.connect(lambda: (
-        gangs_view.set_gangs_data(gang_controller.get_all_gangs()),
-        navigation_service.navigate_to("gangs", "main")
-    ))
-
-    main_view.open_change_password_requested.connect(lambda: navigation_service.navigate_to("change_password", "main"))
-    change_password_view.change_password_requested.connect(user_controller.change_password)
     user_controller.password_changed.connect(lambda success, message: (
-        change_password_view.show_success(message) if success else change_password_view.show_error(message),
+        view("change_password").show_success(message) if success else view("change_password").show_error(message),
         navigation_service.navigate_to("main", "change_password") if success else None
     ))
     
-
-    main_view.open_archive_requested.connect(lambda: navigation_service.navigate_to("archive", "main"))
-    
-    criminals_view.add_criminal_requested.connect(lambda: (
-        criminal_add_form.load_reference_data(
-            criminal_controller.get_cities(),
-            criminal_controller.get_professions(),
-            criminal_controller.get_criminal_groups(),
-            criminal_controller.get_languages()
-        ),
-        navigation_service.navigate_to("criminal_add", "criminals")
-    ))
-
-    criminals_view.edit_criminal_requested.connect(lambda criminal_id: (
-        criminal_edit_form.load_reference_data(
-            criminal_controller.get_cities(),
-            criminal_controller.get_professions(),
-            criminal_controller.get_criminal_groups(),
-            criminal_controller.get_languages()
-        ),
-        criminal_edit_form.set_criminal_data(criminal_id, criminal_controller.get_criminal(criminal_id)),
-        navigation_service.navigate_to("criminal_edit", "criminals")
-    ))
-
-    criminals_view.show_criminal_details_requested.connect(lambda criminal_id: (
-        criminal_detail_view.set_criminal_data(criminal_controller.get_criminal(criminal_id)),
-        navigation_service.navigate_to("criminal_detail", "criminals")
-    ))
-
-    criminals_view.export_criminals_requested.connect(lambda include_archived: (
-        criminals_view.export_criminals_data(
-            criminal_controller.get_criminals_for_export(include_archived)
-        )
-    ))
-    
-    criminals_view.archive_criminal_requested.connect(criminal_controller.archive_criminal)
-    criminals_view.delete_criminal_requested.connect(criminal_controller.delete_criminal)
-    
-    criminal_add_form.save_requested.connect(criminal_controller.add_criminal)
-    criminal_edit_form.update_requested.connect(criminal_controller.update_criminal)
-    
-    gangs_view.add_gang_requested.connect(lambda: (
-        gang_add_form.load_reference_data(gang_controller.get_cities()),
-        navigation_service.navigate_to("gang_add", "gangs")
-    ))
-    
-    gangs_view.edit_gang_requested.connect(lambda gang_id: (
-        gang_edit_form.load_reference_data(gang_controller.get_cities()),
-        gang_edit_form.set_gang_data(gang_id, gang_controller.get_gang(gang_id)),
-        navigation_service.navigate_to("gang_edit", "gangs")
-    ))
-    
-    gangs_view.delete_gang_requested.connect(gang_controller.delete_gang)
-    
-    gangs_view.export_gangs_requested.connect(lambda: (
-        gangs_view.export_gangs_data(gang_controller.get_gangs_for_export())
-    ))
-    
-    gang_add_form.save_requested.connect(gang_controller.add_gang)
-    gang_edit_form.update_requested.connect(gang_controller.update_gang)
-    
     criminal_controller.criminal_added.connect(lambda _: (
-        QMessageBox.information(criminal_add_form, "Success", "Злочинець успішно доданий"),
-        criminal_add_form.reset_form(),
+        QMessageBox.information(view("criminal_add"), "Success", "Злочинець успішно доданий"),
+        view("criminal_add").reset_form(),
         navigation_service.navigate_to("criminals", "criminal_add"),
-        criminals_view.set_criminals_data(criminal_controller.get_all_criminals())
+        view("criminals").set_criminals_data(criminal_controller.get_all_criminals())
     ))
     
     criminal_controller.criminal_updated.connect(lambda _: (
-        QMessageBox.information(criminal_edit_form, "Success", "Інформація про злочинця успішно оновлена"),
+        QMessageBox.information(view("criminal_edit"), "Success", "Інформація про злочинця успішно оновлена"),
         navigation_service.navigate_to("criminals", "criminal_edit"),
-        criminals_view.set_criminals_data(criminal_controller.get_all_criminals())
+        view("criminals").set_criminals_data(criminal_controller.get_all_criminals())
     ))
     
     criminal_controller.criminal_archived.connect(lambda _: (
-        QMessageBox.information(criminals_view, "Success", "Злочинець архівований"),
-        criminals_view.set_criminals_data(criminal_controller.get_all_criminals())
+        QMessageBox.information(view("criminals"), "Success", "Злочинець архівований"),
+        view("criminals").set_criminals_data(criminal_controller.get_all_criminals())
     ))
     
     criminal_controller.criminal_deleted.connect(lambda _: (
-        QMessageBox.information(criminals_view, "Success", "Злочинець видалений"),
-        criminals_view.set_criminals_data(criminal_controller.get_all_criminals())
+        QMessageBox.information(view("criminals"), "Success", "Злочинець видалений"),
+        view("criminals").set_criminals_data(criminal_controller.get_all_criminals())
     ))
     
     criminal_controller.operation_error.connect(lambda error_msg: 
@@ -309,54 +430,55 @@ def main() -> int:
     )
     
     gang_controller.gang_added.connect(lambda _: (
-        QMessageBox.information(gang_add_form, "Success", "Угруповання успішно додане"),
-        gang_add_form.reset_form(),
+        QMessageBox.information(view("gang_add"), "Success", "Угруповання успішно додане"),
+        view("gang_add").reset_form(),
         navigation_service.navigate_to("gangs", "gang_add"),
-        gangs_view.set_gangs_data(gang_controller.get_all_gangs())
+        view("gangs").set_gangs_data(gang_controller.get_all_gangs())
     ))
     
     gang_controller.gang_updated.connect(lambda _: (
-        QMessageBox.information(gang_edit_form, "Success", "Інформація про угруповання успішно оновлена"),
+        QMessageBox.information(view("gang_edit"), "Success", "Інформація про угруповання успішно оновлена"),
         navigation_service.navigate_to("gangs", "gang_edit"),
-        gangs_view.set_gangs_data(gang_controller.get_all_gangs())
+        view("gangs").set_gangs_data(gang_controller.get_all_gangs())
     ))
     
     gang_controller.gang_deleted.connect(lambda _: (
-        QMessageBox.information(gangs_view, "Success", "Угруповання видалене"),
-        gangs_view.set_gangs_data(gang_controller.get_all_gangs())
+        QMessageBox.information(view("gangs"), "Success", "Угруповання видалене"),
+        view("gangs").set_gangs_data(gang_controller.get_all_gangs())
     ))
     
     gang_controller.operation_error.connect(lambda error_msg: 
         QMessageBox.critical(None, "Error", error_msg)
     )
 
-    archive_view.delete_archived_criminal_requested.connect(archive_controller.delete_archived_criminal)
-
     archive_controller.criminal_deleted.connect(lambda _: (
-        QMessageBox.information(archive_view, "Success", "Злочинець повністю видалений з архіву"),
-        archive_view.set_archive_data(archive_controller.get_archived_criminals())
+        QMessageBox.information(view("archive"), "Success", "Злочинець повністю видалений з архіву"),
+        view("archive").set_archive_data(
+            archive_controller.get_archived_criminals(), archive_controller.get_archived_criminals
+        )
     ))
     
     archive_controller.operation_error.connect(lambda error_msg: 
         QMessageBox.critical(None, "Error", error_msg)
     )
-    
-    main_view.open_archive_requested.connect(lambda: (
-        archive_view.set_archive_data(archive_controller.get_archived_criminals()),
-        navigation_service.navigate_to("archive", "main")
-    ))
 
     auth_controller.login_success.connect(lambda user: user_controller.set_current_user(user['username']))
 
     navigation_service.setup_close_handlers(app)
     
-    criminals_view.set_criminals_data(criminal_controller.get_all_criminals())
-    
     login_view.show()
     navigation_service.current_view = "login"
-    
-    result = app.exec()
+    startup_profiler.first_window_shown(app)
+    
+    if loop is not None:
+        with loop:
+            result = loop.run_forever()
+            loop.run_until_complete(db_connector.close_async())
+    else:
+        result = app.exec()
     db_connector.close()
+    if data_service is not None:
+        data_service.close()
     
     return result
 
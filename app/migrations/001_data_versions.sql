@@ -0,0 +1,43 @@
+-- Change counters for tables the dashboard reads.
+-- Each INSERT/UPDATE/DELETE/TRUNCATE statement bumps the counter of its table once,
+-- so the application can tell whether cached aggregates are still current with a
+-- single primary-key lookup.
+--
+-- Apply with: psql -d <database> -f migrations/001_data_versions.sql
+
+CREATE TABLE IF NOT EXISTS "Data_versions" (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO "Data_versions" (table_name, version)
+    VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (table_name) DO UPDATE SET version = "Data_versions".version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tracked_table TEXT;
+BEGIN
+    FOREACH tracked_table IN ARRAY ARRAY[
+        'Criminals', 'Physical_characteristics', 'Crimes', 'Cities', 'Criminal_groups',
+        'Professions', 'Criminals_Professions', 'Languages', 'Criminals_Languages'
+    ]
+    LOOP
+        INSERT INTO "Data_versions" (table_name) VALUES (tracked_table)
+        ON CONFLICT (table_name) DO NOTHING;
+
+        EXECUTE format('DROP TRIGGER IF EXISTS bump_data_version ON %I', tracked_table);
+        EXECUTE format(
+            'CREATE TRIGGER bump_data_version
+             AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+             FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()',
+            tracked_table
+        );
+    END LOOP;
+END;
+$$;
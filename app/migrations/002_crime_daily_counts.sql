@@ -0,0 +1,102 @@
+-- Daily crime counts by crime type, location and gang, kept current by triggers.
+-- Trend queries read this rollup instead of scanning "Crimes"; monthly and yearly
+-- series are summed from the daily rows.
+--
+-- Gang is the criminal's current group: moving a criminal to another group moves
+-- their crimes to that group's counts. Unknown values are stored as '' / 0.
+--
+-- Apply with: psql -d <database> -f migrations/002_crime_daily_counts.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "Crime_daily_counts" (
+    day DATE NOT NULL,
+    crime_type VARCHAR(100) NOT NULL DEFAULT '',
+    id_location INTEGER NOT NULL DEFAULT 0,
+    id_group INTEGER NOT NULL DEFAULT 0,
+    crimes INTEGER NOT NULL,
+    PRIMARY KEY (day, crime_type, id_location, id_group)
+);
+
+CREATE OR REPLACE FUNCTION add_crime_count(
+    p_day DATE, p_crime_type TEXT, p_location INTEGER, p_group INTEGER, p_delta INTEGER
+) RETURNS void AS $$
+BEGIN
+    IF p_day IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO "Crime_daily_counts" (day, crime_type, id_location, id_group, crimes)
+    VALUES (p_day, COALESCE(p_crime_type, ''), COALESCE(p_location, 0), COALESCE(p_group, 0), p_delta)
+    ON CONFLICT (day, crime_type, id_location, id_group)
+    DO UPDATE SET crimes = "Crime_daily_counts".crimes + EXCLUDED.crimes;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION crimes_update_daily_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM add_crime_count(
+            OLD.commitment_date, OLD.crime_type, OLD.id_location,
+            (SELECT id_group FROM "Criminals" WHERE id_criminal = OLD.id_criminal), -1
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM add_crime_count(
+            NEW.commitment_date, NEW.crime_type, NEW.id_location,
+            (SELECT id_group FROM "Criminals" WHERE id_criminal = NEW.id_criminal), 1
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION criminals_move_daily_counts() RETURNS trigger AS $$
+BEGIN
+    PERFORM add_crime_count(commitment_date, crime_type, id_location, OLD.id_group, -1),
+            add_crime_count(commitment_date, crime_type, id_location, NEW.id_group, 1)
+    FROM "Crimes"
+    WHERE id_criminal = NEW.id_criminal;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION crimes_truncate_daily_counts() RETURNS trigger AS $$
+BEGIN
+    TRUNCATE "Crime_daily_counts";
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_daily_counts ON "Crimes";
+CREATE TRIGGER update_daily_counts
+    AFTER INSERT OR UPDATE OR DELETE ON "Crimes"
+    FOR EACH ROW EXECUTE FUNCTION crimes_update_daily_counts();
+
+DROP TRIGGER IF EXISTS truncate_daily_counts ON "Crimes";
+CREATE TRIGGER truncate_daily_counts
+    AFTER TRUNCATE ON "Crimes"
+    FOR EACH STATEMENT EXECUTE FUNCTION crimes_truncate_daily_counts();
+
+DROP TRIGGER IF EXISTS move_daily_counts ON "Criminals";
+CREATE TRIGGER move_daily_counts
+    AFTER UPDATE OF id_group ON "Criminals"
+    FOR EACH ROW WHEN (OLD.id_group IS DISTINCT FROM NEW.id_group)
+    EXECUTE FUNCTION criminals_move_daily_counts();
+
+-- Backfill from the existing crimes; no crime can change while the table is rebuilt
+LOCK TABLE "Crimes" IN SHARE MODE;
+TRUNCATE "Crime_daily_counts";
+
+INSERT INTO "Crime_daily_counts" (day, crime_type, id_location, id_group, crimes)
+SELECT cr.commitment_date, COALESCE(cr.crime_type, ''), COALESCE(cr.id_location, 0),
+       COALESCE(c.id_group, 0), COUNT(*)
+FROM "Crimes" cr
+JOIN "Criminals" c ON c.id_criminal = cr.id_criminal
+WHERE cr.commitment_date IS NOT NULL
+GROUP BY 1, 2, 3, 4;
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- Failed login counters shared by every client, per username and per client host.
+-- A counter keeps growing while each failure follows the previous one within the
+-- lockout period and starts over after a quiet period; UserModel refuses logins while
+-- a counter is at its limit. The client host is the address Postgres sees the
+-- connection from, so clients cannot pick their own; the data service names each of its
+-- clients by their local user instead, and over a Unix socket there is no per-host counter
+-- since every client shares the address.
+--
+-- Rows whose last_attempt is older than the lockout period no longer count and may be
+-- deleted at any time.
+--
+-- Apply with: psql -d <database> -f migrations/003_login_attempts.sql
+
+CREATE TABLE IF NOT EXISTS "Login_attempts" (
+    scope VARCHAR(10) NOT NULL CHECK (scope IN ('user', 'host')),
+    key VARCHAR(255) NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_attempt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (scope, key)
+);
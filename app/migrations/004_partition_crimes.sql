@@ -0,0 +1,136 @@
+-- "Crimes" partitioned by year of commitment_date.
+-- Queries bounded by commitment_date read only the partitions of those years, and the
+-- latest crime of a criminal is found through a per-partition index instead of a scan.
+--
+-- Yearly partitions are created by ensure_crime_partitions(from, until), which the
+-- application calls at startup for the current and the next year; crimes dated outside
+-- every partition are kept in "Crimes_default" until their year gets a partition.
+--
+-- The primary key has to contain the partition column, so it becomes
+-- (id_crime, commitment_date) and commitment_date can no longer be NULL. The migration
+-- stops if any crime has no date. Triggers from migrations 001 and 002 are recreated
+-- on the new table when those migrations were applied.
+--
+-- Apply with: psql -d <database> -f migrations/004_partition_crimes.sql
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION ensure_crime_partitions(
+    p_from DATE DEFAULT current_date,
+    p_until DATE DEFAULT (current_date + INTERVAL '1 year')::date
+) RETURNS INTEGER AS $$
+DECLARE
+    year_start DATE := date_trunc('year', p_from)::date;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    -- Clients starting at the same time would otherwise race to create the same partition
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_crime_partitions'));
+
+    WHILE year_start <= p_until LOOP
+        partition_name := 'Crimes_' || extract(year FROM year_start);
+
+        IF to_regclass(quote_ident(partition_name)) IS NULL THEN
+            -- Crimes of this year waiting in the default partition move into the new one.
+            -- Their delete and re-insert cancel out in "Crime_daily_counts".
+            CREATE TEMP TABLE crimes_to_move (LIKE "Crimes") ON COMMIT DROP;
+
+            WITH moved AS (
+                DELETE FROM "Crimes_default"
+                WHERE commitment_date >= year_start
+                  AND commitment_date < year_start + INTERVAL '1 year'
+                RETURNING *
+            )
+            INSERT INTO crimes_to_move SELECT * FROM moved;
+
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF "Crimes" FOR VALUES FROM (%L) TO (%L)',
+                partition_name, year_start, (year_start + INTERVAL '1 year')::date
+            );
+
+            INSERT INTO "Crimes" SELECT * FROM crimes_to_move;
+            DROP TABLE crimes_to_move;
+
+            created := created + 1;
+        END IF;
+
+        year_start := (year_start + INTERVAL '1 year')::date;
+    END LOOP;
+
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+LOCK TABLE "Crimes" IN ACCESS EXCLUSIVE MODE;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM "Crimes" WHERE commitment_date IS NULL) THEN
+        RAISE EXCEPTION 'Crimes without commitment_date cannot be partitioned; set their dates first';
+    END IF;
+END;
+$$;
+
+ALTER TABLE "Crimes" RENAME TO "Crimes_unpartitioned";
+ALTER INDEX "Crimes_pkey" RENAME TO "Crimes_unpartitioned_pkey";
+
+CREATE TABLE "Crimes" (
+    LIKE "Crimes_unpartitioned" INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (id_crime, commitment_date)
+) PARTITION BY RANGE (commitment_date);
+
+ALTER TABLE "Crimes" ALTER COLUMN commitment_date SET NOT NULL;
+
+CREATE TABLE "Crimes_default" PARTITION OF "Crimes" DEFAULT;
+
+-- Latest crime of a criminal: one index probe per partition
+CREATE INDEX "Crimes_id_criminal_commitment_date_idx"
+    ON "Crimes" (id_criminal, commitment_date DESC);
+
+-- Foreign keys of the old table, under the same names
+DO $$
+DECLARE
+    foreign_key RECORD;
+BEGIN
+    FOR foreign_key IN
+        SELECT conname, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE conrelid = '"Crimes_unpartitioned"'::regclass AND contype = 'f'
+    LOOP
+        EXECUTE format('ALTER TABLE "Crimes_unpartitioned" DROP CONSTRAINT %I', foreign_key.conname);
+        EXECUTE format('ALTER TABLE "Crimes" ADD CONSTRAINT %I %s', foreign_key.conname, foreign_key.definition);
+    END LOOP;
+END;
+$$;
+
+SELECT ensure_crime_partitions(
+    LEAST(current_date, (SELECT MIN(commitment_date) FROM "Crimes_unpartitioned")),
+    GREATEST((current_date + INTERVAL '1 year')::date, (SELECT MAX(commitment_date) FROM "Crimes_unpartitioned"))
+);
+
+-- Copied before the triggers exist, so "Crime_daily_counts" is not counted twice
+INSERT INTO "Crimes" SELECT * FROM "Crimes_unpartitioned";
+
+DROP TABLE "Crimes_unpartitioned";
+
+DO $$
+BEGIN
+    IF to_regproc('bump_data_version') IS NOT NULL THEN
+        CREATE TRIGGER bump_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Crimes"
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+    END IF;
+
+    IF to_regproc('crimes_update_daily_counts') IS NOT NULL THEN
+        CREATE TRIGGER update_daily_counts
+            AFTER INSERT OR UPDATE OR DELETE ON "Crimes"
+            FOR EACH ROW EXECUTE FUNCTION crimes_update_daily_counts();
+
+        CREATE TRIGGER truncate_daily_counts
+            AFTER TRUNCATE ON "Crimes"
+            FOR EACH STATEMENT EXECUTE FUNCTION crimes_truncate_daily_counts();
+    END IF;
+END;
+$$;
+
+COMMIT;
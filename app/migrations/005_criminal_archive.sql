@@ -0,0 +1,161 @@
+-- Archive tier for archived criminals.
+-- archive_criminal(id, date) moves a criminal out of the hot tables into one
+-- "Criminal_archive" row, keeping their "Criminals", "Physical_characteristics", "Crimes",
+-- "Criminals_Professions" and "Criminals_Languages" rows as JSONB (compressed by TOAST
+-- once large). The hot tables and their indexes then hold active criminals only, and
+-- queries on them need no is_archived filter.
+--
+-- The "..._with_archive" views return hot and archived rows together in the shape of the
+-- hot tables, for the queries that include archived criminals. A view lists the columns
+-- its table had when it was created; apply this migration again after adding columns.
+--
+-- Archived crimes keep counting in "Crime_daily_counts" (migration 002) until the
+-- archived criminal is deleted. Criminals archived before this migration
+-- (is_archived = TRUE) are moved into the archive, dated by their "Archive" rows or,
+-- without one, by the day of the migration.
+--
+-- Apply with: psql -d <database> -f migrations/005_criminal_archive.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "Criminal_archive" (
+    id_criminal INTEGER PRIMARY KEY,
+    archive_date DATE NOT NULL,
+    criminal JSONB NOT NULL,
+    characteristics JSONB NOT NULL DEFAULT '[]',
+    crimes JSONB NOT NULL DEFAULT '[]',
+    professions JSONB NOT NULL DEFAULT '[]',
+    languages JSONB NOT NULL DEFAULT '[]'
+);
+
+-- Archive list pages, newest first
+CREATE INDEX IF NOT EXISTS "Criminal_archive_archive_date_idx"
+    ON "Criminal_archive" (archive_date DESC, id_criminal DESC);
+
+CREATE OR REPLACE FUNCTION archive_criminal(
+    p_id_criminal INTEGER,
+    p_archive_date DATE DEFAULT current_date
+) RETURNS BOOLEAN AS $$
+DECLARE
+    archived "Criminal_archive"%ROWTYPE;
+BEGIN
+    SELECT
+        c.id_criminal,
+        p_archive_date,
+        to_jsonb(c) || '{"is_archived": true}',
+        COALESCE((SELECT jsonb_agg(to_jsonb(p)) FROM "Physical_characteristics" p WHERE p.id_criminal = c.id_criminal), '[]'),
+        COALESCE((SELECT jsonb_agg(to_jsonb(cr)) FROM "Crimes" cr WHERE cr.id_criminal = c.id_criminal), '[]'),
+        COALESCE((SELECT jsonb_agg(to_jsonb(cp)) FROM "Criminals_Professions" cp WHERE cp.id_criminal = c.id_criminal), '[]'),
+        COALESCE((SELECT jsonb_agg(to_jsonb(cl)) FROM "Criminals_Languages" cl WHERE cl.id_criminal = c.id_criminal), '[]')
+    INTO archived
+    FROM "Criminals" c
+    WHERE c.id_criminal = p_id_criminal
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO "Criminal_archive" SELECT archived.*;
+
+    DELETE FROM "Criminals_Languages" WHERE id_criminal = p_id_criminal;
+    DELETE FROM "Criminals_Professions" WHERE id_criminal = p_id_criminal;
+    DELETE FROM "Physical_characteristics" WHERE id_criminal = p_id_criminal;
+    DELETE FROM "Crimes" WHERE id_criminal = p_id_criminal;
+    DELETE FROM "Archive" WHERE id_criminal = p_id_criminal;
+    DELETE FROM "Criminals" WHERE id_criminal = p_id_criminal;
+
+    -- Deleting the crimes took them out of the trend rollup; archived crimes still count
+    IF to_regproc('add_crime_count') IS NOT NULL THEN
+        PERFORM add_crime_count(
+            cr.commitment_date, cr.crime_type, cr.id_location,
+            (archived.criminal->>'id_group')::INTEGER, 1
+        )
+        FROM jsonb_populate_recordset(NULL::"Crimes", archived.crimes) cr;
+    END IF;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION criminal_archive_delete_counts() RETURNS trigger AS $$
+BEGIN
+    IF to_regproc('add_crime_count') IS NOT NULL THEN
+        PERFORM add_crime_count(
+            cr.commitment_date, cr.crime_type, cr.id_location,
+            (OLD.criminal->>'id_group')::INTEGER, -1
+        )
+        FROM jsonb_populate_recordset(NULL::"Crimes", OLD.crimes) cr;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS delete_archived_counts ON "Criminal_archive";
+CREATE TRIGGER delete_archived_counts
+    AFTER DELETE ON "Criminal_archive"
+    FOR EACH ROW EXECUTE FUNCTION criminal_archive_delete_counts();
+
+CREATE OR REPLACE VIEW "Criminals_with_archive" AS
+    SELECT * FROM "Criminals"
+    UNION ALL
+    SELECT c.*
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::"Criminals", a.criminal) c;
+
+CREATE OR REPLACE VIEW "Physical_characteristics_with_archive" AS
+    SELECT * FROM "Physical_characteristics"
+    UNION ALL
+    SELECT p.*
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_recordset(NULL::"Physical_characteristics", a.characteristics) p;
+
+CREATE OR REPLACE VIEW "Crimes_with_archive" AS
+    SELECT * FROM "Crimes"
+    UNION ALL
+    SELECT cr.*
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_recordset(NULL::"Crimes", a.crimes) cr;
+
+CREATE OR REPLACE VIEW "Criminals_Professions_with_archive" AS
+    SELECT * FROM "Criminals_Professions"
+    UNION ALL
+    SELECT cp.*
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_recordset(NULL::"Criminals_Professions", a.professions) cp;
+
+CREATE OR REPLACE VIEW "Criminals_Languages_with_archive" AS
+    SELECT * FROM "Criminals_Languages"
+    UNION ALL
+    SELECT cl.*
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_recordset(NULL::"Criminals_Languages", a.languages) cl;
+
+DO $$
+BEGIN
+    -- Dashboard caches and the data service notice archive changes (migration 001)
+    IF to_regproc('bump_data_version') IS NOT NULL THEN
+        INSERT INTO "Data_versions" (table_name) VALUES ('Criminal_archive')
+        ON CONFLICT (table_name) DO NOTHING;
+
+        DROP TRIGGER IF EXISTS bump_data_version ON "Criminal_archive";
+        CREATE TRIGGER bump_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Criminal_archive"
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+    END IF;
+END;
+$$;
+
+DO $$
+BEGIN
+    PERFORM archive_criminal(
+        c.id_criminal,
+        COALESCE((SELECT MAX(a.archive_date) FROM "Archive" a WHERE a.id_criminal = c.id_criminal), current_date)
+    )
+    FROM "Criminals" c
+    WHERE c.is_archived = TRUE;
+END;
+$$;
+
+COMMIT;
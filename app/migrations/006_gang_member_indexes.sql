@@ -0,0 +1,32 @@
+-- Indexes for the member list of the gang detail view.
+-- Members are read a page at a time in one of the orders of MEMBER_SORT_KEYS
+-- (mvc/models/criminal_gangs.py). Each order has an index starting with id_group, so a
+-- page is a short index range scan after the previous page's last member, however deep
+-- into the group it is. The member count reads "Criminals_id_group_idx" only.
+--
+-- The name columns are indexed as COALESCE(column, ''), the expressions the member
+-- queries sort and compare by; change them together.
+--
+-- Apply with: psql -d <database> -f migrations/006_gang_member_indexes.sql
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS "Criminals_id_group_idx"
+    ON "Criminals" (id_group, id_criminal);
+
+CREATE INDEX IF NOT EXISTS "Criminals_id_group_last_name_idx"
+    ON "Criminals" (id_group, COALESCE(last_name, ''), COALESCE(first_name, ''), id_criminal);
+
+CREATE INDEX IF NOT EXISTS "Criminals_id_group_first_name_idx"
+    ON "Criminals" (id_group, COALESCE(first_name, ''), COALESCE(last_name, ''), id_criminal);
+
+CREATE INDEX IF NOT EXISTS "Criminals_id_group_nickname_idx"
+    ON "Criminals" (id_group, COALESCE(nickname, ''), id_criminal);
+
+CREATE INDEX IF NOT EXISTS "Criminals_id_group_role_idx"
+    ON "Criminals" (id_group, COALESCE(role, ''), id_criminal);
+
+-- Statistics for the expression indexes
+ANALYZE "Criminals";
+
+COMMIT;
@@ -0,0 +1,246 @@
+-- City coordinates and per-city counts for the dashboard crime map.
+-- "Cities" gets latitude/longitude (degrees, WGS 84), filled from a gazetteer file with
+-- python -m utils.gazetteer <file>. Cities without coordinates are left off the map but
+-- still count towards their country.
+--
+-- "City_counts" holds per city the crimes committed there, the criminals born and living
+-- there and the gangs based there, kept current by triggers. Crimes follow
+-- "Crime_daily_counts" (migration 002), so they are counted like in the trend chart,
+-- archived criminals' crimes included; criminals archived into "Criminal_archive"
+-- (migration 005) keep counting too. "Country_counts" sums the city rows per country and
+-- places each country at the mean position of its cities that have coordinates.
+--
+-- Requires migration 002. A TRUNCATE of a source table recounts everything with
+-- refresh_city_counts().
+--
+-- Apply with: psql -d <database> -f migrations/007_city_map_counts.sql
+
+BEGIN;
+
+ALTER TABLE "Cities"
+    ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+
+ALTER TABLE "Cities" DROP CONSTRAINT IF EXISTS "Cities_coordinates_check";
+ALTER TABLE "Cities" ADD CONSTRAINT "Cities_coordinates_check" CHECK (
+    (latitude IS NULL) = (longitude IS NULL)
+    AND latitude BETWEEN -90 AND 90
+    AND longitude BETWEEN -180 AND 180
+);
+
+CREATE TABLE IF NOT EXISTS "City_counts" (
+    id_city INTEGER PRIMARY KEY,
+    crimes BIGINT NOT NULL DEFAULT 0,
+    births INTEGER NOT NULL DEFAULT 0,
+    residents INTEGER NOT NULL DEFAULT 0,
+    gangs INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION add_city_count(
+    p_city INTEGER, p_crimes BIGINT, p_births INTEGER, p_residents INTEGER, p_gangs INTEGER
+) RETURNS void AS $$
+BEGIN
+    IF p_city IS NULL OR p_city = 0 THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO "City_counts" (id_city, crimes, births, residents, gangs)
+    VALUES (p_city, p_crimes, p_births, p_residents, p_gangs)
+    ON CONFLICT (id_city) DO UPDATE SET
+        crimes = "City_counts".crimes + EXCLUDED.crimes,
+        births = "City_counts".births + EXCLUDED.births,
+        residents = "City_counts".residents + EXCLUDED.residents,
+        gangs = "City_counts".gangs + EXCLUDED.gangs;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION refresh_city_counts() RETURNS void AS $$
+BEGIN
+    TRUNCATE "City_counts";
+
+    INSERT INTO "City_counts" (id_city, crimes, births, residents, gangs)
+    SELECT id_city, SUM(crimes), SUM(births), SUM(residents), SUM(gangs)
+    FROM (
+        SELECT id_location AS id_city, SUM(crimes) AS crimes, 0 AS births, 0 AS residents, 0 AS gangs
+        FROM "Crime_daily_counts"
+        WHERE id_location <> 0
+        GROUP BY 1
+        UNION ALL
+        SELECT place_of_birth_id, 0, COUNT(*), 0, 0
+        FROM "Criminals"
+        WHERE place_of_birth_id IS NOT NULL
+        GROUP BY 1
+        UNION ALL
+        SELECT last_live_place_id, 0, 0, COUNT(*), 0
+        FROM "Criminals"
+        WHERE last_live_place_id IS NOT NULL
+        GROUP BY 1
+        UNION ALL
+        SELECT id_base, 0, 0, 0, COUNT(*)
+        FROM "Criminal_groups"
+        WHERE id_base IS NOT NULL
+        GROUP BY 1
+    ) counts
+    GROUP BY id_city;
+
+    IF to_regclass('"Criminal_archive"') IS NOT NULL THEN
+        PERFORM add_city_count((criminal->>'place_of_birth_id')::INTEGER, 0, 1, 0, 0),
+                add_city_count((criminal->>'last_live_place_id')::INTEGER, 0, 0, 1, 0)
+        FROM "Criminal_archive";
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION daily_counts_update_city_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.id_location = NEW.id_location THEN
+        PERFORM add_city_count(NEW.id_location, NEW.crimes - OLD.crimes, 0, 0, 0);
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM add_city_count(OLD.id_location, -OLD.crimes, 0, 0, 0);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM add_city_count(NEW.id_location, NEW.crimes, 0, 0, 0);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION criminals_update_city_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM add_city_count(OLD.place_of_birth_id, 0, -1, 0, 0),
+                add_city_count(OLD.last_live_place_id, 0, 0, -1, 0);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM add_city_count(NEW.place_of_birth_id, 0, 1, 0, 0),
+                add_city_count(NEW.last_live_place_id, 0, 0, 1, 0);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION groups_update_city_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM add_city_count(OLD.id_base, 0, 0, 0, -1);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM add_city_count(NEW.id_base, 0, 0, 0, 1);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION criminal_archive_update_city_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM add_city_count((OLD.criminal->>'place_of_birth_id')::INTEGER, 0, -1, 0, 0),
+                add_city_count((OLD.criminal->>'last_live_place_id')::INTEGER, 0, 0, -1, 0);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM add_city_count((NEW.criminal->>'place_of_birth_id')::INTEGER, 0, 1, 0, 0),
+                add_city_count((NEW.criminal->>'last_live_place_id')::INTEGER, 0, 0, 1, 0);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION truncate_city_counts() RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_city_counts();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_city_counts ON "Crime_daily_counts";
+CREATE TRIGGER update_city_counts
+    AFTER INSERT OR UPDATE OR DELETE ON "Crime_daily_counts"
+    FOR EACH ROW EXECUTE FUNCTION daily_counts_update_city_counts();
+
+DROP TRIGGER IF EXISTS update_city_counts ON "Criminals";
+CREATE TRIGGER update_city_counts
+    AFTER INSERT OR DELETE OR UPDATE OF place_of_birth_id, last_live_place_id ON "Criminals"
+    FOR EACH ROW EXECUTE FUNCTION criminals_update_city_counts();
+
+DROP TRIGGER IF EXISTS update_city_counts ON "Criminal_groups";
+CREATE TRIGGER update_city_counts
+    AFTER INSERT OR DELETE OR UPDATE OF id_base ON "Criminal_groups"
+    FOR EACH ROW EXECUTE FUNCTION groups_update_city_counts();
+
+DO $$
+DECLARE
+    source_table TEXT;
+BEGIN
+    FOREACH source_table IN ARRAY ARRAY['Crime_daily_counts', 'Criminals', 'Criminal_groups', 'Criminal_archive']
+    LOOP
+        IF to_regclass(format('%I', source_table)) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS truncate_city_counts ON %I', source_table);
+            EXECUTE format(
+                'CREATE TRIGGER truncate_city_counts
+                 AFTER TRUNCATE ON %I
+                 FOR EACH STATEMENT EXECUTE FUNCTION truncate_city_counts()',
+                source_table
+            );
+        END IF;
+    END LOOP;
+
+    IF to_regclass('"Criminal_archive"') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS update_city_counts ON "Criminal_archive";
+        CREATE TRIGGER update_city_counts
+            AFTER INSERT OR UPDATE OR DELETE ON "Criminal_archive"
+            FOR EACH ROW EXECUTE FUNCTION criminal_archive_update_city_counts();
+    END IF;
+
+    -- The map is cached until its source tables change (migration 001)
+    IF to_regproc('bump_data_version') IS NOT NULL THEN
+        INSERT INTO "Data_versions" (table_name) VALUES ('Countries')
+        ON CONFLICT (table_name) DO NOTHING;
+
+        DROP TRIGGER IF EXISTS bump_data_version ON "Countries";
+        CREATE TRIGGER bump_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Countries"
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE VIEW "Country_counts" AS
+    SELECT
+        co.id_country,
+        co.country_name,
+        AVG(ci.latitude) AS latitude,
+        AVG(ci.longitude) AS longitude,
+        COALESCE(SUM(cc.crimes), 0)::BIGINT AS crimes,
+        COALESCE(SUM(cc.births), 0) AS births,
+        COALESCE(SUM(cc.residents), 0) AS residents,
+        COALESCE(SUM(cc.gangs), 0) AS gangs
+    FROM "Countries" co
+    JOIN "Cities" ci ON ci.id_country = co.id_country
+    LEFT JOIN "City_counts" cc ON cc.id_city = ci.id_city
+    GROUP BY co.id_country, co.country_name;
+
+-- Backfill; no source row can change while the counts are rebuilt
+LOCK TABLE "Crime_daily_counts", "Criminals", "Criminal_groups" IN SHARE MODE;
+
+DO $$
+BEGIN
+    IF to_regclass('"Criminal_archive"') IS NOT NULL THEN
+        LOCK TABLE "Criminal_archive" IN SHARE MODE;
+    END IF;
+
+    PERFORM refresh_city_counts();
+END;
+$$;
+
+COMMIT;
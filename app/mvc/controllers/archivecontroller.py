@@ -1,5 +1,8 @@
 from PySide6.QtCore import QObject, Signal, Slot
 
+# Archived criminals read per page; the archive view loads further pages as it is scrolled
+ARCHIVE_PAGE_SIZE = 200
+
 class ArchiveController(QObject):
     criminal_deleted = Signal(int)
     criminal_loaded = Signal(list)
@@ -22,10 +25,10 @@ class ArchiveController(QObject):
             self.operation_error.emit(f"Error deleting archived criminal: {str(e)}")
             return False
     
-    def get_archived_criminals(self):
-        """Get list of archived criminals."""
+    def get_archived_criminals(self, after=None):
+        """Get a page of archived criminals, newest first, starting after the given (archive_date, id_criminal)."""
         try:
-            archived_criminals = self.criminal_model.get_archived_criminals()
+            archived_criminals = self.criminal_model.get_archived_criminals(ARCHIVE_PAGE_SIZE, after)
             self.criminal_loaded.emit(archived_criminals)
             return archived_criminals
         except Exception as e:
@@ -1,5 +1,6 @@
 from PySide6.QtCore import QObject, Signal, Slot, QTimer
 from mvc.models.users import UserModel
+from utils.async_utils import is_async_available, run_async
 
 class AuthController(QObject):
     registration_success = Signal()  
@@ -12,10 +13,42 @@ class AuthController(QObject):
         super().__init__()
         self.user_model = user_model
         self.current_user = None
+        # Set while a password is being hashed or checked, so repeated clicks are not queued up
+        self._busy = False
+    
+    def _run(self, async_call, sync_call, args, on_result, on_failed) -> None:
+        """Run the bcrypt work off the GUI thread when the Qt event loop supports it."""
+        if self._busy:
+            return
+        
+        if not is_async_available():
+            on_result(sync_call(*args))
+            return
+        
+        self._busy = True
+        
+        def _on_result(result):
+            self._busy = False
+            on_result(result)
+        
+        def _on_error(error):
+            self._busy = False
+            on_failed.emit(str(error))
+        
+        run_async(async_call(*args), on_result=_on_result, on_error=_on_error)
     
     @Slot(str, str)
     def register_user(self, username: str, password: str) -> None:
-        success, message = self.user_model.create_user(username, password)
+        self._run(
+            self.user_model.create_user_async,
+            self.user_model.create_user,
+            (username, password),
+            self._on_registered,
+            self.registration_failed
+        )
+    
+    def _on_registered(self, result) -> None:
+        success, message = result
         if success:            
                 self.registration_success.emit() 
         else:
@@ -23,7 +56,16 @@ class AuthController(QObject):
     
     @Slot(str, str)
     def authenticate_user(self, username: str, password: str) -> None:
-        success, result = self.user_model.authenticate(username, password)
+        self._run(
+            self.user_model.authenticate_async,
+            self.user_model.authenticate,
+            (username, password),
+            self._on_authenticated,
+            self.login_failed
+        )
+    
+    def _on_authenticated(self, result) -> None:
+        success, result = result
         
         if success:
             self.current_user = result
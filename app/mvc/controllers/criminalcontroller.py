@@ -1,4 +1,14 @@
-from PySide6.QtCore import QObject, Signal, Slot
+import asyncio
+import heapq
+from PySide6.QtCore import QObject, Signal, Slot, QTimer
+from utils.async_utils import is_async_available, run_async
+from mvc.models.criminals import CRIMINAL_EXPORT_COLUMNS
+from mvc.models.associations import (
+    ALL_RELATIONS, RELATION_BIRTHPLACE, RELATION_CRIME, RELATION_GANG, RELATION_RESIDENCE
+)
+
+# Associates listed per query, nearest first; the total is reported separately
+ASSOCIATE_LIMIT = 1000
 
 class CriminalController(QObject):
     criminal_added = Signal(int)  
@@ -7,14 +17,25 @@ class CriminalController(QObject):
     criminal_deleted = Signal(int) 
     operation_error = Signal(str)
     criminal_details_loaded = Signal(int, object)
+    association_graph_loading = Signal()
+    association_graph_ready = Signal(bool)
     
-    def __init__(self, criminal_model, city_model, profession_model, language_model, criminal_group_model):
+    def __init__(self, criminal_model, city_model, profession_model, language_model, criminal_group_model,
+                 association_model=None):
         super().__init__()
         self.criminal_model = criminal_model
         self.city_model = city_model
         self.profession_model = profession_model
         self.language_model = language_model
         self.criminal_group_model = criminal_group_model
+        self.association_model = association_model
+        
+        self._association_graph = None
+        # Criminals written while the graph is being built, or None when no build is running
+        self._graph_changes = None
+        
+        for signal in (self.criminal_added, self.criminal_updated, self.criminal_archived, self.criminal_deleted):
+            signal.connect(self._refresh_associations)
     
     @Slot(dict)
     def add_criminal(self, data):
@@ -41,7 +62,7 @@ class CriminalController(QObject):
     
     @Slot(int)
     def archive_criminal(self, criminal_id):
-        """Archive a criminal by setting is_archived flag and creating archive record."""
+        """Archive a criminal by moving them into the criminal archive."""
         try:
             success = self.criminal_model.archive_criminal(criminal_id)
             if success:
@@ -119,13 +140,242 @@ class CriminalController(QObject):
             self.operation_error.emit(f"Error retrieving cities: {str(e)}")
             return []
         
-    def get_criminals_for_export(self, include_archived=False):
-        """Get complete criminal data with all related information for export."""
+    async def _load_reference_part(self, kind, loader, on_part_loaded):
+        items = await loader()
+        on_part_loaded(kind, items)
+        return items
+    
+    async def _load_reference_data_async(self, on_part_loaded, criminal_id=None, on_criminal_loaded=None):
+        loaders = {
+            "cities": self.city_model.get_all_cities_async,
+            "professions": self.profession_model.get_all_professions_async,
+            "gangs": self.criminal_group_model.get_all_criminal_groups_async,
+            "languages": self.language_model.get_all_languages_async
+        }
+        parts = [self._load_reference_part(kind, loader, on_part_loaded) for kind, loader in loaders.items()]
+        
+        if criminal_id is None:
+            await asyncio.gather(*parts)
+            return
+        
+        results = await asyncio.gather(*parts, self.criminal_model.get_criminal_by_id_async(criminal_id))
+        if results[-1] is None:
+            raise LookupError(f"criminal {criminal_id} not found")
+        if on_criminal_loaded:
+            on_criminal_loaded(results[-1])
+    
+    def _load_reference_data_sync(self, on_part_loaded, criminal_id=None, on_criminal_loaded=None, on_error=None):
         try:
-            return self.criminal_model.get_criminals_for_export(include_archived)
+            on_part_loaded("cities", self.city_model.get_all_cities())
+            on_part_loaded("professions", self.profession_model.get_all_professions())
+            on_part_loaded("gangs", self.criminal_group_model.get_all_criminal_groups())
+            on_part_loaded("languages", self.language_model.get_all_languages())
+            
+            if criminal_id is None:
+                return
+            
+            criminal = self.criminal_model.get_criminal_by_id(criminal_id)
+            if criminal is None:
+                raise LookupError(f"criminal {criminal_id} not found")
+            if on_criminal_loaded:
+                on_criminal_loaded(criminal)
         except Exception as e:
-            self.operation_error.emit(f"Error exporting criminals: {str(e)}")
-            return []
+            self._reference_data_failed(e, on_error)
+    
+    def _reference_data_failed(self, error, on_error):
+        message = f"Error retrieving reference data: {str(error)}"
+        self.operation_error.emit(message)
+        if on_error:
+            on_error(message)
+    
+    def load_reference_data(self, on_part_loaded, criminal_id=None, on_criminal_loaded=None, on_error=None):
+        """Load reference lists for the criminal forms without blocking the form from showing.
+
+        on_part_loaded(kind, items) is called for "cities", "professions", "gangs" and "languages"
+        as each one arrives. If criminal_id is given, on_criminal_loaded(criminal) is called once
+        all reference lists are in place, so the record can be selected in the filled widgets.
+        If a list or the record cannot be loaded, operation_error is emitted and on_error(message)
+        is called instead, so the form can stop waiting for the rest.
+        """
+        if not is_async_available():
+            QTimer.singleShot(0, lambda: self._load_reference_data_sync(
+                on_part_loaded, criminal_id, on_criminal_loaded, on_error
+            ))
+            return
+        
+        run_async(
+            self._load_reference_data_async(on_part_loaded, criminal_id, on_criminal_loaded),
+            on_error=lambda e: self._reference_data_failed(e, on_error)
+        )
+        
+    def _build_association_graph(self):
+        # numpy is loaded with the first association query rather than at startup
+        from mvc.models.association_graph import AssociationGraph
+        return AssociationGraph.from_rows(self.association_model.iter_memberships())
+    
+    def load_association_graph(self, reload=False):
+        """Build the association graph off the GUI thread, unless it is built already.
+
+        association_graph_loading is emitted when a build starts and association_graph_ready(ok)
+        when the graph can be queried, or failed to build. With reload the graph is rebuilt,
+        picking up changes made by other clients.
+        """
+        if self._graph_changes is not None:
+            return
+        if self._association_graph is not None and not reload:
+            self.association_graph_ready.emit(True)
+            return
+        
+        self._graph_changes = set()
+        self.association_graph_loading.emit()
+        if not is_async_available():
+            QTimer.singleShot(0, self._build_association_graph_sync)
+            return
+        
+        run_async(
+            asyncio.to_thread(self._build_association_graph),
+            on_result=self._association_graph_built,
+            on_error=self._association_graph_failed
+        )
+    
+    def reload_association_graph(self):
+        """Rebuild the association graph in the background, picking up changes made by other clients."""
+        self.load_association_graph(reload=True)
+    
+    def _build_association_graph_sync(self):
+        try:
+            graph = self._build_association_graph()
+        except Exception as e:
+            self._association_graph_failed(e)
+            return
+        self._association_graph_built(graph)
+    
+    def _association_graph_built(self, graph):
+        changes, self._graph_changes = self._graph_changes, None
+        self._association_graph = graph
+        if changes:
+            # Writes made during the build may have been read before they were committed
+            self._refresh_associations_of(changes)
+        
+        # Unless applying them failed and started another build
+        if self._graph_changes is None:
+            self.association_graph_ready.emit(True)
+    
+    def _association_graph_failed(self, error):
+        self._graph_changes = None
+        self.operation_error.emit(f"Error building association graph: {str(error)}")
+        self.association_graph_ready.emit(self._association_graph is not None)
+    
+    def _get_association_graph(self):
+        if self._association_graph is None:
+            raise RuntimeError("the association graph is not loaded yet")
+        return self._association_graph
+    
+    @Slot(int)
+    def _refresh_associations(self, criminal_id):
+        """Apply this client's write to the association graph, if it has been built."""
+        if self._graph_changes is not None:
+            self._graph_changes.add(criminal_id)
+        self._refresh_associations_of([criminal_id])
+    
+    def _refresh_associations_of(self, criminal_ids):
+        if self._association_graph is None:
+            return
+        
+        criminal_ids = list(criminal_ids)
+        try:
+            self._association_graph.update_criminals(criminal_ids, self.association_model.get_memberships(criminal_ids))
+        except Exception:
+            # Queries wait for a rebuild rather than use a graph missing the write
+            self._association_graph = None
+            self.load_association_graph()
+    
+    def _criminal_names(self, criminal_ids):
+        labels = self.association_model.get_criminal_labels(criminal_ids)
+        return {
+            label["id"]: " ".join(filter(None, (label["first_name"], label["last_name"])))
+            + (f" ({label['nickname']})" if label["nickname"] else "")
+            for label in labels
+        }
+    
+    def _link_text(self, attribute, groups, cities):
+        relation, key, day = attribute
+        if relation == RELATION_GANG:
+            return f"Угруповання: {groups.get(key, key)}"
+        if relation == RELATION_CRIME:
+            return f"Злочин: {cities.get(key, key)}, {day.isoformat()}"
+        if relation == RELATION_BIRTHPLACE:
+            return f"Місце народження: {cities.get(key, key)}"
+        if relation == RELATION_RESIDENCE:
+            return f"Місце проживання: {cities.get(key, key)}"
+        return ""
+    
+    def get_associates(self, criminal_id, hops=1, relations=ALL_RELATIONS):
+        """Criminals at most hops links away, nearest first, and how many there are in total.
+
+        Each associate is a dict with id, name and hops; at most ASSOCIATE_LIMIT are returned.
+        """
+        try:
+            found = self._get_association_graph().neighbourhood(criminal_id, hops, relations)
+            nearest = heapq.nsmallest(ASSOCIATE_LIMIT, found, key=lambda associate_id: (found[associate_id], associate_id))
+            names = self._criminal_names(nearest)
+            return [
+                {"id": associate_id, "name": names.get(associate_id, ""), "hops": found[associate_id]}
+                for associate_id in nearest
+            ], len(found)
+        except Exception as e:
+            self.operation_error.emit(f"Error retrieving associates: {str(e)}")
+            return [], 0
+    
+    def get_association_path(self, from_id, to_id, relations=ALL_RELATIONS):
+        """Shortest chain of links between two criminals as dicts with id, name and link, or None.
+
+        link describes what the criminal shares with the previous one in the chain.
+        """
+        try:
+            steps = self._get_association_graph().shortest_path(from_id, to_id, relations)
+            if steps is None:
+                return None
+            
+            names = self._criminal_names([criminal_id for criminal_id, _ in steps])
+            # Only the gangs and cities the path goes through are looked up
+            links = [attribute for _, attribute in steps if attribute]
+            group_ids = {key for relation, key, _ in links if relation == RELATION_GANG}
+            city_ids = {key for relation, key, _ in links if relation != RELATION_GANG}
+            groups = {group["id"]: group["name"] for group in self.association_model.get_group_labels(group_ids)}
+            cities = {city["id"]: city["name"] for city in self.association_model.get_city_labels(city_ids)}
+            return [
+                {
+                    "id": criminal_id,
+                    "name": names.get(criminal_id, ""),
+                    "link": self._link_text(attribute, groups, cities) if attribute else ""
+                }
+                for criminal_id, attribute in steps
+            ]
+        except Exception as e:
+            self.operation_error.emit(f"Error retrieving association path: {str(e)}")
+            return None
+    
+    def get_association_component(self, criminal_id, relations=ALL_RELATIONS):
+        """Criminals linked to the criminal through any number of links, and how many there are in total.
+
+        At most ASSOCIATE_LIMIT are returned, as dicts with id and name.
+        """
+        try:
+            members = self._get_association_graph().component(criminal_id, relations)
+            shown = heapq.nsmallest(ASSOCIATE_LIMIT, members)
+            names = self._criminal_names(shown)
+            return [{"id": member_id, "name": names.get(member_id, "")} for member_id in shown], len(members)
+        except Exception as e:
+            self.operation_error.emit(f"Error retrieving connected criminals: {str(e)}")
+            return [], 0
+    
+    def stream_criminals_for_export(self, include_archived=False, start_date=None, end_date=None):
+        """Column headings and batches of export rows, read from the database while the file is written.
+
+        Dates limit the export to criminals with a crime in that range.
+        """
+        return CRIMINAL_EXPORT_COLUMNS, self.criminal_model.iter_criminals_for_export(include_archived, start_date, end_date)
         
     def show_criminal_details(self, criminal_id):
         """Get and display detailed information about a criminal."""
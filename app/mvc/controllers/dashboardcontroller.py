@@ -1,18 +1,146 @@
 from PySide6.QtCore import QObject, Signal, Slot
+from sqlalchemy import exc
+
+EXPORT_TABLES = (
+    "Criminals", "Physical_characteristics", "Crimes", "Cities", "Criminal_groups",
+    "Professions", "Criminals_Professions", "Languages", "Criminals_Languages", "Criminal_archive"
+)
+
+# Tables each dashboard dataset and chart is computed from
+DATA_TABLES = {
+    "export": EXPORT_TABLES,
+    "professions": ("Criminals", "Professions", "Criminals_Professions", "Criminal_archive"),
+    "languages": ("Criminals", "Languages", "Criminals_Languages", "Criminal_archive"),
+    "profession_crime_types": ("Criminals", "Crimes", "Professions", "Criminals_Professions", "Criminal_archive"),
+    "crime_trends": ("Criminals", "Crimes", "Criminal_groups"),
+    "city_counts": ("Criminals", "Crimes", "Criminal_groups", "Criminal_archive", "Cities", "Countries")
+}
+
+CHART_TABLES = {
+    "crime_types": ("Criminals", "Crimes", "Criminal_archive"),
+    "temporal": DATA_TABLES["crime_trends"],
+    "age": ("Criminals", "Criminal_archive"),
+    "gangs": ("Criminals", "Criminal_groups", "Criminal_archive"),
+    "cross_filter": ("Criminals", "Crimes", "Criminal_groups", "Criminal_archive"),
+    "profession": DATA_TABLES["professions"],
+    "language": DATA_TABLES["languages"],
+    "profession_crime_type": DATA_TABLES["profession_crime_types"],
+    "crime_map": DATA_TABLES["city_counts"]
+}
+
+# SQLSTATE of "relation does not exist", raised on tables a migration has not created yet
+UNDEFINED_TABLE = "42P01"
+
+def _is_missing_table(error) -> bool:
+    if not isinstance(error, exc.ProgrammingError):
+        return False
+    # psycopg 3 reports the SQLSTATE as sqlstate, psycopg2 as pgcode
+    return UNDEFINED_TABLE in (getattr(error.orig, "sqlstate", None), getattr(error.orig, "pgcode", None))
 
 class DashboardController(QObject):
     dashboard_loaded = Signal()
     operation_error = Signal(str)
     
-    def __init__(self, criminal_model, city_model, crime_model=None):
+    def __init__(self, criminal_model, city_model, crime_model=None, data_version_model=None):
         super().__init__()
         self.criminal_model = criminal_model
         self.city_model = city_model
         self.crime_model = crime_model
+        self.data_version_model = data_version_model
+        
+        self._cache = {}
+        self._versions = None
+    
+    def refresh_data_versions(self):
+        """Read table change counters; cached results are reused while they match."""
+        self._versions = None
+        if self.data_version_model is None:
+            return
+        
+        try:
+            self._versions = self.data_version_model.get_versions()
+        except Exception:
+            # Without the Data_versions table everything is simply reloaded every time
+            self._versions = None
+    
+    def _version_token(self, tables):
+        if self._versions is None:
+            return None
+        return tuple(self._versions.get(table, 0) for table in tables)
+    
+    def _cached(self, key, loader):
+        token = self._version_token(DATA_TABLES[key])
+        cached = self._cache.get(key)
+        if token is not None and cached is not None and cached[0] == token:
+            return cached[1]
+        
+        value = loader()
+        # None means the data is not available yet; it is asked for again next time
+        if token is not None and value is not None:
+            self._cache[key] = (token, value)
+        return value
+    
+    def get_chart_versions(self):
+        """Version token per chart, or None when data versions are unavailable."""
+        if self._versions is None:
+            return None
+        return {chart: self._version_token(tables) for chart, tables in CHART_TABLES.items()}
     
     def get_dashboard_data(self):
         try:
-            return self.criminal_model.get_criminals_for_export(include_archived=True)
+            return self._cached(
+                "export",
+                lambda: self.criminal_model.get_criminals_for_export(include_archived=True)
+            )
         except Exception as e:
             self.operation_error.emit(f"Error retrieving dashboard data: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+    
+    def get_dashboard_frequencies(self):
+        """Get profession and language counts aggregated from the link tables."""
+        try:
+            return {
+                "professions": self._cached(
+                    "professions",
+                    lambda: self.criminal_model.get_profession_frequencies(include_archived=True)
+                ),
+                "languages": self._cached(
+                    "languages",
+                    lambda: self.criminal_model.get_language_frequencies(include_archived=True)
+                ),
+                "profession_crime_types": self._cached(
+                    "profession_crime_types",
+                    lambda: self.criminal_model.get_profession_crime_type_counts(include_archived=True)
+                ),
+                "crime_trends": self._cached("crime_trends", self._get_crime_trends),
+                "city_counts": self._cached("city_counts", self._get_city_counts)
+            }
+        except Exception as e:
+            self.operation_error.emit(f"Error retrieving dashboard frequencies: {str(e)}")
+            return {}
+    
+    def _get_crime_trends(self):
+        """Monthly crime counts by type and gang from the daily rollup, or None without it."""
+        if self.crime_model is None:
+            return None
+        
+        try:
+            return self.crime_model.get_crime_trends("month", ("crime_type", "gang"))
+        except Exception as e:
+            # Before migrations/002_crime_daily_counts.sql the temporal chart uses the export dates
+            if _is_missing_table(e):
+                return None
+            raise
+    
+    def _get_city_counts(self):
+        """Per-city and per-country counts for the crime map, or None without them."""
+        try:
+            return {
+                "cities": self.city_model.get_city_counts(),
+                "countries": self.city_model.get_country_counts()
+            }
+        except Exception as e:
+            # Before migrations/007_city_map_counts.sql the map shows that it has no data
+            if _is_missing_table(e):
+                return None
+            raise
\ No newline at end of file
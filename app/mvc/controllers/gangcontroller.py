@@ -1,4 +1,14 @@
+import asyncio
+from collections import OrderedDict
+
 from PySide6.QtCore import QObject, Signal, Slot
+from mvc.models.criminal_gangs import GROUP_EXPORT_COLUMNS
+from utils.async_utils import is_async_available, run_async
+
+# Members shown per page of the gang detail view; further pages load as it is scrolled
+MEMBER_PAGE_SIZE = 100
+# Gangs whose first member page is kept from hovering in the gang list until opened
+MEMBER_PREFETCH_LIMIT = 8
 
 class GangController(QObject):
     gang_added = Signal(int)
@@ -10,6 +20,9 @@ class GangController(QObject):
         super().__init__()
         self.criminal_group_model = criminal_group_model
         self.city_model = city_model
+        
+        self._prefetched = OrderedDict()
+        self._prefetching = set()
     
     @Slot(dict)
     def add_gang(self, data):
@@ -59,6 +72,8 @@ class GangController(QObject):
     
     def get_all_gangs(self):
         """Get all criminal groups."""
+        # The gang list is reloaded whenever gangs or criminals may have changed
+        self._prefetched.clear()
         try:
             return self.criminal_group_model.get_all_criminal_groups()
         except Exception as e:
@@ -81,10 +96,61 @@ class GangController(QObject):
             self.operation_error.emit(f"Error retrieving gang members: {str(e)}")
             return []
             
-    def get_gangs_for_export(self):
-        """Get complete criminal group data with all related information for export."""
+    def get_gang_members_page(self, gang_id, sort_key="last_name", descending=False, after=None):
+        """Get a page of gang members in the given order, continuing after the member record after."""
+        try:
+            return self.criminal_group_model.get_members_page(gang_id, sort_key, descending, MEMBER_PAGE_SIZE, after)
+        except Exception as e:
+            self.operation_error.emit(f"Error retrieving gang members: {str(e)}")
+            return []
+    
+    def get_gang_details(self, gang_id):
+        """Gang record, member count and first member page for the gang detail view.
+
+        The count and page prefetched while the gang was hovered are used once, when fresh.
+        """
         try:
-            return self.criminal_group_model.get_groups_for_export()
+            gang = self.criminal_group_model.get_group_by_id(gang_id)
+            prefetched = self._prefetched.pop(gang_id, None)
+            if prefetched is not None:
+                member_count, members = prefetched
+            else:
+                member_count = self.criminal_group_model.count_members(gang_id)
+                members = self.criminal_group_model.get_members_page(gang_id, limit=MEMBER_PAGE_SIZE)
+            return gang, member_count, members
         except Exception as e:
-            self.operation_error.emit(f"Error exporting criminal groups: {str(e)}")
-            return []
\ No newline at end of file
+            self.operation_error.emit(f"Error retrieving criminal group: {str(e)}")
+            return None, 0, []
+    
+    async def _prefetch_members_async(self, gang_id):
+        return await asyncio.gather(
+            self.criminal_group_model.count_members_async(gang_id),
+            self.criminal_group_model.get_members_page_async(gang_id, limit=MEMBER_PAGE_SIZE)
+        )
+    
+    def _store_prefetched(self, gang_id, result):
+        self._prefetching.discard(gang_id)
+        self._prefetched[gang_id] = tuple(result)
+        while len(self._prefetched) > MEMBER_PREFETCH_LIMIT:
+            self._prefetched.popitem(last=False)
+    
+    def _drop_prefetch(self, gang_id):
+        # A failed prefetch is not reported; opening the gang loads the members again
+        self._prefetching.discard(gang_id)
+    
+    @Slot(int)
+    def prefetch_gang_members(self, gang_id):
+        """Start loading the first member page of a hovered gang, so opening it shows members at once."""
+        if not is_async_available() or gang_id in self._prefetched or gang_id in self._prefetching:
+            return
+        
+        self._prefetching.add(gang_id)
+        run_async(
+            self._prefetch_members_async(gang_id),
+            on_result=lambda result: self._store_prefetched(gang_id, result),
+            on_error=lambda _: self._drop_prefetch(gang_id)
+        )
+    
+    def stream_gangs_for_export(self):
+        """Column headings and batches of export rows, read from the database while the file is written."""
+        return GROUP_EXPORT_COLUMNS, self.criminal_group_model.iter_groups_for_export()
\ No newline at end of file
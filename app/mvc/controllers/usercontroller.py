@@ -1,5 +1,6 @@
 from PySide6.QtCore import QObject, Signal, Slot
 from mvc.models.users import UserModel
+from utils.async_utils import is_async_available, run_async
 
 class UserController(QObject):
     password_changed = Signal(bool, str)
@@ -25,8 +26,16 @@ class UserController(QObject):
             self.password_changed.emit(False, "Паролі не співпадають")
             return
             
-        success, message = self.user_model.change_password(self.current_username, new_password)
-        self.password_changed.emit(success, message)
+        if not is_async_available():
+            self.password_changed.emit(*self.user_model.change_password(self.current_username, new_password))
+            return
+        
+        # Hashing the new password takes as long as a login; keep it off the GUI thread
+        run_async(
+            self.user_model.change_password_async(self.current_username, new_password),
+            on_result=lambda result: self.password_changed.emit(*result),
+            on_error=lambda e: self.password_changed.emit(False, str(e))
+        )
 
     def set_current_user(self, username: str) -> None:
         self.current_username = username
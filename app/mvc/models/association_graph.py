@@ -0,0 +1,348 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from mvc.models.associations import ALL_RELATIONS, RELATION_CRIME
+
+# Compact the overlay of changed criminals into the CSR arrays past this size
+MIN_COMPACT_OVERLAY = 1000
+COMPACT_OVERLAY_SHARE = 0.01
+
+_EPOCH = date(1970, 1, 1)
+_DAY_OFFSET = 1 << 23
+_EMPTY = np.empty(0, dtype=np.int64)
+
+# Parent entries of _Search: not reached yet, and the criminal the search started from
+_UNREACHED = -1
+_ROOT = -2
+
+def decode_attribute(code):
+    """(relation, key, day) of an attribute code; day is a date for crimes, otherwise None."""
+    code = int(code)
+    day_bits = code & 0xFFFFFF
+    day = _EPOCH + timedelta(days=day_bits - _DAY_OFFSET) if day_bits else None
+    return code >> 56, (code >> 24) & 0xFFFFFFFF, day
+
+def _codes(relations, keys, days):
+    """One int64 per shared attribute: relation, gang or city id and, for crimes, the day.
+
+    Codes sort by relation first, and the attributes of a graph are found by binary search.
+    """
+    codes = (relations << 56) | (keys << 24)
+    crimes = relations == RELATION_CRIME
+    codes[crimes] |= days[crimes] + _DAY_OFFSET
+    return codes
+
+def _csr(rows, columns, row_count):
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(row_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=row_count), out=indptr[1:])
+    return indptr, columns[order]
+
+def _gather(indptr, indices, rows):
+    """Concatenated CSR rows, and the row each value came from."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return _EMPTY, _EMPTY
+
+    positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+    return indices[positions], np.repeat(rows, lengths)
+
+def _link(parent, children, sources):
+    """Set the parent of children not reached yet; returns them once each with their parent.
+
+    Of several sources reaching the same child one wins the assignment, and only its pair
+    is kept, which removes duplicates without sorting.
+    """
+    new = parent[children] == _UNREACHED
+    children, sources = children[new], sources[new]
+    parent[children] = sources
+    kept = parent[children] == sources
+    return children[kept], sources[kept]
+
+class _Search:
+    """State of a breadth-first search from one criminal, advanced half a hop at a time.
+
+    A hop goes from criminals to their attributes and from those to the criminals sharing
+    them; after each half the frontier holds the attributes or criminals just reached.
+    """
+    def __init__(self, graph, source, relations):
+        self.graph = graph
+        self.relations = relations
+        self.hops = np.full(len(graph._ids), -1, dtype=np.int32)
+        self.node_parent = np.full(len(graph._ids), _UNREACHED, dtype=np.int32)
+        self.attribute_parent = np.full(len(graph._codes), _UNREACHED, dtype=np.int32)
+
+        self.hops[source] = 0
+        self.node_parent[source] = _ROOT
+        self.frontier = np.asarray([source], dtype=np.int64)
+        self.at_nodes = True
+
+    def step(self):
+        if self.at_nodes:
+            attributes, sources = self.graph._attributes_of(self.frontier, self.relations)
+            self.frontier, _ = _link(self.attribute_parent, attributes, sources)
+        else:
+            nodes, sources = self.graph._nodes_of(self.frontier)
+            nodes, sources = _link(self.node_parent, nodes, sources)
+            self.hops[nodes] = self.hops[self.attribute_parent[sources]] + 1
+            self.frontier = nodes
+        self.at_nodes = not self.at_nodes
+
+    def hop(self):
+        self.step()
+        self.step()
+
+    def trail(self, node):
+        """(node, attribute) steps from the source to node; the source's attribute is None."""
+        steps = []
+        while self.node_parent[node] != _ROOT:
+            attribute = self.node_parent[node]
+            steps.append((node, attribute))
+            node = self.attribute_parent[attribute]
+        steps.append((node, None))
+        return steps[::-1]
+
+class AssociationGraph:
+    """Criminals linked through the gangs, crimes, birthplaces and residences they share.
+
+    Stored as a bipartite graph between criminals and shared attributes (a gang, a crime
+    location and day, a city) in two CSR arrays, criminal to attributes and back. A gang of
+    n members is n entries instead of n * n edges, and one hop between criminals is two
+    vectorised gathers. Nodes are numbered by position in the sorted criminal ids.
+
+    Criminals changed after the build are kept in a small overlay that replaces their CSR
+    rows, and the overlay is folded into new CSR arrays once it grows.
+    """
+    def __init__(self, criminal_ids, member_ids, relations, keys, days):
+        """Build from one row per criminal and one per (criminal, relation, key, day) membership.
+
+        days are days since 1970-01-01 for crimes and are ignored for other relations.
+        """
+        self._build(
+            np.unique(np.asarray(criminal_ids, dtype=np.int64)),
+            np.asarray(member_ids, dtype=np.int64),
+            _codes(
+                np.asarray(relations, dtype=np.int64),
+                np.asarray(keys, dtype=np.int64),
+                np.asarray(days, dtype=np.int64)
+            )
+        )
+
+    @classmethod
+    def from_rows(cls, batches):
+        """Build from batches of (id_criminal, relation, key, day) rows; relation 0 rows list the criminals."""
+        rows = [np.asarray(batch, dtype=np.int64).reshape(-1, 4) for batch in batches]
+        rows = np.concatenate(rows) if rows else np.empty((0, 4), dtype=np.int64)
+
+        nodes = rows[:, 1] == 0
+        members = rows[~nodes]
+        return cls(rows[nodes, 0], members[:, 0], members[:, 1], members[:, 2], members[:, 3])
+
+    def _build(self, ids, member_ids, codes):
+        self._ids = ids
+        self._codes, member_attributes = np.unique(codes, return_inverse=True)
+        member_nodes = np.searchsorted(ids, member_ids)
+
+        # Memberships of criminals missing from the criminal list are dropped
+        known = member_nodes < len(ids)
+        known[known] = ids[member_nodes[known]] == member_ids[known]
+        member_nodes, member_attributes = member_nodes[known], member_attributes[known]
+
+        self._node_indptr, self._node_attributes = _csr(member_nodes, member_attributes, len(ids))
+        self._attribute_indptr, self._attribute_nodes = _csr(member_attributes, member_nodes, len(self._codes))
+
+        self._base_nodes = len(ids)
+        self._base_attributes = len(self._codes)
+        self._present = np.ones(len(ids), dtype=bool)
+        self._changed = np.zeros(len(ids), dtype=bool)
+        self._overlay = {}
+        self._extra_nodes = {}
+        self._extra_attributes = {}
+        self._update_overlay_arrays()
+
+    @property
+    def node_count(self):
+        return int(self._present.sum())
+
+    @property
+    def membership_count(self):
+        return len(self._node_attributes) + len(self._overlay_attributes)
+
+    def _node(self, criminal_id, present=True):
+        position = int(np.searchsorted(self._ids[:self._base_nodes], criminal_id))
+        if position < self._base_nodes and self._ids[position] == criminal_id:
+            node = position
+        else:
+            node = self._extra_nodes.get(criminal_id)
+
+        if node is None or (present and not self._present[node]):
+            return None
+        return node
+
+    def _criminal_ids(self, nodes):
+        return [int(self._ids[node]) for node in nodes]
+
+    def _attribute(self, code):
+        position = int(np.searchsorted(self._codes[:self._base_attributes], code))
+        if position < self._base_attributes and self._codes[position] == code:
+            return position
+
+        attribute = self._extra_attributes.get(code)
+        if attribute is None:
+            attribute = len(self._codes)
+            self._codes = np.append(self._codes, np.int64(code))
+            self._extra_attributes[code] = attribute
+        return attribute
+
+    def _update_overlay_arrays(self):
+        nodes = list(self._overlay)
+        attributes = [self._overlay[node] for node in nodes]
+        lengths = [len(node_attributes) for node_attributes in attributes]
+
+        self._overlay_nodes = np.repeat(np.asarray(nodes, dtype=np.int64), lengths)
+        self._overlay_attributes = np.concatenate(attributes) if attributes else _EMPTY
+
+    def update_criminals(self, criminal_ids, rows):
+        """Replace the memberships of the given criminals with rows read for them from the database.
+
+        rows are (id_criminal, relation, key, day) as for from_rows; criminals without a
+        relation 0 row were deleted or archived and leave the graph.
+        """
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1, 4)
+        existing = set(rows[rows[:, 1] == 0, 0].tolist())
+
+        for criminal_id in criminal_ids:
+            node = self._node(criminal_id, present=False)
+            if node is None and criminal_id in existing:
+                node = len(self._ids)
+                self._ids = np.append(self._ids, np.int64(criminal_id))
+                self._present = np.append(self._present, True)
+                self._extra_nodes[criminal_id] = node
+            if node is None:
+                continue
+
+            if node < self._base_nodes:
+                self._changed[node] = True
+
+            own = rows[(rows[:, 0] == criminal_id) & (rows[:, 1] != 0)]
+            codes = np.unique(_codes(own[:, 1], own[:, 2], own[:, 3]))
+            self._overlay[node] = np.asarray([self._attribute(code) for code in codes], dtype=np.int64)
+            self._present[node] = criminal_id in existing
+
+        self._update_overlay_arrays()
+        if len(self._overlay) > max(MIN_COMPACT_OVERLAY, COMPACT_OVERLAY_SHARE * self._base_nodes):
+            self.compact()
+
+    def compact(self):
+        """Fold the overlay of changed criminals into new CSR arrays."""
+        base_attributes, base_nodes = _gather(
+            self._node_indptr, self._node_attributes,
+            np.flatnonzero(~self._changed)
+        )
+        nodes = np.concatenate([base_nodes, self._overlay_nodes])
+        attributes = np.concatenate([base_attributes, self._overlay_attributes])
+
+        present = self._present[nodes]
+        # Criminals added since the build are appended to _ids; _build needs them sorted
+        ids = np.sort(self._ids[self._present])
+        self._build(ids, self._ids[nodes[present]], self._codes[attributes[present]])
+
+    def _attributes_of(self, nodes, relations):
+        """Attributes of the given nodes that are of the chosen relations, with the node each came from."""
+        base = nodes[nodes < self._base_nodes]
+        attributes, sources = _gather(self._node_indptr, self._node_attributes, base[~self._changed[base]])
+
+        in_overlay = np.isin(self._overlay_nodes, nodes)
+        attributes = np.concatenate([attributes, self._overlay_attributes[in_overlay]])
+        sources = np.concatenate([sources, self._overlay_nodes[in_overlay]])
+
+        wanted = ((self._codes[attributes] >> 56) & relations) != 0
+        return attributes[wanted], sources[wanted]
+
+    def _nodes_of(self, attributes):
+        """Present nodes sharing the given attributes, with the attribute each was reached through."""
+        base = attributes[attributes < self._base_attributes]
+        nodes, sources = _gather(self._attribute_indptr, self._attribute_nodes, base)
+        current = ~self._changed[nodes]
+        nodes, sources = nodes[current], sources[current]
+
+        in_overlay = np.isin(self._overlay_attributes, attributes)
+        nodes = np.concatenate([nodes, self._overlay_nodes[in_overlay]])
+        sources = np.concatenate([sources, self._overlay_attributes[in_overlay]])
+
+        present = self._present[nodes]
+        return nodes[present], sources[present]
+
+    def neighbourhood(self, criminal_id, hops=1, relations=ALL_RELATIONS):
+        """Criminals at most hops links away, as {criminal_id: hops}, without the criminal itself."""
+        source = self._node(criminal_id)
+        if source is None:
+            return {}
+
+        search = _Search(self, source, relations)
+        for _ in range(hops):
+            if not len(search.frontier):
+                break
+            search.hop()
+
+        nodes = np.flatnonzero(search.hops > 0)
+        return dict(zip(self._criminal_ids(nodes), search.hops[nodes].tolist()))
+
+    def shortest_path(self, from_id, to_id, relations=ALL_RELATIONS):
+        """Fewest links from one criminal to another, or None if they are not connected.
+
+        A list of (criminal_id, attribute) steps starting at from_id; attribute is the
+        (relation, key, day) the criminal shares with the previous one, None for the first.
+        """
+        source, target = self._node(from_id), self._node(to_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [(from_id, None)]
+
+        # Searched from both ends, each time advancing the side with the smaller frontier,
+        # until a criminal or attribute is reached from both
+        forward, backward = _Search(self, source, relations), _Search(self, target, relations)
+        while len(forward.frontier) and len(backward.frontier):
+            search, other = (forward, backward) if len(forward.frontier) <= len(backward.frontier) else (backward, forward)
+            search.step()
+
+            if search.at_nodes:
+                met = search.frontier[other.hops[search.frontier] >= 0]
+                if len(met):
+                    middle = met[np.argmin(search.hops[met] + other.hops[met])]
+                    return self._path(forward.trail(middle), backward.trail(middle))
+            else:
+                met = search.frontier[other.attribute_parent[search.frontier] >= 0]
+                if len(met):
+                    lengths = search.hops[search.attribute_parent[met]] + other.hops[other.attribute_parent[met]]
+                    attribute = met[np.argmin(lengths)]
+                    # Continue the forward trail through the shared attribute to the backward side's criminal
+                    node = backward.attribute_parent[attribute]
+                    return self._path(forward.trail(forward.attribute_parent[attribute]) + [(node, attribute)], backward.trail(node))
+        return None
+
+    def _path(self, forward_trail, backward_trail):
+        """Steps of the path walking forward_trail, then backward_trail from its end to its start."""
+        steps = forward_trail + [
+            (node, attribute)
+            for (node, _), (_, attribute) in zip(backward_trail[-2::-1], backward_trail[:0:-1])
+        ]
+        return [
+            (int(self._ids[node]), None if attribute is None else decode_attribute(self._codes[attribute]))
+            for node, attribute in steps
+        ]
+
+    def component(self, criminal_id, relations=ALL_RELATIONS):
+        """Ids of every criminal connected to the criminal by any number of links, itself included."""
+        source = self._node(criminal_id)
+        if source is None:
+            return []
+
+        search = _Search(self, source, relations)
+        while len(search.frontier):
+            search.step()
+        return self._criminal_ids(np.flatnonzero(search.hops >= 0))
@@ -0,0 +1,116 @@
+from functools import lru_cache
+from sqlalchemy import text
+
+from mvc.models.records import map_rows, record_type
+from mvc.models.statements import read_only
+from mvc.models.streaming import DEFAULT_BATCH_SIZE, stream_batches
+
+# Relations two criminals can share; combine them with | to choose which links a query follows
+RELATION_GANG = 1
+RELATION_CRIME = 2
+RELATION_BIRTHPLACE = 4
+RELATION_RESIDENCE = 8
+ALL_RELATIONS = RELATION_GANG | RELATION_CRIME | RELATION_BIRTHPLACE | RELATION_RESIDENCE
+
+# (id_criminal, relation, key, day) rows for AssociationGraph: relation 0 lists every
+# criminal, the others what they share. Crimes link criminals who committed one at the
+# same location on the same day; days are counted from 1970-01-01.
+MEMBERSHIPS_TEMPLATE = f"""
+    SELECT c.id_criminal, 0, 0, 0
+    FROM "Criminals" c
+    WHERE TRUE {{criminals}}
+    UNION ALL
+    SELECT c.id_criminal, {RELATION_GANG}, c.id_group, 0
+    FROM "Criminals" c
+    WHERE c.id_group IS NOT NULL {{criminals}}
+    UNION ALL
+    SELECT c.id_criminal, {RELATION_BIRTHPLACE}, c.place_of_birth_id, 0
+    FROM "Criminals" c
+    WHERE c.place_of_birth_id IS NOT NULL {{criminals}}
+    UNION ALL
+    SELECT c.id_criminal, {RELATION_RESIDENCE}, c.last_live_place_id, 0
+    FROM "Criminals" c
+    WHERE c.last_live_place_id IS NOT NULL {{criminals}}
+    UNION ALL
+    SELECT DISTINCT cr.id_criminal, {RELATION_CRIME}, cr.id_location, cr.commitment_date - DATE '1970-01-01'
+    FROM "Crimes" cr
+    WHERE cr.id_location IS NOT NULL AND cr.commitment_date IS NOT NULL {{crimes}}
+"""
+
+CRIMINAL_LABELS_QUERY = text("""
+    SELECT id_criminal AS id, first_name, last_name, nickname
+    FROM "Criminals"
+    WHERE id_criminal = ANY(:ids)
+""")
+
+GROUP_LABELS_QUERY = text("""
+    SELECT group_id AS id, name
+    FROM "Criminal_groups"
+    WHERE group_id = ANY(:ids)
+""")
+
+CITY_LABELS_QUERY = text("""
+    SELECT id_city AS id, city_name AS name
+    FROM "Cities"
+    WHERE id_city = ANY(:ids)
+""")
+
+CriminalLabelRecord = record_type("CriminalLabelRecord", ["id", "first_name", "last_name", "nickname"])
+LabelRecord = record_type("LabelRecord", ["id", "name"])
+
+@lru_cache(maxsize=None)
+def _memberships_query(selected):
+    """All memberships, or with selected those of the criminals in :ids."""
+    return text(MEMBERSHIPS_TEMPLATE.format(
+        criminals="AND c.id_criminal = ANY(:ids)" if selected else "",
+        crimes="AND cr.id_criminal = ANY(:ids)" if selected else ""
+    ))
+
+class AssociationModel:
+    """Reads the links between criminals that AssociationGraph is built from."""
+    def __init__(self, engine, async_engine=None, read_engine=None):
+        self.engine = engine
+        self.async_engine = async_engine
+        self.read_engine = read_engine or read_only(engine)
+
+    def iter_memberships(self, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield every (id_criminal, relation, key, day) row in lists of at most batch_size."""
+        return stream_batches(self.read_engine, _memberships_query(False), None, tuple, batch_size)
+
+    def get_memberships(self, criminal_ids):
+        """(id_criminal, relation, key, day) rows of the given criminals, read from the primary.
+
+        Used right after this client's own writes, which a replica may not have yet.
+        """
+        try:
+            with read_only(self.engine).connect() as conn:
+                result = conn.execute(_memberships_query(True), {"ids": list(criminal_ids)})
+                return [tuple(row) for row in result]
+        except Exception as e:
+            raise e
+
+    def get_criminal_labels(self, criminal_ids):
+        try:
+            with self.read_engine.connect() as conn:
+                result = conn.execute(CRIMINAL_LABELS_QUERY, {"ids": list(criminal_ids)})
+                return map_rows(CriminalLabelRecord, result)
+        except Exception as e:
+            raise e
+
+    def get_group_labels(self, group_ids):
+        """Names of the given gangs, for describing the links between criminals."""
+        return self._get_labels(GROUP_LABELS_QUERY, group_ids)
+
+    def get_city_labels(self, city_ids):
+        """Names of the given cities, for describing the links between criminals."""
+        return self._get_labels(CITY_LABELS_QUERY, city_ids)
+
+    def _get_labels(self, query, ids):
+        if not ids:
+            return []
+        try:
+            with self.read_engine.connect() as conn:
+                result = conn.execute(query, {"ids": list(ids)})
+                return map_rows(LabelRecord, result)
+        except Exception as e:
+            raise e
@@ -1,57 +1,160 @@
 from sqlalchemy import text
 
+from mvc.models.statements import read_only, run_read_async
+from mvc.models.records import map_row, map_rows, record_type
+
+CITY_COLUMNS = """
+    c.id_city AS id, c.city_name AS name, co.country_name AS country,
+    CONCAT(c.city_name, ', ', co.country_name) AS display_name
+"""
+
+ALL_CITIES_QUERY = text(f"""
+    SELECT {CITY_COLUMNS}
+    FROM "Cities" c
+    JOIN "Countries" co ON c.id_country = co.id_country
+    ORDER BY co.country_name, c.city_name
+""")
+
+CITY_BY_ID_QUERY = text(f"""
+    SELECT {CITY_COLUMNS}
+    FROM "Cities" c
+    JOIN "Countries" co ON c.id_country = co.id_country
+    WHERE c.id_city = :id
+""")
+
+# Map aggregates from "City_counts" and "Country_counts" (migrations/007_city_map_counts.sql)
+MAP_COUNT_COLUMNS = ["crimes", "births", "residents", "gangs"]
+ANY_MAP_COUNT = " OR ".join(f"{column} > 0" for column in MAP_COUNT_COLUMNS)
+
+CITY_COUNTS_QUERY = text(f"""
+    SELECT
+        c.id_city AS id, c.city_name AS name, co.country_name AS country,
+        c.latitude, c.longitude, cc.crimes, cc.births, cc.residents, cc.gangs
+    FROM "City_counts" cc
+    JOIN "Cities" c ON cc.id_city = c.id_city
+    LEFT JOIN "Countries" co ON c.id_country = co.id_country
+    WHERE {ANY_MAP_COUNT}
+""")
+
+COUNTRY_COUNTS_QUERY = text(f"""
+    SELECT id_country AS id, country_name AS name, latitude, longitude, crimes, births, residents, gangs
+    FROM "Country_counts"
+    WHERE {ANY_MAP_COUNT}
+""")
+
+# Coordinates of the cities matching a gazetteer entry by city and country name, case-insensitively
+SET_COORDINATES_QUERY = text("""
+    UPDATE "Cities" c
+    SET latitude = g.latitude, longitude = g.longitude
+    FROM unnest(
+        CAST(:cities AS TEXT[]), CAST(:countries AS TEXT[]),
+        CAST(:latitudes AS DOUBLE PRECISION[]), CAST(:longitudes AS DOUBLE PRECISION[])
+    ) AS g(city, country, latitude, longitude), "Countries" co
+    WHERE co.id_country = c.id_country
+      AND lower(c.city_name) = lower(g.city)
+      AND lower(co.country_name) = lower(g.country)
+    RETURNING c.id_city
+""")
+
+CITIES_WITHOUT_COORDINATES_QUERY = text(f"""
+    SELECT {CITY_COLUMNS}
+    FROM "Cities" c
+    JOIN "Countries" co ON c.id_country = co.id_country
+    WHERE c.latitude IS NULL
+    ORDER BY co.country_name, c.city_name
+""")
+
+CityRecord = record_type("CityRecord", ["id", "name", "country", "display_name"])
+CityCountRecord = record_type("CityCountRecord", ["id", "name", "country", "latitude", "longitude"] + MAP_COUNT_COLUMNS)
+CountryCountRecord = record_type("CountryCountRecord", ["id", "name", "latitude", "longitude"] + MAP_COUNT_COLUMNS)
+
+def _all_cities(conn):
+    return map_rows(CityRecord, conn.execute(ALL_CITIES_QUERY))
+
 class CityModel:
-    def __init__(self, engine):
+    def __init__(self, engine, async_engine=None, read_engine=None):
         self.engine = engine
+        self.async_engine = async_engine
+        # Read-only methods may be served by a replica (DatabaseConnector.read_engine)
+        self.read_engine = read_engine or read_only(engine)
     
     def get_all_cities(self):
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(
-                    text("""
-                    SELECT c.id_city, c.city_name, co.country_name
-                    FROM "Cities" c
-                    JOIN "Countries" co ON c.id_country = co.id_country
-                    ORDER BY co.country_name, c.city_name
-                    """)
-                )
-                
-                cities = []
-                for row in result.fetchall():
-                    cities.append({
-                        "id": row[0],
-                        "name": row[1],
-                        "country": row[2],
-                        "display_name": f"{row[1]}, {row[2]}"
-                    })
-                
-                return cities
+            with self.read_engine.connect() as conn:
+                return _all_cities(conn)
                 
         except Exception as e:
             raise e
     
+    async def get_all_cities_async(self):
+        return await run_read_async(self.async_engine, self.read_engine, _all_cities)
+    
     def get_city_by_id(self, city_id):
+        try:
+            with self.read_engine.connect() as conn:
+                result = conn.execute(CITY_BY_ID_QUERY, {"id": city_id})
+                
+                return map_row(CityRecord, result)
+                
+        except Exception as e:
+            raise e
+    
+    def get_city_counts(self):
+        """Crimes, births, residents and gangs per city with any of them, coordinates None if unknown."""
+        try:
+            with self.read_engine.connect() as conn:
+                result = conn.execute(CITY_COUNTS_QUERY)
+                
+                return map_rows(CityCountRecord, result)
+                
+        except Exception as e:
+            raise e
+    
+    def get_country_counts(self):
+        """Per-country sums of get_city_counts, placed at the mean position of the country's cities."""
+        try:
+            with self.read_engine.connect() as conn:
+                result = conn.execute(COUNTRY_COUNTS_QUERY)
+                
+                return map_rows(CountryCountRecord, result)
+                
+        except Exception as e:
+            raise e
+    
+    def set_coordinates(self, entries):
+        """Set coordinates from (city, country, latitude, longitude) gazetteer entries.
+        
+        Names are matched case-insensitively; the first entry for a city wins.
+        Returns how many cities were updated.
+        """
+        matched = {}
+        for city, country, latitude, longitude in entries:
+            city, country = city.strip(), country.strip()
+            matched.setdefault((city.lower(), country.lower()), (city, country, latitude, longitude))
+        
+        params = {"cities": [], "countries": [], "latitudes": [], "longitudes": []}
+        for city, country, latitude, longitude in matched.values():
+            params["cities"].append(city)
+            params["countries"].append(country)
+            params["latitudes"].append(latitude)
+            params["longitudes"].append(longitude)
+        
         try:
             with self.engine.connect() as conn:
-                result = conn.execute(
-                    text("""
-                    SELECT c.id_city, c.city_name, co.country_name
-                    FROM "Cities" c
-                    JOIN "Countries" co ON c.id_country = co.id_country
-                    WHERE c.id_city = :id
-                    """),
-                    {"id": city_id}
-                )
-                
-                row = result.fetchone()
-                if row:
-                    return {
-                        "id": row[0],
-                        "name": row[1],
-                        "country": row[2],
-                        "display_name": f"{row[1]}, {row[2]}"
-                    }
-                return None
+                updated = len(conn.execute(SET_COORDINATES_QUERY, params).fetchall())
+                conn.commit()
+                
+                return updated
+                
+        except Exception as e:
+            raise e
+    
+    def get_cities_without_coordinates(self):
+        try:
+            with self.engine.connect() as conn:
+                result = conn.execute(CITIES_WITHOUT_COORDINATES_QUERY)
+                
+                return map_rows(CityRecord, result)
                 
         except Exception as e:
             raise e
\ No newline at end of file
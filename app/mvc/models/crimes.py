@@ -0,0 +1,107 @@
+from functools import lru_cache
+from sqlalchemy import text
+
+from mvc.models.statements import read_only
+
+TREND_PERIODS = ("day", "month", "year")
+
+PARTITION_FUNCTION_QUERY = text("SELECT to_regprocedure('ensure_crime_partitions(date, date)') IS NOT NULL")
+ENSURE_PARTITIONS_QUERY = text("SELECT ensure_crime_partitions()")
+
+# Columns a trend series can be split by, read from the rollup and its lookup tables, as
+# (key, label). Series are grouped by the key, so gangs or cities sharing a name stay apart;
+# a key other than the label is returned as "<dimension>_id".
+TREND_DIMENSIONS = {
+    "crime_type": ("NULLIF(r.crime_type, '')", None),
+    "location": ("r.id_location", "ci.city_name"),
+    "gang": ("r.id_group", "g.name")
+}
+
+def _trend_columns(group_by):
+    """(expression, name) of the selected columns after the period, in row order."""
+    columns = []
+    for dimension in group_by:
+        key, label = TREND_DIMENSIONS[dimension]
+        if label is None:
+            columns.append((key, dimension))
+        else:
+            columns += [(key, f"{dimension}_id"), (label, dimension)]
+    return columns
+
+@lru_cache(maxsize=None)
+def _trend_query(group_by):
+    """Statement for one combination of split dimensions, built once so it can stay prepared."""
+    columns = [f"{expression} AS {name}" for expression, name in _trend_columns(group_by)]
+    # A label depends on its key only, so grouping by it as well splits nothing further
+    group_columns = ", ".join(str(position) for position in range(1, len(columns) + 2))
+
+    return text(f"""
+        SELECT
+            date_trunc(:period, r.day)::date AS period,
+            {"".join(column + ", " for column in columns)}SUM(r.crimes) AS crimes
+        FROM "Crime_daily_counts" r
+        LEFT JOIN "Cities" ci ON r.id_location = ci.id_city
+        LEFT JOIN "Criminal_groups" g ON r.id_group = g.group_id
+        WHERE (CAST(:start_date AS DATE) IS NULL OR r.day >= CAST(:start_date AS DATE))
+          AND (CAST(:end_date AS DATE) IS NULL OR r.day <= CAST(:end_date AS DATE))
+        GROUP BY {group_columns}
+        HAVING SUM(r.crimes) > 0
+        ORDER BY 1
+    """)
+
+class CrimeModel:
+    """Crime statistics read from "Crime_daily_counts" (migrations/002_crime_daily_counts.sql)."""
+    def __init__(self, engine, read_engine=None):
+        self.engine = engine
+        self.read_engine = read_engine or read_only(engine)
+
+    def ensure_partitions(self):
+        """Create the yearly "Crimes" partitions of this and the next year that are missing.
+
+        Returns how many were created, or None if "Crimes" is not partitioned
+        (migrations/004_partition_crimes.sql).
+        """
+        try:
+            with self.engine.connect() as conn:
+                if not conn.execute(PARTITION_FUNCTION_QUERY).scalar():
+                    return None
+
+                created = conn.execute(ENSURE_PARTITIONS_QUERY).scalar()
+                conn.commit()
+                return created
+
+        except Exception as e:
+            raise e
+
+    def get_crime_trends(self, period="month", group_by=(), start_date=None, end_date=None):
+        """Get number of crimes per period, optionally split by crime type, location and gang.
+
+        Split by location or gang, rows also carry the city's or gang's id ("location_id",
+        "gang_id"), since names need not be unique.
+        """
+        if period not in TREND_PERIODS:
+            raise ValueError(f"Unknown trend period: {period}")
+
+        unknown = [dimension for dimension in group_by if dimension not in TREND_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown trend dimensions: {', '.join(unknown)}")
+
+        try:
+            with self.read_engine.connect() as conn:
+                result = conn.execute(
+                    _trend_query(tuple(group_by)),
+                    {"period": period, "start_date": start_date, "end_date": end_date}
+                )
+
+                names = [name for _, name in _trend_columns(tuple(group_by))]
+                trends = []
+                for row in result:
+                    trend = {"period": row[0].strftime("%Y-%m-%d")}
+                    trend.update(zip(names, row[1:-1]))
+                    trend["count"] = row[-1]
+                    trends.append(trend)
+
+                return trends
+
+        except Exception as e:
+            raise e
@@ -1,76 +1,190 @@
+from functools import lru_cache
 from sqlalchemy import text
 
+from mvc.models.statements import next_id_query, read_only, run_read_async
+from mvc.models.records import map_rows, record_type
+from mvc.models.streaming import DEFAULT_BATCH_SIZE, stream_batches
+
+ALL_GROUPS_QUERY = text("""
+    WITH leader_info AS (
+        SELECT 
+            c.id_group,
+            CONCAT(c.first_name,' ',c.last_name) AS leader_name
+        FROM "Criminals" c
+        WHERE c.role = 'лідер'
+    )
+    SELECT 
+        g.group_id AS id, g.name, g.founding_date, g.number_of_members,
+        g.main_activity, c.city_name AS base_location, c.id_city AS base_id,
+        COALESCE(l.leader_name, 'Невідомо') AS leader_name,
+        COUNT(cr.id_criminal) AS active_members
+    FROM "Criminal_groups" g
+    LEFT JOIN "Cities" c ON g.id_base = c.id_city
+    LEFT JOIN "Criminals" cr ON g.group_id = cr.id_group
+    LEFT JOIN leader_info l ON g.group_id = l.id_group
+    GROUP BY g.group_id, c.city_name, c.id_city, l.leader_name
+    ORDER BY g.name
+""")
+
+GROUP_DETAIL_QUERY = text("""
+    SELECT 
+        g.group_id, g.name, g.founding_date, g.number_of_members,
+        g.main_activity, g.status, g.id_base,
+        c.city_name AS base_location, c.id_city AS base_id,
+        COUNT(cr.id_criminal) AS active_members
+    FROM "Criminal_groups" g
+    LEFT JOIN "Cities" c ON g.id_base = c.id_city
+    LEFT JOIN "Criminals" cr ON g.group_id = cr.id_group
+    WHERE g.group_id = :id
+    GROUP BY g.group_id, c.city_name, c.id_city
+""")
+
+EXPORT_GROUPS_QUERY = text("""
+    WITH leader_info AS (
+        SELECT 
+            c.id_group,
+            CONCAT(c.first_name,' ',c.last_name) AS leader_name
+        FROM "Criminals" c
+        WHERE c.role = 'лідер'
+    )
+    SELECT 
+        g.group_id, g.name, g.founding_date, g.number_of_members,
+        g.main_activity, g.status, c.city_name AS base_location,
+        l.leader_name,
+        COUNT(cr.id_criminal) AS active_members
+    FROM "Criminal_groups" g
+    LEFT JOIN "Cities" c ON g.id_base = c.id_city
+    LEFT JOIN "Criminals" cr ON g.group_id = cr.id_group
+    LEFT JOIN leader_info l ON g.group_id = l.id_group
+    GROUP BY g.group_id, c.city_name, l.leader_name
+    ORDER BY g.name
+""")
+
+MEMBER_COUNT_QUERY = text("""
+    SELECT COUNT(*) FROM "Criminals" WHERE id_group = :group_id
+""")
+
+# Sort orders of the member list: the columns compared after id_group, id_criminal breaks
+# ties. Each matches an index of migrations/006_gang_member_indexes.sql, so a page is read
+# from the index position of the previous page's last member instead of counting past an offset.
+MEMBER_SORT_KEYS = {
+    "id": (),
+    "first_name": ("first_name", "last_name"),
+    "last_name": ("last_name", "first_name"),
+    "nickname": ("nickname",),
+    "role": ("role",)
+}
+
+MEMBER_PAGE_TEMPLATE = """
+    SELECT 
+        c.id_criminal AS id, c.first_name, c.last_name, c.nickname, c.role,
+        p.height, p.weight
+    FROM "Criminals" c
+    LEFT JOIN "Physical_characteristics" p ON c.id_criminal = p.id_criminal
+    WHERE c.id_group = :group_id {after}
+    ORDER BY {order}
+    LIMIT :limit
+"""
+
+@lru_cache(maxsize=None)
+def _member_page_query(sort_key, descending, paged):
+    # NULL names compare as '' so the row comparison of the keyset never meets a NULL
+    columns = [f"COALESCE(c.{column}, '')" for column in MEMBER_SORT_KEYS[sort_key]] + ["c.id_criminal"]
+    direction = " DESC" if descending else ""
+    after = ""
+    if paged:
+        params = ", ".join(f":after_{position}" for position in range(len(columns)))
+        after = f"AND ({', '.join(columns)}) {'<' if descending else '>'} ({params})"
+    
+    return text(MEMBER_PAGE_TEMPLATE.format(
+        after=after,
+        order=", ".join(column + direction for column in columns)
+    ))
+
+def _member_page_params(group_id, sort_key, limit, after):
+    params = {"group_id": group_id, "limit": limit}
+    if after is not None:
+        values = [after.get(column) or "" for column in MEMBER_SORT_KEYS[sort_key]] + [after.get("id")]
+        params.update((f"after_{position}", value) for position, value in enumerate(values))
+    return params
+
+# Rows of the group list, filled by column name; founding_date stays a date
+GroupRecord = record_type("GroupRecord", [
+    "id", "name", "founding_date", "number_of_members", "main_activity",
+    "base_location", "base_id", "leader_name", "active_members"
+])
+
+MemberRecord = record_type("MemberRecord", [
+    "id", "first_name", "last_name", "nickname", "role", "height", "weight"
+])
+
+def _all_groups(conn):
+    return map_rows(GroupRecord, conn.execute(ALL_GROUPS_QUERY))
+
+def _members_page(conn, group_id, sort_key, descending, limit, after):
+    result = conn.execute(
+        _member_page_query(sort_key, descending, after is not None),
+        _member_page_params(group_id, sort_key, limit, after)
+    )
+    return map_rows(MemberRecord, result)
+
+def _member_count(conn, group_id):
+    return conn.execute(MEMBER_COUNT_QUERY, {"group_id": group_id}).scalar()
+
+# Column headings of the export file, in the order of the values in export records
+GROUP_EXPORT_COLUMNS = (
+    "ID", "Назва", "Дата заснування", "Кількість членів", "Основна діяльність",
+    "Статус", "Місце бази", "Лідер", "Кількість заарештованих членів"
+)
+
+def _group_export_record(row):
+    """Values of one export file row, in GROUP_EXPORT_COLUMNS order."""
+    return (
+        row[0],
+        row[1],
+        row[2].strftime("%Y-%m-%d") if row[2] else "",
+        row[3] or 0,
+        row[4] or "",
+        row[5] or "",
+        row[6] or "",
+        row[7] or "Невідомо",
+        row[8] or 0
+    )
+
 class CriminalGroupModel:
-    def __init__(self, engine):
+    def __init__(self, engine, async_engine=None, read_engine=None):
         self.engine = engine
+        self.async_engine = async_engine
+        # Read-only methods may be served by a replica (DatabaseConnector.read_engine)
+        self.read_engine = read_engine or read_only(engine)
     
     def get_next_id(self, table_name, id_column):
         try:
-            with self.engine.connect() as conn:
-                query = f"SELECT COALESCE(MAX({id_column}), 0) + 1 FROM \"{table_name}\""
-                result = conn.execute(text(query))
-                return result.scalar()
+            # On the primary, so an id committed moments ago is never handed out again
+            with read_only(self.engine).connect() as conn:
+                return conn.execute(next_id_query(table_name, id_column)).scalar()
         except Exception as e:
             raise e
     
     def get_all_criminal_groups(self):
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text("""
-                WITH leader_info AS (
-                    SELECT 
-                        c.id_group,
-                        CONCAT(c.first_name,' ',c.last_name) AS leader_name
-                    FROM "Criminals" c
-                    WHERE c.role = 'лідер' AND c.is_archived = FALSE
-                )
-                SELECT 
-                    g.group_id, g.name, g.founding_date, g.number_of_members,
-                    g.main_activity, c.city_name AS base_location, c.id_city AS base_id,
-                    l.leader_name,
-                    COUNT(cr.id_criminal) AS active_members
-                FROM "Criminal_groups" g
-                LEFT JOIN "Cities" c ON g.id_base = c.id_city
-                LEFT JOIN "Criminals" cr ON g.group_id = cr.id_group AND cr.is_archived = FALSE
-                LEFT JOIN leader_info l ON g.group_id = l.id_group
-                GROUP BY g.group_id, c.city_name, c.id_city, l.leader_name
-                ORDER BY g.name
-                """))
-                
-                groups = []
-                for row in result.fetchall():
-                    groups.append({
-                        "id": row[0],
-                        "name": row[1],
-                        "founding_date": row[2].strftime("%Y-%m-%d") if row[2] else None,
-                        "number_of_members": row[3],
-                        "main_activity": row[4],
-                        "base_location": row[5],
-                        "base_id": row[6],
-                        "leader_name": row[7] or 'Невідомо',
-                        "active_members": row[8]
-                    })
-                
-                return groups
+            with self.read_engine.connect() as conn:
+                return _all_groups(conn)
                 
         except Exception as e:
             raise e
     
+    def iter_criminal_groups(self, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield the records of get_all_criminal_groups in lists of at most batch_size."""
+        return stream_batches(self.read_engine, ALL_GROUPS_QUERY, None, GroupRecord, batch_size)
+    
+    async def get_all_criminal_groups_async(self):
+        return await run_read_async(self.async_engine, self.read_engine, _all_groups)
+    
     def get_group_by_id(self, group_id):
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text("""
-                SELECT 
-                    g.group_id, g.name, g.founding_date, g.number_of_members,
-                    g.main_activity, g.status, g.id_base,
-                    c.city_name AS base_location, c.id_city AS base_id,
-                    COUNT(cr.id_criminal) AS active_members
-                FROM "Criminal_groups" g
-                LEFT JOIN "Cities" c ON g.id_base = c.id_city
-                LEFT JOIN "Criminals" cr ON g.group_id = cr.id_group AND cr.is_archived = FALSE
-                WHERE g.group_id = :id
-                GROUP BY g.group_id, c.city_name, c.id_city
-                """), {"id": group_id})
+            with self.read_engine.connect() as conn:
+                result = conn.execute(GROUP_DETAIL_QUERY, {"id": group_id})
                 
                 row = result.fetchone()
                 if row:
@@ -168,8 +282,9 @@ class CriminalGroupModel:
         try:
             with self.engine.connect() as conn:
                 with conn.begin() as transaction:
+                    # Archived members count too: the archive still shows their group
                     result = conn.execute(
-                        text("SELECT COUNT(*) FROM \"Criminals\" WHERE id_group = :id"),
+                        text("SELECT COUNT(*) FROM \"Criminals_with_archive\" WHERE id_group = :id"),
                         {"id": group_id}
                     )
                     count = result.scalar()
@@ -189,80 +304,65 @@ class CriminalGroupModel:
     
     def get_members_by_group_id(self, group_id):
         try:
-            with self.engine.connect() as conn:
+            with self.read_engine.connect() as conn:
                 result = conn.execute(
                     text("""
                     SELECT 
-                        c.id_criminal, c.first_name, c.last_name, c.nickname, c.role,
+                        c.id_criminal AS id, c.first_name, c.last_name, c.nickname, c.role,
                         p.height, p.weight
                     FROM "Criminals" c
                     LEFT JOIN "Physical_characteristics" p ON c.id_criminal = p.id_criminal
-                    WHERE c.id_group = :group_id AND c.is_archived = FALSE
+                    WHERE c.id_group = :group_id
                     ORDER BY c.last_name, c.first_name
                     """),
                     {"group_id": group_id}
                 )
                 
-                members = []
-                for row in result.fetchall():
-                    members.append({
-                        "id": row[0],
-                        "first_name": row[1],
-                        "last_name": row[2],
-                        "nickname": row[3],
-                        "role": row[4],
-                        "height": row[5],
-                        "weight": row[6]
-                    })
+                return map_rows(MemberRecord, result)
                 
-                return members
+        except Exception as e:
+            raise e
+    
+    def get_members_page(self, group_id, sort_key="last_name", descending=False, limit=100, after=None):
+        """Get up to limit members of a group in the order of MEMBER_SORT_KEYS[sort_key].
+
+        after is the last member record of the previous page; the page continues right after it.
+        """
+        try:
+            with self.read_engine.connect() as conn:
+                return _members_page(conn, group_id, sort_key, descending, limit, after)
                 
         except Exception as e:
             raise e
     
+    async def get_members_page_async(self, group_id, sort_key="last_name", descending=False, limit=100, after=None):
+        return await run_read_async(
+            self.async_engine, self.read_engine, _members_page, group_id, sort_key, descending, limit, after
+        )
+    
+    def count_members(self, group_id):
+        """Number of active members of a group, counted from the group's member index."""
+        try:
+            with self.read_engine.connect() as conn:
+                return _member_count(conn, group_id)
+        except Exception as e:
+            raise e
+    
+    async def count_members_async(self, group_id):
+        return await run_read_async(self.async_engine, self.read_engine, _member_count, group_id)
+    
     def get_groups_for_export(self):
         """Get complete criminal group data with all related information for export, including leader information."""
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(
-                    text("""
-                    WITH leader_info AS (
-                        SELECT 
-                            c.id_group,
-                            CONCAT(c.first_name,' ',c.last_name) AS leader_name
-                        FROM "Criminals" c
-                        WHERE c.role = 'лідер' AND c.is_archived = FALSE
-                    )
-                    SELECT 
-                        g.group_id, g.name, g.founding_date, g.number_of_members,
-                        g.main_activity, g.status, c.city_name AS base_location,
-                        l.leader_name,
-                        COUNT(cr.id_criminal) AS active_members
-                    FROM "Criminal_groups" g
-                    LEFT JOIN "Cities" c ON g.id_base = c.id_city
-                    LEFT JOIN "Criminals" cr ON g.group_id = cr.id_group AND cr.is_archived = FALSE
-                    LEFT JOIN leader_info l ON g.group_id = l.id_group
-                    GROUP BY g.group_id, c.city_name, l.leader_name
-                    ORDER BY g.name
-                    """)
-                )
-                
-                groups_data = []
-                for row in result:
-                    data = {
-                        "ID": row[0],
-                        "Назва": row[1],
-                        "Дата заснування": row[2].strftime("%Y-%m-%d") if row[2] else "",
-                        "Кількість членів": row[3] or 0,
-                        "Основна діяльність": row[4] or "",
-                        "Статус": row[5] or "",
-                        "Місце бази": row[6] or "",
-                        "Лідер": row[7] or "Невідомо",
-                        "Кількість заарештованих членів": row[8] or 0
-                    }
-                    groups_data.append(data)
-                
-                return groups_data
+            return [
+                dict(zip(GROUP_EXPORT_COLUMNS, record))
+                for batch in self.iter_groups_for_export()
+                for record in batch
+            ]
                 
         except Exception as e:
-            raise e
\ No newline at end of file
+            raise e
+    
+    def iter_groups_for_export(self, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield export rows as lists of value tuples in GROUP_EXPORT_COLUMNS order, batch_size at a time."""
+        return stream_batches(self.read_engine, EXPORT_GROUPS_QUERY, None, _group_export_record, batch_size)
\ No newline at end of file
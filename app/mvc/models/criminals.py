@@ -1,16 +1,411 @@
+from functools import lru_cache
 from sqlalchemy import text
 from datetime import datetime
 
+from mvc.models.statements import next_id_query, read_only, run_read_async
+from mvc.models.records import map_rows, record_type
+from mvc.models.streaming import DEFAULT_BATCH_SIZE, stream_batches
+
+CRIMINAL_DETAIL_QUERY = text("""
+    SELECT 
+        c.id_criminal, c.first_name, c.last_name, c.nickname,
+        c.place_of_birth_id, c.date_of_birth, c.last_live_place_id, c.is_archived,
+        c.id_group, c.role,
+        p.height, p.weight, p.hair_color, p.eye_color, p.distinguishing_features,
+        bp.city_name as birth_place, lp.city_name as last_place,
+        g.name as group_name
+    FROM "Criminals" c
+    JOIN "Physical_characteristics" p ON c.id_criminal = p.id_criminal
+    LEFT JOIN "Cities" bp ON c.place_of_birth_id = bp.id_city
+    LEFT JOIN "Cities" lp ON c.last_live_place_id = lp.id_city
+    LEFT JOIN "Criminal_groups" g ON c.id_group = g.group_id
+    WHERE c.id_criminal = :id
+""")
+
+LAST_CRIME_QUERY = text("""
+    SELECT 
+        crime_name, commitment_date, id_location, court_sentence,
+        c.city_name as location_name, cr.crime_type
+    FROM "Crimes" cr
+    LEFT JOIN "Cities" c ON cr.id_location = c.id_city
+    WHERE cr.id_criminal = :id
+    ORDER BY cr.commitment_date DESC
+    LIMIT 1
+""")
+
+CRIMINAL_PROFESSIONS_QUERY = text("""
+    SELECT p.id_profession, p.profession_name
+    FROM "Professions" p
+    JOIN "Criminals_Professions" cp ON p.id_profession = cp.id_profession
+    WHERE cp.id_criminal = :id
+""")
+
+CRIMINAL_LANGUAGES_QUERY = text("""
+    SELECT l.id_language, l.name
+    FROM "Languages" l
+    JOIN "Criminals_Languages" cl ON l.id_language = cl.id_language
+    WHERE cl.id_criminal = :id
+""")
+
+# The same four lookups for an archived criminal, read from their one "Criminal_archive" row
+ARCHIVED_CRIMINAL_DETAIL_QUERY = text("""
+    SELECT 
+        c.id_criminal, c.first_name, c.last_name, c.nickname,
+        c.place_of_birth_id, c.date_of_birth, c.last_live_place_id, c.is_archived,
+        c.id_group, c.role,
+        p.height, p.weight, p.hair_color, p.eye_color, p.distinguishing_features,
+        bp.city_name as birth_place, lp.city_name as last_place,
+        g.name as group_name
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::"Criminals", a.criminal) c
+    JOIN LATERAL jsonb_populate_recordset(NULL::"Physical_characteristics", a.characteristics) p ON c.id_criminal = p.id_criminal
+    LEFT JOIN "Cities" bp ON c.place_of_birth_id = bp.id_city
+    LEFT JOIN "Cities" lp ON c.last_live_place_id = lp.id_city
+    LEFT JOIN "Criminal_groups" g ON c.id_group = g.group_id
+    WHERE a.id_criminal = :id
+""")
+
+ARCHIVED_LAST_CRIME_QUERY = text("""
+    SELECT 
+        crime_name, commitment_date, id_location, court_sentence,
+        c.city_name as location_name, cr.crime_type
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_recordset(NULL::"Crimes", a.crimes) cr
+    LEFT JOIN "Cities" c ON cr.id_location = c.id_city
+    WHERE a.id_criminal = :id
+    ORDER BY cr.commitment_date DESC
+    LIMIT 1
+""")
+
+ARCHIVED_CRIMINAL_PROFESSIONS_QUERY = text("""
+    SELECT p.id_profession, p.profession_name
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_recordset(NULL::"Criminals_Professions", a.professions) cp
+    JOIN "Professions" p ON p.id_profession = cp.id_profession
+    WHERE a.id_criminal = :id
+""")
+
+ARCHIVED_CRIMINAL_LANGUAGES_QUERY = text("""
+    SELECT l.id_language, l.name
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_recordset(NULL::"Criminals_Languages", a.languages) cl
+    JOIN "Languages" l ON l.id_language = cl.id_language
+    WHERE a.id_criminal = :id
+""")
+
+# get_criminal_by_id tries the hot tables first and falls back to the archive
+CRIMINAL_LOOKUPS = (
+    (CRIMINAL_DETAIL_QUERY, LAST_CRIME_QUERY, CRIMINAL_PROFESSIONS_QUERY, CRIMINAL_LANGUAGES_QUERY),
+    (ARCHIVED_CRIMINAL_DETAIL_QUERY, ARCHIVED_LAST_CRIME_QUERY,
+     ARCHIVED_CRIMINAL_PROFESSIONS_QUERY, ARCHIVED_CRIMINAL_LANGUAGES_QUERY)
+)
+
+# Archived criminals live in "Criminal_archive" (migrations/005_criminal_archive.sql), so the
+# hot tables hold active criminals only. Statements including archived criminals read the
+# "..._with_archive" views instead, which add the archived rows in the same shape.
+ACTIVE_TABLES = {
+    "criminals": '"Criminals"',
+    "characteristics": '"Physical_characteristics"',
+    "crimes": '"Crimes"',
+    "criminal_professions": '"Criminals_Professions"',
+    "criminal_languages": '"Criminals_Languages"'
+}
+
+WITH_ARCHIVE_TABLES = {
+    "criminals": '"Criminals_with_archive"',
+    "characteristics": '"Physical_characteristics_with_archive"',
+    "crimes": '"Crimes_with_archive"',
+    "criminal_professions": '"Criminals_Professions_with_archive"',
+    "criminal_languages": '"Criminals_Languages_with_archive"'
+}
+
+# The same rows unpacked from one "Criminal_archive" row a, for per-criminal lookups that
+# would otherwise unpack the whole archive for every criminal
+ARCHIVED_ROWS = {
+    "criminals": '"Criminal_archive" a CROSS JOIN LATERAL jsonb_populate_record(NULL::"Criminals", a.criminal)',
+    "characteristics": 'LATERAL jsonb_populate_recordset(NULL::"Physical_characteristics", a.characteristics)',
+    "crimes": 'jsonb_populate_recordset(NULL::"Crimes", a.crimes)',
+    "criminal_professions": 'jsonb_populate_recordset(NULL::"Criminals_Professions", a.professions)',
+    "criminal_languages": 'jsonb_populate_recordset(NULL::"Criminals_Languages", a.languages)'
+}
+
+PROFESSION_FREQUENCY_TEMPLATE = """
+    SELECT p.profession_name, COUNT(*) as criminals
+    FROM {criminal_professions} cp
+    JOIN "Professions" p ON cp.id_profession = p.id_profession
+    GROUP BY p.profession_name
+    ORDER BY criminals DESC, p.profession_name
+"""
+
+LANGUAGE_FREQUENCY_TEMPLATE = """
+    SELECT l.name, COUNT(*) as criminals
+    FROM {criminal_languages} cl
+    JOIN "Languages" l ON cl.id_language = l.id_language
+    GROUP BY l.name
+    ORDER BY criminals DESC, l.name
+"""
+
+# Bounds on commitment_date for the dated variants of the statements below. They compare the
+# column itself, so on the partitioned "Crimes" (migrations/004_partition_crimes.sql) only
+# the partitions of those years are read, also in prepared generic plans.
+CRIME_DATE_RANGE = """
+    AND cr.commitment_date >= COALESCE(CAST(:start_date AS DATE), '-infinity')
+    AND cr.commitment_date <= COALESCE(CAST(:end_date AS DATE), 'infinity')
+"""
+
+PROFESSION_CRIME_TYPE_TEMPLATE = """
+    SELECT p.profession_name, cr.crime_type, COUNT(DISTINCT cp.id_criminal) as criminals
+    FROM {criminal_professions} cp
+    JOIN "Professions" p ON cp.id_profession = p.id_profession
+    JOIN {crimes} cr ON cr.id_criminal = cp.id_criminal
+    WHERE cr.crime_type IS NOT NULL
+    {crime_range}
+    GROUP BY p.profession_name, cr.crime_type
+"""
+
+ALL_CRIMINALS_TEMPLATE = """
+    SELECT 
+        c.id_criminal, c.first_name, c.last_name, c.nickname, c.is_archived,
+        bp.city_name AS birth_place, lp.city_name AS residence,
+        c.date_of_birth, pc.height, pc.weight,
+        c.id_group, c.role, g.name AS group_name
+    FROM {criminals} c
+    LEFT JOIN "Cities" bp ON c.place_of_birth_id = bp.id_city
+    LEFT JOIN "Cities" lp ON c.last_live_place_id = lp.id_city
+    LEFT JOIN {characteristics} pc ON c.id_criminal = pc.id_criminal
+    LEFT JOIN "Criminal_groups" g ON c.id_group = g.group_id
+"""
+
+# One page of the archive, most recently archived first. Without :after_date the page starts
+# at the newest archive entry; a NULL :limit returns everything.
+ARCHIVED_CRIMINALS_QUERY = text("""
+    SELECT 
+        c.id_criminal, c.first_name, c.last_name, c.nickname,
+        bp.city_name AS birth_place, 
+        lp.city_name AS residence,
+        c.date_of_birth,
+        p.height, p.weight,
+        g.name AS group_name,
+        a.archive_date
+    FROM "Criminal_archive" a
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::"Criminals", a.criminal) c
+    LEFT JOIN LATERAL jsonb_populate_recordset(NULL::"Physical_characteristics", a.characteristics) p ON TRUE
+    LEFT JOIN "Cities" bp ON c.place_of_birth_id = bp.id_city
+    LEFT JOIN "Cities" lp ON c.last_live_place_id = lp.id_city
+    LEFT JOIN "Criminal_groups" g ON c.id_group = g.group_id
+    WHERE (a.archive_date, a.id_criminal)
+        < (COALESCE(CAST(:after_date AS DATE), 'infinity'), COALESCE(CAST(:after_id AS INTEGER), 0))
+    ORDER BY a.archive_date DESC, a.id_criminal DESC
+    LIMIT :limit
+""")
+
+ARCHIVE_CRIMINAL_QUERY = text("SELECT archive_criminal(:criminal_id, :archive_date)")
+
+# Archived ids stay taken, so an archived criminal and a new one never share an id
+NEXT_CRIMINAL_ID_QUERY = text("""
+    SELECT GREATEST(
+        (SELECT MAX(id_criminal) FROM "Criminals"),
+        (SELECT MAX(id_criminal) FROM "Criminal_archive"),
+        0
+    ) + 1
+""")
+
+EXPORT_CRIMINALS_TEMPLATE = """
+    SELECT 
+        c.id_criminal, 
+        c.first_name, 
+        c.last_name, 
+        c.nickname,
+        c.date_of_birth,
+        c.is_archived,
+        bc.city_name as birth_place, 
+        lc.city_name as residence_place, 
+        p.height, 
+        p.weight, 
+        p.hair_color, 
+        p.eye_color, 
+        p.distinguishing_features,
+        g.name as group_name,
+        c.role as role_in_group,
+        (
+            SELECT string_agg(pr.profession_name, ', ' ORDER BY pr.profession_name)
+            FROM "Professions" pr
+            JOIN {criminal_professions} cp ON pr.id_profession = cp.id_profession
+            WHERE cp.id_criminal = c.id_criminal
+        ) as professions,
+        (
+            SELECT string_agg(l.name, ', ' ORDER BY l.name)
+            FROM "Languages" l
+            JOIN {criminal_languages} cl ON l.id_language = cl.id_language
+            WHERE cl.id_criminal = c.id_criminal
+        ) as languages,
+        cr.crime_name as last_crime,
+        cr.commitment_date as last_crime_date,
+        cr_city.city_name as last_crime_location,
+        cr.court_sentence,
+        cr.crime_type
+    FROM {criminals} c
+    LEFT JOIN {characteristics} p ON c.id_criminal = p.id_criminal
+    LEFT JOIN "Cities" bc ON c.place_of_birth_id = bc.id_city
+    LEFT JOIN "Cities" lc ON c.last_live_place_id = lc.id_city
+    LEFT JOIN "Criminal_groups" g ON c.id_group = g.group_id
+    {crime_join} LATERAL (
+        -- Latest crime: read from the top of each partition's (id_criminal, commitment_date) index
+        SELECT cr.crime_name, cr.commitment_date, cr.id_location, cr.court_sentence, cr.crime_type
+        FROM {crimes} cr
+        WHERE cr.id_criminal = c.id_criminal
+        {crime_range}
+        ORDER BY cr.commitment_date DESC
+        LIMIT 1
+    ) cr ON TRUE
+    LEFT JOIN "Cities" cr_city ON cr.id_location = cr_city.id_city
+"""
+
+def _fill(template, tables, dated=False):
+    return template.format(
+        **tables,
+        crime_join="JOIN" if dated else "LEFT JOIN",
+        crime_range=CRIME_DATE_RANGE if dated else ""
+    )
+
+@lru_cache(maxsize=None)
+def _statement(template, include_archived=False, dated=False):
+    """Statement for one variant of a template, built once so it can stay prepared."""
+    return text(_fill(template, WITH_ARCHIVE_TABLES if include_archived else ACTIVE_TABLES, dated))
+
+@lru_cache(maxsize=None)
+def _export_query(include_archived, dated):
+    """Export statement; dated, only criminals with a crime in the range, shown with the latest of those."""
+    query = _fill(EXPORT_CRIMINALS_TEMPLATE, ACTIVE_TABLES, dated)
+    if include_archived:
+        query += "UNION ALL" + _fill(EXPORT_CRIMINALS_TEMPLATE, ARCHIVED_ROWS, dated)
+    return text(query + "ORDER BY last_name, first_name")
+
+# Rows of the criminal lists, filled by column name; dates stay date objects
+CriminalRecord = record_type("CriminalRecord", [
+    "id_criminal", "first_name", "last_name", "nickname", "is_archived",
+    "birth_place", "residence", "date_of_birth", "height", "weight",
+    "id_group", "role", "group_name"
+])
+
+ArchivedCriminalRecord = record_type("ArchivedCriminalRecord", [
+    "id_criminal", "first_name", "last_name", "nickname", "birth_place", "residence",
+    "date_of_birth", "height", "weight", "group_name", "archive_date"
+])
+
+# Column headings of the export file, in the order of the values in export records
+CRIMINAL_EXPORT_COLUMNS = (
+    "ID", "Ім'я", "Прізвище", "Кличка", "Дата народження", "В архіві",
+    "Місце народження", "Місце проживання", "Зріст (см)", "Вага (кг)",
+    "Колір волосся", "Колір очей", "Особливі прикмети", "Угруповання",
+    "Роль в угрупованні", "Професії", "Мови", "Остання справа",
+    "Дата останньої справи", "Місце останньої справи", "Вирок (роки)", "Тип злочину"
+)
+
+def _export_record(row):
+    """Values of one export file row, in CRIMINAL_EXPORT_COLUMNS order."""
+    return (
+        row[0],
+        row[1],
+        row[2],
+        row[3] or "",
+        row[4].strftime("%Y-%m-%d") if row[4] else "",
+        "Так" if row[5] else "Ні",
+        row[6] or "",
+        row[7] or "",
+        row[8] or "",
+        row[9] or "",
+        row[10] or "",
+        row[11] or "",
+        row[12] or "",
+        row[13] or "",
+        row[14] or "",
+        row[15] or "",
+        row[16] or "",
+        row[17] or "",
+        row[18].strftime("%Y-%m-%d") if row[18] else "",
+        row[19] or "",
+        row[20] or "",
+        row[21] or ""
+    )
+
+def _archive_page_params(limit, after):
+    after_date, after_id = after or (None, None)
+    return {"limit": limit, "after_date": after_date, "after_id": after_id}
+
+def _criminal_detail_from_row(row):
+    return {
+        "id_criminal": row[0],
+        "first_name": row[1],
+        "last_name": row[2],
+        "nickname": row[3],
+        "place_of_birth_id": row[4],
+        "date_of_birth": row[5].strftime("%Y-%m-%d") if row[5] else None,
+        "last_live_place_id": row[6],
+        "is_archived": row[7],
+        "id_group": row[8],
+        "role": row[9],
+        "height": row[10],
+        "weight": row[11],
+        "hair_color": row[12],
+        "eye_color": row[13],
+        "distinguishing_features": row[14],
+        "birth_place_name": row[15],
+        "last_place_name": row[16],
+        "group_name": row[17]
+    }
+
+def _last_crime_from_row(row):
+    return {
+        "last_case": row[0],
+        "last_case_date": row[1].strftime("%Y-%m-%d") if row[1] else None,
+        "last_case_location_id": row[2],
+        "court_sentence": row[3],
+        "last_case_location_name": row[4],
+        "crime_type": row[5]
+    }
+
+def _criminal_detail(conn, criminal_id):
+    for detail_query, last_crime_query, professions_query, languages_query in CRIMINAL_LOOKUPS:
+        row = conn.execute(detail_query, {"id": criminal_id}).fetchone()
+        if row:
+            break
+    else:
+        return None
+    
+    criminal_data = _criminal_detail_from_row(row)
+    
+    crime_row = conn.execute(last_crime_query, {"id": criminal_id}).fetchone()
+    if crime_row:
+        criminal_data.update(_last_crime_from_row(crime_row))
+    
+    criminal_data["professions"] = [
+        {"id": row[0], "name": row[1]} for row in conn.execute(professions_query, {"id": criminal_id})
+    ]
+    criminal_data["languages"] = [
+        {"id": row[0], "name": row[1]} for row in conn.execute(languages_query, {"id": criminal_id})
+    ]
+    return criminal_data
+
 class CriminalModel:
-    def __init__(self, engine):
+    def __init__(self, engine, async_engine=None, read_engine=None):
         self.engine = engine
+        self.async_engine = async_engine
+        # Read-only methods may be served by a replica (DatabaseConnector.read_engine)
+        self.read_engine = read_engine or read_only(engine)
     
     def get_next_id(self, table_name, id_column):
         try:
-            with self.engine.connect() as conn:
-                query = f"SELECT COALESCE(MAX({id_column}), 0) + 1 FROM \"{table_name}\""
-                result = conn.execute(text(query))
-                return result.scalar()
+            # On the primary, so an id committed moments ago is never handed out again
+            with read_only(self.engine).connect() as conn:
+                return conn.execute(next_id_query(table_name, id_column)).scalar()
+        except Exception as e:
+            raise e
+
+    def get_next_criminal_id(self):
+        try:
+            with read_only(self.engine).connect() as conn:
+                return conn.execute(NEXT_CRIMINAL_ID_QUERY).scalar()
         except Exception as e:
             raise e
 
@@ -19,7 +414,7 @@ class CriminalModel:
             with self.engine.connect() as conn:
                 transaction = conn.begin()
                 
-                next_id = self.get_next_id("Criminals", "id_criminal")
+                next_id = self.get_next_criminal_id()
                 
                 result = conn.execute(
                     text("""
@@ -276,33 +671,21 @@ class CriminalModel:
             raise e
     
     def archive_criminal(self, criminal_id):
+        """Move a criminal and their characteristics, crimes and links into "Criminal_archive".
+
+        Returns False if there is no active criminal with this id.
+        """
         try:
             with self.engine.connect() as conn:
                 transaction = conn.begin()
                 
-                conn.execute(
-                    text("""
-                    UPDATE "Criminals" SET is_archived = TRUE
-                    WHERE id_criminal = :criminal_id
-                    """), 
-                    {"criminal_id": criminal_id}
-                )
-                
-                next_archive_id = self.get_next_id("Archive", "id_archive")
-                conn.execute(
-                    text("""
-                    INSERT INTO "Archive"
-                    VALUES (:id_archive, :criminal_id, :archive_date)
-                    """),
-                    {
-                        "id_archive": next_archive_id,
-                        "criminal_id": criminal_id,
-                        "archive_date": datetime.now().date()
-                    }
-                )
+                archived = conn.execute(
+                    ARCHIVE_CRIMINAL_QUERY,
+                    {"criminal_id": criminal_id, "archive_date": datetime.now().date()}
+                ).scalar()
                 
                 transaction.commit()
-                return True
+                return archived
                 
         except Exception as e:
             if 'transaction' in locals():
@@ -343,6 +726,11 @@ class CriminalModel:
                     {"id": criminal_id}
                 )
                 
+                conn.execute(
+                    text("DELETE FROM \"Criminal_archive\" WHERE id_criminal = :id"),
+                    {"id": criminal_id}
+                )
+                
                 transaction.commit()
                 return True
                 
@@ -352,299 +740,112 @@ class CriminalModel:
             raise e
     
     def get_criminal_by_id(self, criminal_id):
+        """Complete data of an active or archived criminal, or None if there is neither."""
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(
-                    text("""
-                    SELECT 
-                        c.id_criminal, c.first_name, c.last_name, c.nickname,
-                        c.place_of_birth_id, c.date_of_birth, c.last_live_place_id, c.is_archived,
-                        c.id_group, c.role,
-                        p.height, p.weight, p.hair_color, p.eye_color, p.distinguishing_features,
-                        bp.city_name as birth_place, lp.city_name as last_place,
-                        g.name as group_name
-                    FROM "Criminals" c
-                    JOIN "Physical_characteristics" p ON c.id_criminal = p.id_criminal
-                    LEFT JOIN "Cities" bp ON c.place_of_birth_id = bp.id_city
-                    LEFT JOIN "Cities" lp ON c.last_live_place_id = lp.id_city
-                    LEFT JOIN "Criminal_groups" g ON c.id_group = g.group_id
-                    WHERE c.id_criminal = :id
-                    """),
-                    {"id": criminal_id}
-                )
-                
-                row = result.fetchone()
-                if not row:
-                    return None
-                
-                criminal_data = {
-                    "id_criminal": row[0],
-                    "first_name": row[1],
-                    "last_name": row[2],
-                    "nickname": row[3],
-                    "place_of_birth_id": row[4],
-                    "date_of_birth": row[5].strftime("%Y-%m-%d") if row[5] else None,
-                    "last_live_place_id": row[6],
-                    "is_archived": row[7],
-                    "id_group": row[8],
-                    "role": row[9],
-                    "height": row[10],
-                    "weight": row[11],
-                    "hair_color": row[12],
-                    "eye_color": row[13],
-                    "distinguishing_features": row[14],
-                    "birth_place_name": row[15],
-                    "last_place_name": row[16],
-                    "group_name": row[17]
-                }
-                
-                crime_result = conn.execute(
-                    text("""
-                    SELECT 
-                        crime_name, commitment_date, id_location, court_sentence,
-                        c.city_name as location_name, cr.crime_type
-                    FROM "Crimes" cr
-                    LEFT JOIN "Cities" c ON cr.id_location = c.id_city
-                    WHERE cr.id_criminal = :id
-                    ORDER BY cr.commitment_date DESC
-                    LIMIT 1
-                    """),
-                    {"id": criminal_id}
-                )
-
-                crime_row = crime_result.fetchone()
-                if crime_row:
-                    criminal_data.update({
-                        "last_case": crime_row[0],
-                        "last_case_date": crime_row[1].strftime("%Y-%m-%d") if crime_row[1] else None,
-                        "last_case_location_id": crime_row[2],
-                        "court_sentence": crime_row[3],
-                        "last_case_location_name": crime_row[4],
-                        "crime_type": crime_row[5]  # Added this line
-                    })
-                
-                prof_result = conn.execute(
-                    text("""
-                    SELECT p.id_profession, p.profession_name
-                    FROM "Professions" p
-                    JOIN "Criminals_Professions" cp ON p.id_profession = cp.id_profession
-                    WHERE cp.id_criminal = :id
-                    """),
-                    {"id": criminal_id}
-                )
-                
-                criminal_data["professions"] = [
-                    {"id": row[0], "name": row[1]} for row in prof_result.fetchall()
-                ]
-                
-                lang_result = conn.execute(
-                    text("""
-                    SELECT l.id_language, l.name
-                    FROM "Languages" l
-                    JOIN "Criminals_Languages" cl ON l.id_language = cl.id_language
-                    WHERE cl.id_criminal = :id
-                    """),
-                    {"id": criminal_id}
-                )
-                
-                criminal_data["languages"] = [
-                    {"id": row[0], "name": row[1]} for row in lang_result.fetchall()
-                ]
-                
-                return criminal_data
+            with self.read_engine.connect() as conn:
+                return _criminal_detail(conn, criminal_id)
                 
         except Exception as e:
             raise e
     
+    async def get_criminal_by_id_async(self, criminal_id):
+        return await run_read_async(self.async_engine, self.read_engine, _criminal_detail, criminal_id)
+    
     def get_all_criminals(self, include_archived=False):
         try:
-            with self.engine.connect() as conn:
-                query = """
-                SELECT 
-                    c.id_criminal, c.first_name, c.last_name, c.nickname, c.is_archived,
-                    bp.city_name AS birth_place, lp.city_name AS residence,
-                    c.date_of_birth, pc.height, pc.weight,
-                    c.id_group, c.role, g.name AS group_name
-                FROM "Criminals" c
-                LEFT JOIN "Cities" bp ON c.place_of_birth_id = bp.id_city
-                LEFT JOIN "Cities" lp ON c.last_live_place_id = lp.id_city
-                LEFT JOIN "Physical_characteristics" pc ON c.id_criminal = pc.id_criminal
-                LEFT JOIN "Criminal_groups" g ON c.id_group = g.group_id
-                """
-                
-                if not include_archived:
-                    query += " WHERE c.is_archived = FALSE"
-                
-                result = conn.execute(text(query))
-                
-                criminals = []
-                for row in result.fetchall():
-                    criminals.append({
-                        "id_criminal": row[0],
-                        "first_name": row[1],
-                        "last_name": row[2],
-                        "nickname": row[3],
-                        "is_archived": row[4],
-                        "birth_place": row[5],
-                        "residence": row[6],
-                        "date_of_birth": row[7].strftime("%Y-%m-%d") if row[7] else None,
-                        "height": row[8],
-                        "weight": row[9],
-                        "id_group": row[10],
-                        "role": row[11],
-                        "group_name": row[12]
-                    })
+            with self.read_engine.connect() as conn:
+                result = conn.execute(_statement(ALL_CRIMINALS_TEMPLATE, include_archived))
                 
-                return criminals
+                return map_rows(CriminalRecord, result)
                 
         except Exception as e:
             raise e
     
-    def get_archived_criminals(self):
+    def iter_criminals(self, include_archived=False, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield the records of get_all_criminals in lists of at most batch_size."""
+        return stream_batches(
+            self.read_engine, _statement(ALL_CRIMINALS_TEMPLATE, include_archived), None,
+            CriminalRecord, batch_size
+        )
+    
+    def get_archived_criminals(self, limit=None, after=None):
+        """Get archived criminals, most recently archived first.
+
+        With a limit only one page is read. after is the (archive_date, id_criminal) of the
+        last record of the previous page; the next page starts right after it.
+        """
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(
-                    text("""
-                    SELECT 
-                        c.id_criminal, c.first_name, c.last_name, c.nickname,
-                        bp.city_name AS birth_place, 
-                        lp.city_name AS residence,
-                        c.date_of_birth,
-                        p.height, p.weight,
-                        g.name AS group_name,
-                        a.archive_date
-                    FROM "Criminals" c
-                    JOIN "Archive" a ON c.id_criminal = a.id_criminal
-                    LEFT JOIN "Cities" bp ON c.place_of_birth_id = bp.id_city
-                    LEFT JOIN "Cities" lp ON c.last_live_place_id = lp.id_city
-                    LEFT JOIN "Physical_characteristics" p ON c.id_criminal = p.id_criminal
-                    LEFT JOIN "Criminal_groups" g ON c.id_group = g.group_id
-                    WHERE c.is_archived = TRUE
-                    ORDER BY a.archive_date DESC
-                    """)
-                )
+            with self.read_engine.connect() as conn:
+                result = conn.execute(ARCHIVED_CRIMINALS_QUERY, _archive_page_params(limit, after))
                 
-                archived = []
-                for row in result.fetchall():
-                    archived.append({
-                        "id_criminal": row[0],
-                        "first_name": row[1],
-                        "last_name": row[2],
-                        "nickname": row[3],
-                        "birth_place": row[4],
-                        "residence": row[5],
-                        "date_of_birth": row[6].strftime("%Y-%m-%d") if row[6] else None,
-                        "height": row[7],
-                        "weight": row[8],
-                        "group_name": row[9],
-                        "archive_date": row[10].strftime("%Y-%m-%d") if row[10] else None
-                    })
-                
-                return archived
+                return map_rows(ArchivedCriminalRecord, result)
                 
         except Exception as e:
             raise e
+    
+    def iter_archived_criminals(self, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield the records of get_archived_criminals in lists of at most batch_size."""
+        return stream_batches(
+            self.read_engine, ARCHIVED_CRIMINALS_QUERY, _archive_page_params(None, None),
+            ArchivedCriminalRecord, batch_size
+        )
         
-    def get_criminals_for_export(self, include_archived=False):
-        """Get complete criminal data with all related information for export."""
+    def get_criminals_for_export(self, include_archived=False, start_date=None, end_date=None):
+        """Get complete criminal data with all related information for export.
+
+        With start_date and/or end_date only criminals with a crime in that range are
+        exported, and their last case is the latest crime in it.
+        """
         try:
-            with self.engine.connect() as conn:
-                query = """
-                    SELECT 
-                        c.id_criminal, 
-                        c.first_name, 
-                        c.last_name, 
-                        c.nickname,
-                        c.date_of_birth,
-                        c.is_archived,
-                        bc.city_name as birth_place, 
-                        lc.city_name as residence_place, 
-                        p.height, 
-                        p.weight, 
-                        p.hair_color, 
-                        p.eye_color, 
-                        p.distinguishing_features,
-                        g.name as group_name,
-                        c.role as role_in_group,
-                        cr.crime_name as last_crime,
-                        cr.commitment_date as last_crime_date,
-                        cr_city.city_name as last_crime_location,
-                        cr.court_sentence,
-                        cr.crime_type
-                    FROM "Criminals" c
-                    LEFT JOIN "Physical_characteristics" p ON c.id_criminal = p.id_criminal
-                    LEFT JOIN "Cities" bc ON c.place_of_birth_id = bc.id_city
-                    LEFT JOIN "Cities" lc ON c.last_live_place_id = lc.id_city
-                    LEFT JOIN "Criminal_groups" g ON c.id_group = g.group_id
-                    LEFT JOIN (
-                        SELECT cr.id_criminal, cr.crime_name, cr.commitment_date, cr.id_location, cr.court_sentence, cr.crime_type,
-                            ROW_NUMBER() OVER (PARTITION BY cr.id_criminal ORDER BY cr.commitment_date DESC) as rn
-                        FROM "Crimes" cr
-                    ) cr ON c.id_criminal = cr.id_criminal AND cr.rn = 1
-                    LEFT JOIN "Cities" cr_city ON cr.id_location = cr_city.id_city
-                    """
-                
-                if not include_archived:
-                    query += " WHERE c.is_archived = FALSE"
-                    
-                query += """ ORDER BY c.last_name, c.first_name """
-                
-                result = conn.execute(text(query))
-                
-                criminals_data = []
-                for row in result:
-                    criminal_id = row[0]
-                    prof_result = conn.execute(
-                        text("""
-                        SELECT p.profession_name
-                        FROM "Professions" p
-                        JOIN "Criminals_Professions" cp ON p.id_profession = cp.id_profession
-                        WHERE cp.id_criminal = :id
-                        ORDER BY p.profession_name
-                        """),
-                        {"id": criminal_id}
-                    )
-                    professions = ", ".join([prof[0] for prof in prof_result.fetchall()])
-                    
-                    lang_result = conn.execute(
-                        text("""
-                        SELECT l.name
-                        FROM "Languages" l
-                        JOIN "Criminals_Languages" cl ON l.id_language = cl.id_language
-                        WHERE cl.id_criminal = :id
-                        ORDER BY l.name
-                        """),
-                        {"id": criminal_id}
-                    )
-                    languages = ", ".join([lang[0] for lang in lang_result.fetchall()])
-                    
-                    data = {
-                        "ID": row[0],
-                        "Ім'я": row[1],
-                        "Прізвище": row[2],
-                        "Кличка": row[3] or "",
-                        "Дата народження": row[4].strftime("%Y-%m-%d") if row[4] else "",
-                        "В архіві": "Так" if row[5] else "Ні",
-                        "Місце народження": row[6] or "",
-                        "Місце проживання": row[7] or "",
-                        "Зріст (см)": row[8] or "",
-                        "Вага (кг)": row[9] or "",
-                        "Колір волосся": row[10] or "",
-                        "Колір очей": row[11] or "",
-                        "Особливі прикмети": row[12] or "",
-                        "Угруповання": row[13] or "",
-                        "Роль в угрупованні": row[14] or "",
-                        "Професії": professions,
-                        "Мови": languages,
-                        "Остання справа": row[15] or "",
-                        "Дата останньої справи": row[16].strftime("%Y-%m-%d") if row[16] else "",
-                        "Місце останньої справи": row[17] or "",
-                        "Вирок (роки)": row[18] or "",
-                        "Тип злочину": row[19] or ""
-                    }
-                    criminals_data.append(data)
-                
-                return criminals_data
+            return [
+                dict(zip(CRIMINAL_EXPORT_COLUMNS, record))
+                for batch in self.iter_criminals_for_export(include_archived, start_date, end_date)
+                for record in batch
+            ]
                     
+        except Exception as e:
+            raise e
+    
+    def iter_criminals_for_export(self, include_archived=False, start_date=None, end_date=None, batch_size=DEFAULT_BATCH_SIZE):
+        """Yield export rows as lists of value tuples in CRIMINAL_EXPORT_COLUMNS order, batch_size at a time."""
+        dated = start_date is not None or end_date is not None
+        return stream_batches(
+            self.read_engine, _export_query(include_archived, dated),
+            {"start_date": start_date, "end_date": end_date},
+            _export_record, batch_size
+        )
+    
+    def _get_frequencies(self, template, include_archived):
+        with self.read_engine.connect() as conn:
+            result = conn.execute(_statement(template, include_archived))
+            return [{"name": row[0], "count": row[1]} for row in result]
+    
+    def get_profession_frequencies(self, include_archived=False):
+        """Get number of criminals per profession, most common first."""
+        try:
+            return self._get_frequencies(PROFESSION_FREQUENCY_TEMPLATE, include_archived)
+        except Exception as e:
+            raise e
+    
+    def get_language_frequencies(self, include_archived=False):
+        """Get number of criminals per language, most common first."""
+        try:
+            return self._get_frequencies(LANGUAGE_FREQUENCY_TEMPLATE, include_archived)
+        except Exception as e:
+            raise e
+    
+    def get_profession_crime_type_counts(self, include_archived=False, start_date=None, end_date=None):
+        """Get number of criminals per profession and type of crime they committed, optionally within a date range."""
+        dated = start_date is not None or end_date is not None
+        try:
+            with self.read_engine.connect() as conn:
+                result = conn.execute(
+                    _statement(PROFESSION_CRIME_TYPE_TEMPLATE, include_archived, dated),
+                    {"start_date": start_date, "end_date": end_date}
+                )
+                return [
+                    {"profession": row[0], "crime_type": row[1], "count": row[2]}
+                    for row in result
+                ]
         except Exception as e:
             raise e
\ No newline at end of file
@@ -0,0 +1,530 @@
+"""Optional shared data service for hosts where many users run the application side by side.
+
+One service process per host holds the database engine and the models; the applications
+call model methods over a Unix socket instead of opening their own connection pools.
+Read results are cached in the service, up to DATA_SERVICE_CACHE_MB, and shared by every
+client until a write goes through the service or a "Data_versions" counter changes; iter_*
+methods are streamed to the client batch by batch instead.
+Account methods other than logging in need a connection that has logged in; registration
+is refused unless DATA_SERVICE_ALLOW_REGISTRATION is set.
+
+Start it from the app directory with: python -m mvc.models.data_service
+and point the applications at it with DATA_SERVICE_SOCKET in .env.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from mvc.models.users import DEFAULT_BCRYPT_ROUNDS, UserModel
+from mvc.models.criminals import CriminalModel
+from mvc.models.cities import CityModel
+from mvc.models.languages import LanguageModel
+from mvc.models.professions import ProfessionModel
+from mvc.models.criminal_gangs import CriminalGroupModel
+from mvc.models.data_versions import DataVersionModel
+from mvc.models.crimes import CrimeModel
+from mvc.models.associations import AssociationModel
+from mvc.models.records import Record
+
+DEFAULT_SOCKET_MODE = 0o660
+
+# Reads clients may call, per model; results are cached unless the model is in UNCACHED_MODELS
+# or the method yields batches (iter_*), which are streamed one frame per batch
+READ_METHODS = {
+    "users": {"get_all_users"},
+    "criminals": {
+        "get_criminal_by_id", "get_all_criminals", "get_archived_criminals", "get_criminals_for_export",
+        "get_profession_frequencies", "get_language_frequencies", "get_profession_crime_type_counts",
+        "iter_criminals", "iter_archived_criminals", "iter_criminals_for_export"
+    },
+    "cities": {"get_all_cities", "get_city_by_id", "get_city_counts", "get_country_counts"},
+    "languages": {"get_all_languages", "get_languages_for_criminal"},
+    "professions": {"get_all_professions", "get_professions_for_criminal"},
+    "criminal_groups": {
+        "get_all_criminal_groups", "get_group_by_id", "get_members_by_group_id", "get_members_page",
+        "count_members", "get_groups_for_export", "iter_criminal_groups", "iter_groups_for_export"
+    },
+    "data_versions": {"get_versions"},
+    "crimes": {"get_crime_trends"},
+    "associations": {
+        "iter_memberships", "get_memberships", "get_criminal_labels", "get_group_labels", "get_city_labels"
+    }
+}
+
+# Writes clients may call; one that goes through the service empties the cache, unless the
+# model is in UNCACHED_MODELS and so has nothing cached to outdate
+WRITE_METHODS = {
+    "users": {"authenticate", "create_user", "change_password", "delete_user"},
+    "criminals": {"create_criminal", "update_criminal", "archive_criminal", "delete_criminal"},
+    "criminal_groups": {"create_criminal_group", "update_criminal_group", "delete_criminal_group"}
+}
+
+SERVED_METHODS = {
+    model_name: READ_METHODS.get(model_name, set()) | WRITE_METHODS.get(model_name, set())
+    for model_name in READ_METHODS.keys() | WRITE_METHODS.keys()
+}
+
+# Results of these are never shared between clients
+UNCACHED_MODELS = {"users", "data_versions"}
+
+# Account methods a connection may call only after logging in through it; change_password
+# only for the user it logged in as. authenticate is open, create_user only if the service
+# was started with registration allowed (DATA_SERVICE_ALLOW_REGISTRATION).
+LOGGED_IN_METHODS = {"get_all_users", "delete_user", "change_password"}
+
+# Cached results are dropped least recently used first beyond this many encoded bytes;
+# a result larger than a quarter of it is not cached at all
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Writes made outside the service are noticed at most this many seconds late
+VERSION_CHECK_INTERVAL = 1.0
+
+# Frame: payload length, codec byte, payload. A call answers with {"result": ...} or
+# {"error": ...}; an iter_* call with one {"batch": [...]} per batch, then {"end": true}
+# or {"error": ...}
+FRAME_HEADER = struct.Struct(">IB")
+MAX_FRAME_SIZE = 256 * 1024 * 1024
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+class DataServiceError(Exception):
+    pass
+
+def create_models(engine, async_engine=None, bcrypt_rounds: int = DEFAULT_BCRYPT_ROUNDS, read_engine=None) -> dict:
+    """Every model the application uses, keyed by the names in SERVED_METHODS.
+
+    read_engine serves the read-only methods (DatabaseConnector.read_engine); logins and
+    password changes always go to the primary.
+    """
+    return {
+        "users": UserModel(engine, bcrypt_rounds),
+        "criminals": CriminalModel(engine, async_engine, read_engine),
+        "cities": CityModel(engine, async_engine, read_engine),
+        "languages": LanguageModel(engine, async_engine, read_engine),
+        "professions": ProfessionModel(engine, async_engine, read_engine),
+        "criminal_groups": CriminalGroupModel(engine, async_engine, read_engine),
+        "data_versions": DataVersionModel(engine, read_engine),
+        "crimes": CrimeModel(engine, read_engine),
+        "associations": AssociationModel(engine, async_engine, read_engine)
+    }
+
+def ensure_crime_partitions(crime_model) -> None:
+    """Create this and next year's "Crimes" partitions at startup, if any are missing.
+
+    Failing is not fatal: crimes without a partition for their year wait in the default one.
+    """
+    try:
+        crime_model.ensure_partitions()
+    except Exception as e:
+        print(f"Could not create crime partitions: {e}")
+
+def _peer_host(writer) -> str:
+    """The connecting local user as "uid:<n>", or "" (no per-host login limit) where unknown."""
+    sock = writer.get_extra_info("socket")
+    try:
+        _, uid, _ = struct.unpack("3i", sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")))
+        return f"uid:{uid}"
+    except (AttributeError, OSError):
+        return ""
+
+def _plain(value):
+    """Records as dicts; encoders would otherwise send them as bare lists."""
+    if isinstance(value, Record):
+        return dict(value.items())
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+def _plain_result(method):
+    def call(*args, **kwargs):
+        return _plain(method(*args, **kwargs))
+    return call
+
+def _to_wire(value):
+    # Dates travel as the text views display (utils.format_utils.date_text passes strings through)
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot send {type(value).__name__} to the data service")
+
+def encode(message, codec: int = None) -> bytes:
+    if codec is None:
+        codec = CODEC_MSGPACK if msgpack is not None else CODEC_JSON
+    
+    if codec == CODEC_MSGPACK:
+        payload = msgpack.packb(message, default=_to_wire, use_bin_type=True)
+    else:
+        payload = json.dumps(message, default=_to_wire, ensure_ascii=False).encode("utf-8")
+    return FRAME_HEADER.pack(len(payload), codec) + payload
+
+def decode(codec: int, payload: bytes):
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise DataServiceError("msgpack is not installed")
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload.decode("utf-8"))
+
+def _receive(sock, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(min(size - len(data), 1024 * 1024))
+        if not chunk:
+            raise OSError("connection closed by the data service")
+        data += chunk
+    return bytes(data)
+
+def _receive_frame(sock):
+    size, codec = FRAME_HEADER.unpack(_receive(sock, FRAME_HEADER.size))
+    return decode(codec, _receive(sock, size))
+
+class DataService:
+    """Serves model calls from clients on one host with a shared pool and result cache."""
+    def __init__(self, models: dict, allow_registration: bool = False, max_cache_bytes: int = MAX_CACHE_BYTES) -> None:
+        self.models = models
+        self.allow_registration = allow_registration
+        self.max_cache_bytes = max_cache_bytes
+        # key -> (result, encoded size), least recently used first; all for _cache_token
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_token = None
+        self._pending = {}
+        self._writes = 0
+        self._versions = None
+        self._versions_checked = 0.0
+        self._versions_check = None
+    
+    async def serve(self, socket_path: str, socket_mode: int = DEFAULT_SOCKET_MODE) -> None:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        
+        server = await asyncio.start_unix_server(self._handle_client, path=socket_path)
+        os.chmod(socket_path, socket_mode)
+        
+        async with server:
+            await server.serve_forever()
+    
+    async def _handle_client(self, reader, writer) -> None:
+        # The user this connection logged in as; a reconnecting client logs in again
+        session = {"username": None, "client_host": _peer_host(writer)}
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(FRAME_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                
+                size, codec = FRAME_HEADER.unpack(header)
+                if size > MAX_FRAME_SIZE:
+                    break
+                
+                try:
+                    request = decode(codec, await reader.readexactly(size))
+                    arguments = (request["model"], request["method"], request.get("args", []), request.get("kwargs", {}))
+                    if request["method"].startswith("iter_"):
+                        async with contextlib.aclosing(self.stream(*arguments)) as batches:
+                            async for batch in batches:
+                                writer.write(encode({"batch": batch}, codec))
+                                await writer.drain()
+                        response = {"end": True}
+                    else:
+                        response = {"result": await self.call(*arguments, session)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    response = {"error": str(e)}
+                
+                writer.write(encode(response, codec))
+                await writer.drain()
+        finally:
+            writer.close()
+    
+    async def call(self, model_name: str, method: str, args: list, kwargs: dict, session: dict = None):
+        if method not in SERVED_METHODS.get(model_name, ()):
+            raise DataServiceError(f"Unknown data service method: {model_name}.{method}")
+        if method.startswith("iter_"):
+            raise DataServiceError(f"{model_name}.{method} is streamed; read it with stream()")
+        
+        if model_name == "users":
+            self._check_account_access(method, args, kwargs, session)
+            if method == "authenticate":
+                # Every client reaches Postgres from the service's address; the per-host
+                # login limit counts each local user separately instead
+                kwargs = dict(kwargs, client_host=(session or {}).get("client_host", ""))
+        
+        function = _plain_result(getattr(self.models[model_name], method))
+        
+        if method in WRITE_METHODS.get(model_name, ()):
+            try:
+                result = await asyncio.to_thread(function, *args, **kwargs)
+            finally:
+                # Whatever the write changed, later reads must not see older results
+                if model_name not in UNCACHED_MODELS:
+                    self._writes += 1
+            
+            if method == "authenticate" and session is not None and result[0]:
+                session["username"] = result[1]["username"]
+            return result
+        
+        if model_name in UNCACHED_MODELS:
+            return await asyncio.to_thread(function, *args, **kwargs)
+        
+        key = (model_name, method, json.dumps([args, kwargs], default=_to_wire, sort_keys=True))
+        token = await self._data_token()
+        cached = self._cached(key, token)
+        if cached is not None:
+            return cached
+        
+        # Clients asking for the same data at the same time share one query
+        pending = self._pending.get(key)
+        if pending is not None and pending[0] == token:
+            return await asyncio.shield(pending[1])
+        
+        future = asyncio.ensure_future(asyncio.to_thread(function, *args, **kwargs))
+        self._pending[key] = (token, future)
+        try:
+            result = await future
+        finally:
+            if self._pending.get(key, (None, None))[1] is future:
+                del self._pending[key]
+        
+        if token == await self._data_token():
+            self._store(key, token, result)
+        return result
+    
+    async def stream(self, model_name: str, method: str, args: list, kwargs: dict):
+        """Yield the batches of an iter_* method one at a time; they are never cached.
+
+        Only one batch is held at a time, so a result set of any size can be sent.
+        """
+        if not method.startswith("iter_") or method not in READ_METHODS.get(model_name, ()):
+            raise DataServiceError(f"Unknown data service stream: {model_name}.{method}")
+        
+        batches = getattr(self.models[model_name], method)(*args, **kwargs)
+        try:
+            while True:
+                # The generator holds a database connection; each batch is fetched off the event loop
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    return
+                yield _plain(batch)
+        finally:
+            await asyncio.to_thread(batches.close)
+    
+    def _check_account_access(self, method: str, args: list, kwargs: dict, session) -> None:
+        username = session["username"] if session is not None else None
+        
+        if method == "create_user" and not self.allow_registration:
+            raise DataServiceError("Registration through the data service is disabled")
+        
+        if method in LOGGED_IN_METHODS and username is None:
+            raise DataServiceError(f"Log in before calling users.{method}")
+        
+        if method == "change_password" and kwargs.get("username", args[0] if args else None) != username:
+            raise DataServiceError("Only the logged-in user's password can be changed")
+    
+    def _cached(self, key, token):
+        if token != self._cache_token:
+            self._cache.clear()
+            self._cache_bytes = 0
+            self._cache_token = token
+            return None
+        
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        self._cache.move_to_end(key)
+        return entry[0]
+    
+    def _store(self, key, token, result) -> None:
+        if token != self._cache_token:
+            return
+        
+        size = len(encode(result))
+        if size > self.max_cache_bytes // 4:
+            return
+        
+        previous = self._cache.pop(key, None)
+        if previous is not None:
+            self._cache_bytes -= previous[1]
+        
+        self._cache[key] = (result, size)
+        self._cache_bytes += size
+        while self._cache_bytes > self.max_cache_bytes:
+            _, (_, evicted_size) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted_size
+    
+    async def _data_token(self):
+        if self._versions_check is None and time.monotonic() - self._versions_checked >= VERSION_CHECK_INTERVAL:
+            self._versions_check = asyncio.ensure_future(self._check_versions())
+        
+        # Requests arriving during a check wait for it rather than use the previous counters
+        if self._versions_check is not None:
+            await asyncio.shield(self._versions_check)
+        return (self._writes, self._versions)
+    
+    async def _check_versions(self) -> None:
+        try:
+            versions = await asyncio.to_thread(self.models["data_versions"].get_versions)
+            self._versions = tuple(sorted(versions.items()))
+        except Exception:
+            # Without migrations/001_data_versions.sql only writes made through the service are seen
+            self._versions = None
+        finally:
+            self._versions_checked = time.monotonic()
+            self._versions_check = None
+    
+class RemoteModel:
+    """Stands in for a model; every public method call is run by the data service.
+
+    iter_* methods return a generator of batches, read from the service as they are consumed.
+    """
+    def __init__(self, client, model_name: str) -> None:
+        self._client = client
+        self._model_name = model_name
+    
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        
+        if method.endswith("_async"):
+            sync_method = method[:-len("_async")]
+            
+            async def call_async(*args, **kwargs):
+                return await asyncio.to_thread(self._client.call, self._model_name, sync_method, *args, **kwargs)
+            return call_async
+        
+        if method.startswith("iter_"):
+            def stream(*args, **kwargs):
+                return self._client.stream(self._model_name, method, *args, **kwargs)
+            return stream
+        
+        def call(*args, **kwargs):
+            return self._client.call(self._model_name, method, *args, **kwargs)
+        return call
+
+class DataServiceClient:
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self._socket = None
+        self._lock = threading.Lock()
+    
+    def connect(self) -> bool:
+        """Connect to the service. Returns False if no service is listening on the socket."""
+        try:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(self.socket_path)
+            return True
+        except OSError:
+            self._socket = None
+            return False
+    
+    def models(self) -> dict:
+        return {name: RemoteModel(self, name) for name in SERVED_METHODS}
+    
+    def call(self, model_name: str, method: str, *args, **kwargs):
+        request = encode({"model": model_name, "method": method, "args": list(args), "kwargs": kwargs})
+        
+        # Worker threads share the connection; one request is in flight at a time
+        with self._lock:
+            try:
+                if self._socket is None and not self.connect():
+                    raise OSError("not connected")
+                
+                self._socket.sendall(request)
+                response = _receive_frame(self._socket)
+            except OSError as e:
+                self.close()
+                raise DataServiceError(f"Data service unavailable: {e}")
+        
+        if "error" in response:
+            raise DataServiceError(response["error"])
+        return response["result"]
+    
+    def stream(self, model_name: str, method: str, *args, **kwargs):
+        """Yield the batches of an iter_* method as the service sends them.
+
+        Each stream has a connection of its own, so calls made while consuming it do not
+        wait for it to finish; a stream abandoned early is cut off by closing that connection.
+        """
+        request = encode({"model": model_name, "method": method, "args": list(args), "kwargs": kwargs})
+        stream_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            try:
+                stream_socket.connect(self.socket_path)
+                stream_socket.sendall(request)
+            except OSError as e:
+                raise DataServiceError(f"Data service unavailable: {e}")
+            
+            while True:
+                try:
+                    response = _receive_frame(stream_socket)
+                except OSError as e:
+                    raise DataServiceError(f"Data service unavailable: {e}")
+                
+                if "error" in response:
+                    raise DataServiceError(response["error"])
+                if response.get("end"):
+                    return
+                yield response["batch"]
+        finally:
+            stream_socket.close()
+    
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+def main() -> int:
+    from dotenv import load_dotenv
+    from mvc.models.database import DatabaseConnector, database_uri, replica_uris
+    
+    load_dotenv()
+    socket_path = os.getenv("DATA_SERVICE_SOCKET")
+    if not socket_path:
+        print("Set DATA_SERVICE_SOCKET to the socket path the service should listen on")
+        return 1
+    
+    db_connector = DatabaseConnector()
+    if not db_connector.connect_engine(database_uri()):
+        print("Could not connect to database. Please check your connection settings.")
+        return 1
+    
+    db_connector.connect_replicas(replica_uris())
+    models = create_models(
+        db_connector.engine,
+        bcrypt_rounds=int(os.getenv("BCRYPT_ROUNDS", DEFAULT_BCRYPT_ROUNDS)),
+        read_engine=db_connector.read_engine
+    )
+    ensure_crime_partitions(models["crimes"])
+    socket_mode = int(os.getenv("DATA_SERVICE_SOCKET_MODE", oct(DEFAULT_SOCKET_MODE)), 8)
+    allow_registration = os.getenv("DATA_SERVICE_ALLOW_REGISTRATION", "").lower() in ("1", "true", "yes")
+    max_cache_bytes = int(os.getenv("DATA_SERVICE_CACHE_MB", MAX_CACHE_BYTES // 2**20)) * 2**20
+    
+    try:
+        asyncio.run(DataService(models, allow_registration, max_cache_bytes).serve(socket_path, socket_mode))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db_connector.close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,25 @@
+from sqlalchemy import text
+
+from mvc.models.statements import read_only
+
+DATA_VERSIONS_QUERY = text("""
+    SELECT table_name, version
+    FROM "Data_versions"
+""")
+
+class DataVersionModel:
+    """Change counters kept by the triggers in migrations/001_data_versions.sql."""
+    def __init__(self, engine, read_engine=None):
+        self.engine = engine
+        self.read_engine = read_engine or read_only(engine)
+    
+    def get_versions(self):
+        """Get current change counter of every tracked table."""
+        try:
+            with self.read_engine.connect() as conn:
+                result = conn.execute(DATA_VERSIONS_QUERY)
+                
+                return {row[0]: row[1] for row in result}
+                
+        except Exception as e:
+            raise e
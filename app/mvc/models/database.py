@@ -1,21 +1,207 @@
-from sqlalchemy import create_engine, text
+import os
+import threading
+import time
+from sqlalchemy import create_engine, event, exc, text
+
+from mvc.models.statements import engine_options, read_only
+
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine
+except ImportError:
+    create_async_engine = None
+
+# Reads go to the primary for this long after this process commits a write
+READ_YOUR_WRITES_WINDOW = 5.0
+
+# Replicas further behind the primary than this are skipped
+MAX_REPLICA_LAG = 10.0
+HEALTH_CHECK_INTERVAL = 5.0
+# Seconds a replica may take to accept a connection before it counts as down
+REPLICA_CONNECT_TIMEOUT = 2
+
+# Seconds a replica's replay is behind. Once it has replayed all the WAL it received it is
+# caught up, however long ago the last commit was (an idle primary sends nothing new);
+# otherwise it is as far behind as the last commit it replayed is old.
+REPLICA_LAG_EXPRESSION = """
+    CASE
+        WHEN {received_lsn} = {replayed_lsn} THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - ({replayed_at})), 0)
+    END
+"""
+
+REPLICA_LAG_QUERY = text(f"""
+    SELECT {REPLICA_LAG_EXPRESSION.format(
+        received_lsn="pg_last_wal_receive_lsn()",
+        replayed_lsn="pg_last_wal_replay_lsn()",
+        replayed_at="pg_last_xact_replay_timestamp()"
+    )}
+    WHERE pg_is_in_recovery()
+""")
+
+def database_uri(host=None, port=None) -> str:
+    """Connection URI from the DB_* settings in the environment (.env)."""
+    host = host or os.getenv("DB_HOST")
+    port = port or os.getenv("DB_PORT")
+    return f"""postgresql://{os.getenv("DB_USER")}:{os.getenv("DB_PASSWORD")}@{host}:{port}/{os.getenv("DB_NAME")}"""
+
+def replica_uris() -> list:
+    """URIs of the read replicas in DB_REPLICA_HOSTS ("host:port,host:port"), same credentials as the primary."""
+    uris = []
+    for replica in filter(None, (part.strip() for part in os.getenv("DB_REPLICA_HOSTS", "").split(","))):
+        host, _, port = replica.partition(":")
+        uris.append(database_uri(host, port or os.getenv("DB_PORT")))
+    return uris
+
+def replica_engine(uri):
+    """Engine for a replica; one that does not answer within REPLICA_CONNECT_TIMEOUT counts as down."""
+    options = engine_options(uri)
+    options["connect_args"] = dict(options.get("connect_args", {}), connect_timeout=REPLICA_CONNECT_TIMEOUT)
+    return create_engine(uri, **options)
+
+class ReplicaRouter:
+    """Engine stand-in for read-only model methods.
+
+    connect() hands out connections to the replicas in turn, skipping any that failed to
+    connect or lag too far behind, and falls back to the primary when none is usable or
+    when this process committed a write within READ_YOUR_WRITES_WINDOW. Its connections
+    run in autocommit (see mvc.models.statements.read_only).
+    
+    Replicas are checked every HEALTH_CHECK_INTERVAL seconds in a background thread, so
+    connect() never waits on a replica that is down; until the first check has finished,
+    reads go to the primary.
+    """
+    def __init__(self, primary, replicas, health_check_interval: float = HEALTH_CHECK_INTERVAL) -> None:
+        self.primary = read_only(primary)
+        self.engines = list(replicas)
+        self.replicas = [read_only(replica) for replica in self.engines]
+        self.health_check_interval = health_check_interval
+        self._next = 0
+        self._unhealthy = set(self.replicas)
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.health_checked = threading.Event()
+        
+        event.listen(primary, "commit", self._on_commit)
+        
+        self._health_thread = threading.Thread(target=self._check_health_periodically, name="replica-health", daemon=True)
+        self._health_thread.start()
+    
+    def _on_commit(self, conn) -> None:
+        self._last_write = time.monotonic()
+    
+    def connect(self):
+        if time.monotonic() - self._last_write < READ_YOUR_WRITES_WINDOW:
+            return self.primary.connect()
+        
+        for replica in self._healthy_in_turn():
+            try:
+                return replica.connect()
+            except exc.DBAPIError:
+                self._unhealthy.add(replica)
+        
+        return self.primary.connect()
+    
+    def _healthy_in_turn(self) -> list:
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica not in self._unhealthy]
+    
+    def _check_health_periodically(self) -> None:
+        while not self._stopped.is_set():
+            self._check_health()
+            self.health_checked.set()
+            self._stopped.wait(self.health_check_interval)
+    
+    def _check_health(self) -> None:
+        unhealthy = set()
+        for replica in self.replicas:
+            try:
+                with replica.connect() as conn:
+                    lag = conn.execute(REPLICA_LAG_QUERY).scalar()
+                # No row: the server is not in recovery, so it is not replicating anything
+                if lag is None or lag > MAX_REPLICA_LAG:
+                    unhealthy.add(replica)
+            except exc.DBAPIError:
+                unhealthy.add(replica)
+        
+        self._unhealthy = unhealthy
+    
+    def dispose(self) -> None:
+        self._stopped.set()
+        for engine in self.engines:
+            engine.dispose()
 
 class DatabaseConnector:    
     def __init__(self):
         self._engine = None
+        self._async_engine = None
+        self._read_engine = None
+        self._primary_reads = None
     
     def connect_engine(self, db_uri):
         try:
-            self._engine = create_engine(db_uri)
+            self._engine = create_engine(db_uri, **engine_options(db_uri))
+            self._primary_reads = read_only(self._engine)
+            
+            return True
+            
+        except Exception as e:
+            return False
+    
+    def connect_async_engine(self, db_uri):
+        """Create an asyncpg-backed engine next to the sync one. Returns False if the async stack is unavailable."""
+        if create_async_engine is None:
+            return False
+        
+        try:
+            async_uri = db_uri.replace("postgresql://", "postgresql+asyncpg://", 1)
+            self._async_engine = create_async_engine(async_uri)
+            
+            return True
+            
+        except Exception as e:
+            self._async_engine = None
+            return False
+    
+    def connect_replicas(self, replica_uris):
+        """Route read-only model methods to the given replicas. Returns False if none could be set up."""
+        if self._engine is None or not replica_uris:
+            return False
+        
+        try:
+            self._read_engine = ReplicaRouter(
+                self._engine, [replica_engine(uri) for uri in replica_uris]
+            )
             
             return True
             
         except Exception as e:
+            self._read_engine = None
             return False
+    
     @property
     def engine(self):
         return self._engine
     
+    @property
+    def read_engine(self):
+        """Where read-only model methods connect: the replica router, or the primary without replicas."""
+        return self._read_engine or self._primary_reads
+    
+    @property
+    def async_engine(self):
+        return self._async_engine
+    
     def close(self):
+        if self._read_engine:
+            self._read_engine.dispose()
         if self._engine:
-            self._engine.dispose()
\ No newline at end of file
+            self._engine.dispose()
+    
+    async def close_async(self):
+        if self._async_engine:
+            await self._async_engine.dispose()
\ No newline at end of file
@@ -1,31 +1,39 @@
 from sqlalchemy import text
 
+from mvc.models.statements import read_only, run_read_async
+from mvc.models.records import map_rows, record_type
+
+ALL_LANGUAGES_QUERY = text("SELECT id_language AS id, name FROM \"Languages\"")
+
+LanguageRecord = record_type("LanguageRecord", ["id", "name"])
+
+def _all_languages(conn):
+    return map_rows(LanguageRecord, conn.execute(ALL_LANGUAGES_QUERY))
+
 class LanguageModel:
-    def __init__(self, engine):
+    def __init__(self, engine, async_engine=None, read_engine=None):
         self.engine = engine
+        self.async_engine = async_engine
+        # Read-only methods may be served by a replica (DatabaseConnector.read_engine)
+        self.read_engine = read_engine or read_only(engine)
     
     def get_all_languages(self):
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text("SELECT id_language, name FROM \"Languages\""))
-                
-                languages = []
-                for row in result.fetchall():
-                    languages.append({
-                        "id": row[0],
-                        "name": row[1]
-                    })
-                return languages
+            with self.read_engine.connect() as conn:
+                return _all_languages(conn)
                 
         except Exception as e:
             raise e
     
+    async def get_all_languages_async(self):
+        return await run_read_async(self.async_engine, self.read_engine, _all_languages)
+    
     def get_languages_for_criminal(self, criminal_id):
         try:
-            with self.engine.connect() as conn:
+            with self.read_engine.connect() as conn:
                 result = conn.execute(
                     text("""
-                    SELECT l.id_language, l.name
+                    SELECT l.id_language AS id, l.name
                     FROM "Languages" l
                     JOIN "Criminals_Languages" cl ON l.id_language = cl.id_language
                     WHERE cl.id_criminal = :id
@@ -34,7 +42,7 @@ class LanguageModel:
                     {"id": criminal_id}
                 )
                 
-                return [{"id": row[0], "name": row[1]} for row in result.fetchall()]
+                return map_rows(LanguageRecord, result)
                 
         except Exception as e:
             raise e
\ No newline at end of file
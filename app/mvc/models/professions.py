@@ -1,32 +1,39 @@
 from sqlalchemy import text
 
+from mvc.models.statements import read_only, run_read_async
+from mvc.models.records import map_rows, record_type
+
+ALL_PROFESSIONS_QUERY = text("SELECT id_profession AS id, profession_name AS name FROM \"Professions\"")
+
+ProfessionRecord = record_type("ProfessionRecord", ["id", "name"])
+
+def _all_professions(conn):
+    return map_rows(ProfessionRecord, conn.execute(ALL_PROFESSIONS_QUERY))
+
 class ProfessionModel:
-    def __init__(self, engine):
+    def __init__(self, engine, async_engine=None, read_engine=None):
         self.engine = engine
+        self.async_engine = async_engine
+        # Read-only methods may be served by a replica (DatabaseConnector.read_engine)
+        self.read_engine = read_engine or read_only(engine)
     
     def get_all_professions(self):
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text("SELECT id_profession, profession_name FROM \"Professions\""))
-                
-                professions = []
-                for row in result.fetchall():
-                    professions.append({
-                        "id": row[0],
-                        "name": row[1]
-                    })
-                
-                return professions
+            with self.read_engine.connect() as conn:
+                return _all_professions(conn)
                 
         except Exception as e:
             raise e
     
+    async def get_all_professions_async(self):
+        return await run_read_async(self.async_engine, self.read_engine, _all_professions)
+    
     def get_professions_for_criminal(self, criminal_id):
         try:
-            with self.engine.connect() as conn:
+            with self.read_engine.connect() as conn:
                 result = conn.execute(
                     text("""
-                    SELECT p.id_profession, p.profession_name
+                    SELECT p.id_profession AS id, p.profession_name AS name
                     FROM "Professions" p
                     JOIN "Criminals_Professions" cp ON p.id_profession = cp.id_profession
                     WHERE cp.id_criminal = :id
@@ -35,7 +42,7 @@ class ProfessionModel:
                     {"id": criminal_id}
                 )
                 
-                return [{"id": row[0], "name": row[1]} for row in result.fetchall()]
+                return map_rows(ProfessionRecord, result)
                 
         except Exception as e:
             raise e
\ No newline at end of file
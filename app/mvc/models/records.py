@@ -0,0 +1,85 @@
+import sys
+from collections import namedtuple
+from operator import itemgetter
+
+class Record(tuple):
+    """Immutable result row read like the dicts models used to return.
+
+    Fields are attributes and also keys: record["name"] and record.get("name") work, and
+    dict(record) gives the old dict. Values are kept as the driver returns them, so dates
+    stay date objects until a view formats them. A record is a tuple without a per-row
+    __dict__, a fraction of the memory of the equivalent dict.
+    """
+    __slots__ = ()
+    # Set by record_type; _fields comes from the namedtuple base
+    _index = {}
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            try:
+                key = self._index[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+def record_type(name: str, fields: list) -> type:
+    """Record class with the given fields, matched by name to the columns of a query."""
+    fields = tuple(fields)
+    # Named after the defining module, as namedtuple does, so records can be pickled
+    module = sys._getframe(1).f_globals.get("__name__", __name__)
+
+    return type(name, (Record, namedtuple(name, fields, module=module)), {
+        "__slots__": (),
+        "__module__": module,
+        "_index": {field: position for position, field in enumerate(fields)}
+    })
+
+def row_mapper(record_class: type, columns):
+    """Function turning a result row into a record_class record.
+
+    Column positions are looked up by name once per result rather than once per row;
+    when the query selects exactly the record's fields in order, rows are copied as they are.
+    """
+    columns = list(columns)
+    fields = list(record_class._fields)
+    new = tuple.__new__
+
+    if columns == fields:
+        return lambda row: new(record_class, row)
+
+    missing = [field for field in fields if field not in columns]
+    if missing:
+        raise KeyError(f"{record_class.__name__} fields missing from the query: {', '.join(missing)}")
+
+    positions = [columns.index(field) for field in fields]
+    if len(positions) == 1:
+        position = positions[0]
+        return lambda row: new(record_class, (row[position],))
+
+    select = itemgetter(*positions)
+    return lambda row: new(record_class, select(row))
+
+def map_rows(record_class: type, result) -> list:
+    """Every row of a result as record_class records."""
+    return list(map(row_mapper(record_class, result.keys()), result))
+
+def map_row(record_class: type, result):
+    """The first row of a result as a record_class record, or None."""
+    row = result.fetchone()
+    return row_mapper(record_class, result.keys())(row) if row is not None else None
@@ -0,0 +1,73 @@
+import asyncio
+import os
+from functools import lru_cache
+from sqlalchemy import make_url, text
+
+# psycopg 3 prepares a statement on the server once a connection has run it this many times;
+# later executions skip parsing and can reuse the cached plan. DB_PREPARE_THRESHOLD=off disables it
+# (needed behind PgBouncer in transaction pooling mode, where sessions are not kept).
+PREPARE_THRESHOLD = 2
+
+# psycopg 3 deallocates all of a connection's prepared statements when a transaction is rolled back,
+# and SQLAlchemy rolls back whatever a connection still has open when it is closed. Connections that
+# only read run in autocommit instead, so nothing is rolled back and the statements stay prepared.
+READ_ONLY_OPTIONS = {"isolation_level": "AUTOCOMMIT"}
+
+PREPARED_STATEMENTS_QUERY = text("""
+    SELECT statement, generic_plans, custom_plans
+    FROM pg_prepared_statements
+    ORDER BY generic_plans + custom_plans DESC
+""")
+
+def prepare_threshold():
+    value = os.getenv("DB_PREPARE_THRESHOLD", str(PREPARE_THRESHOLD)).strip().lower()
+    return None if value in ("", "off", "none") else int(value)
+
+def engine_options(db_uri: str) -> dict:
+    """create_engine arguments enabling server-side prepared statements where the driver supports them.
+
+    Only psycopg 3 prepares automatically; other drivers get no extra options.
+    """
+    if make_url(db_uri).get_dialect().driver != "psycopg":
+        return {}
+    return {"connect_args": {"prepare_threshold": prepare_threshold()}}
+
+@lru_cache(maxsize=None)
+def read_only(engine):
+    """The same engine and pool, handing out autocommit connections for read-only work.
+
+    Cached per engine: deriving one costs tens of microseconds, as much as a prepared lookup.
+    """
+    return engine.execution_options(**READ_ONLY_OPTIONS)
+
+def run_read(engine, read, *args):
+    with engine.connect() as conn:
+        return read(conn, *args)
+
+async def run_read_async(async_engine, read_engine, read, *args):
+    """Await read(conn, *args) on async_engine, or without one on read_engine in a worker thread.
+
+    read is the function the synchronous model method runs, so a query and the mapping of its
+    rows are written once; AsyncConnection.run_sync hands it a synchronous connection.
+    """
+    if async_engine is None:
+        return await asyncio.to_thread(run_read, read_engine, read, *args)
+    
+    async with async_engine.connect() as conn:
+        return await conn.run_sync(read, *args)
+
+@lru_cache(maxsize=None)
+def next_id_query(table_name: str, id_column: str):
+    """One statement per table; identifiers cannot be bound parameters, so it is built once and reused."""
+    return text(f'SELECT COALESCE(MAX({id_column}), 0) + 1 FROM "{table_name}"')
+
+def prepared_statement_stats(conn) -> list:
+    """Statements prepared in this connection's session and how their plans were reused.
+
+    generic_plans counts executions that ran the cached generic plan, custom_plans those
+    planned again for their parameter values. Each pooled connection has its own statements.
+    """
+    return [
+        {"statement": " ".join(row[0].split()), "generic_plans": row[1], "custom_plans": row[2]}
+        for row in conn.execute(PREPARED_STATEMENTS_QUERY)
+    ]
@@ -0,0 +1,21 @@
+from mvc.models.records import Record, row_mapper
+
+DEFAULT_BATCH_SIZE = 2000
+
+def stream_batches(engine, query, params=None, make_record=tuple, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield lists of at most batch_size records read through a server-side cursor.
+
+    Only one batch is held in memory at a time, however many rows the query returns.
+    The connection stays checked out until the generator is exhausted or closed.
+    make_record is a function of one row, or a Record class filled by column name.
+    """
+    with engine.connect() as conn:
+        # Server-side cursors need a transaction, also on autocommit read connections
+        conn.execution_options(isolation_level=conn.default_isolation_level, yield_per=batch_size)
+        result = conn.execute(query, params or {})
+
+        if isinstance(make_record, type) and issubclass(make_record, Record):
+            make_record = row_mapper(make_record, result.keys())
+
+        for partition in result.partitions(batch_size):
+            yield [make_record(row) for row in partition]
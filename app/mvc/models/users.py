@@ -1,26 +1,102 @@
+import asyncio
+import math
 import bcrypt
 from sqlalchemy import text
-from datetime import datetime
+
+from mvc.models.statements import read_only
+from mvc.models.records import map_rows, record_type
+
+# bcrypt work factor; pick one for the deployment hardware with benchmarks/bcrypt_benchmark.py
+DEFAULT_BCRYPT_ROUNDS = 12
+
+# Client host for the per-host limit: the one the caller names (the data service names its
+# peers), else the address Postgres sees the connection from. NULL, and so no per-host limit,
+# over a Unix socket or when the caller passes "", where every client shares one address.
+CLIENT_HOST = "NULLIF(COALESCE(CAST(:client_host AS TEXT), host(inet_client_addr())), '')"
+
+USER_BY_NAME_QUERY = text("""SELECT * FROM "Users" WHERE username = :username""")
+
+USER_EXISTS_QUERY = text("""SELECT 1 FROM "Users" WHERE username = :username""")
+
+INSERT_USER_QUERY = text("""
+    INSERT INTO "Users" (username, password_hash, last_login, failed_attempts)
+    VALUES (:username, :password_hash, NULL, 0)
+""")
+
+UPDATE_PASSWORD_QUERY = text("""
+    UPDATE "Users" 
+    SET password_hash = :password_hash
+    WHERE username = :username
+""")
+
+ALL_USERS_QUERY = text("""
+    SELECT user_id, username, last_login, failed_attempts 
+    FROM "Users"
+    WHERE CAST(:search AS TEXT) IS NULL OR username LIKE :search
+    ORDER BY username
+""")
+
+# Seconds until the username or this host may try again, NULL if neither is locked out
+LOCKOUT_QUERY = text(f"""
+    SELECT MAX(:lockout_seconds - EXTRACT(EPOCH FROM now() - last_attempt))
+    FROM "Login_attempts"
+    WHERE (scope, key) IN (('user', :username), ('host', {CLIENT_HOST}))
+      AND attempts >= CASE scope WHEN 'user' THEN :max_attempts ELSE :host_max_attempts END
+      AND last_attempt > now() - make_interval(secs => :lockout_seconds)
+""")
+
+# Count a failure for the username and the host in one statement; returns the username's count
+FAILED_ATTEMPT_QUERY = text(f"""
+    WITH counted AS (
+        INSERT INTO "Login_attempts" AS a (scope, key, attempts, last_attempt)
+        SELECT scope, key, 1, now()
+        FROM (VALUES ('user', CAST(:username AS TEXT)), ('host', {CLIENT_HOST})) AS failed (scope, key)
+        WHERE key IS NOT NULL
+        ON CONFLICT (scope, key) DO UPDATE
+        SET attempts = CASE
+                WHEN a.last_attempt > now() - make_interval(secs => :lockout_seconds) THEN a.attempts + 1
+                ELSE 1
+            END,
+            last_attempt = now()
+        RETURNING a.scope, a.attempts
+    ), persisted AS (
+        UPDATE "Users" SET failed_attempts = failed_attempts + 1 WHERE username = :username
+    )
+    SELECT attempts FROM counted WHERE scope = 'user'
+""")
+
+SUCCESSFUL_LOGIN_QUERY = text("""
+    WITH cleared AS (
+        DELETE FROM "Login_attempts" WHERE scope = 'user' AND key = :username
+    )
+    UPDATE "Users" 
+    SET last_login = CURRENT_TIMESTAMP, failed_attempts = 0, password_hash = :password_hash
+    WHERE username = :username
+""")
+
+# last_login stays a datetime (None before the first login)
+UserRecord = record_type("UserRecord", ["user_id", "username", "last_login", "failed_attempts"])
 
 class UserModel:
-    def __init__(self, engine) -> None:
+    def __init__(self, engine, bcrypt_rounds: int = DEFAULT_BCRYPT_ROUNDS) -> None:
         self.engine = engine
-        self.login_attempts = {} 
+        self.bcrypt_rounds = bcrypt_rounds
         self.max_attempts = 5    
+        # One client host may fail this many times across all usernames
+        self.host_max_attempts = 20
         self.lockout_duration = 10
         
     def create_user(self, username: str, password: str) -> tuple[bool, str]:        
         try:
             with self.engine.connect() as cursor:
                 transaction = cursor.begin()
-                result = cursor.execute(text(f'''SELECT username FROM "Users" WHERE username = '{username}';'''))
+                result = cursor.execute(USER_EXISTS_QUERY, {"username": username})
                 
                 if result.fetchone():
                     raise Exception("Такий користувач вже існує, спробуйте увійти з таким логіном!")
                 
                 password_hash = self._hash_password(password)
-                cursor.execute(text(f"INSERT INTO \"Users\" (username, password_hash, last_login, failed_attempts) VALUES (:username, :password_hash, NULL, 0)"), 
-                              {"username": username, "password_hash": password_hash})
+                cursor.execute(INSERT_USER_QUERY, {"username": username, "password_hash": password_hash})
 
                 transaction.commit()
                 return True, "Успішно додано користувача, переходимо до головної форми!"
@@ -29,42 +105,36 @@ class UserModel:
             print(e)
             return False, str(e)
         
-    def authenticate(self, username: str, password: str) -> tuple[bool, dict|str]:
+    def authenticate(self, username: str, password: str, client_host: str = None) -> tuple[bool, dict|str]:
+        """client_host names the client for the per-host limit when the connection's address
+        does not ("" for none); see CLIENT_HOST."""
         try:
-            if username in self.login_attempts:
-                attempts_info = self.login_attempts[username]
-                if attempts_info["count"] >= self.max_attempts:
-                    time_diff = datetime.now() - attempts_info["timestamp"]
-                    if time_diff.total_seconds() < self.lockout_duration * 60:
-                        remaining_minutes = self.lockout_duration - int(time_diff.total_seconds() / 60)
-                        raise Exception(f"Обліковий запис тимчасово заблоковано. Спробуйте через {remaining_minutes} хвилин.")
-                    else:
-                        self.login_attempts[username]["count"] = 0
-            
             with self.engine.connect() as cursor:
                 transaction = cursor.begin()
-                result = cursor.execute(text("""SELECT * FROM "Users" WHERE username = :username;"""), {"username": username})
+                remaining_seconds = cursor.execute(LOCKOUT_QUERY, self._throttle_params(username, client_host)).scalar()
+                if remaining_seconds is not None:
+                    remaining_minutes = max(1, math.ceil(remaining_seconds / 60))
+                    raise Exception(f"Обліковий запис тимчасово заблоковано. Спробуйте через {remaining_minutes} хвилин.")
+                
+                result = cursor.execute(USER_BY_NAME_QUERY, {"username": username})
                 row = result.fetchone()
 
                 if not row:
-                    self._increment_failed_attempt(username)
+                    self._increment_failed_attempt(username, client_host)
                     raise Exception("Користувач відсутній в системі. Спробуйте зареєструватися!")
 
                 user_id, username, password_hash = row[:3]
 
                 if not self._verify_password(password, password_hash):
-                    self._increment_failed_attempt(username)
-                    attempts_left = self.max_attempts - self.login_attempts[username]["count"]
+                    attempts = self._increment_failed_attempt(username, client_host)
+                    attempts_left = max(0, self.max_attempts - attempts)
                     raise Exception(f"Пароль введений неправильно. Залишилось спроб: {attempts_left}")
-
-                if username in self.login_attempts:
-                    del self.login_attempts[username]
                 
-                cursor.execute(text("""
-                    UPDATE "Users" 
-                    SET last_login = CURRENT_TIMESTAMP, failed_attempts = 0 
-                    WHERE username = :username
-                """), {"username": username})
+                # The password is known only now, so hashes made with another cost are upgraded here
+                if self._needs_rehash(password_hash):
+                    password_hash = self._hash_password(password)
+                
+                cursor.execute(SUCCESSFUL_LOGIN_QUERY, {"username": username, "password_hash": password_hash})
                 
                 transaction.commit()
 
@@ -75,29 +145,31 @@ class UserModel:
             print(e)
             return False, str(e)
     
-    def _increment_failed_attempt(self, username):
-        if username not in self.login_attempts:
-            self.login_attempts[username] = {"count": 0, "timestamp": datetime.now()}
-        
-        self.login_attempts[username]["count"] += 1
-        self.login_attempts[username]["timestamp"] = datetime.now()
-        
+    def _throttle_params(self, username: str, client_host: str = None) -> dict:
+        return {
+            "username": username,
+            "client_host": client_host,
+            "max_attempts": self.max_attempts,
+            "host_max_attempts": self.host_max_attempts,
+            "lockout_seconds": self.lockout_duration * 60
+        }
+    
+    def _increment_failed_attempt(self, username, client_host: str = None) -> int:
+        """Record a failed login for the username and the client host; returns the username's count."""
         try:
             with self.engine.connect() as cursor:
                 transaction = cursor.begin()
-                cursor.execute(text("""
-                    UPDATE "Users" 
-                    SET failed_attempts = failed_attempts + 1 
-                    WHERE username = :username
-                """), {"username": username})
+                attempts = cursor.execute(FAILED_ATTEMPT_QUERY, self._throttle_params(username, client_host)).scalar()
                 transaction.commit()
+                return attempts
         except Exception as e:
             print(f"Error updating failed attempts: {e}")
+            return 0
         
     def _hash_password(self, password: str) -> str:
         password = password.encode('utf-8')
         
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=self.bcrypt_rounds)
         hashed = bcrypt.hashpw(password, salt)
 
         return hashed.decode('utf-8')
@@ -108,6 +180,24 @@ class UserModel:
 
         return bcrypt.checkpw(password, stored_hash)
     
+    def _needs_rehash(self, stored_hash: str) -> bool:
+        # "$2b$12$<salt and hash>": the cost is the third field
+        try:
+            return int(stored_hash.split('$')[2]) != self.bcrypt_rounds
+        except (IndexError, ValueError):
+            return True
+    
+    # bcrypt takes a noticeable fraction of a second by design, so the GUI calls these
+    # variants, which run the work in a worker thread
+    async def create_user_async(self, username: str, password: str) -> tuple[bool, str]:
+        return await asyncio.to_thread(self.create_user, username, password)
+    
+    async def authenticate_async(self, username: str, password: str, client_host: str = None) -> tuple[bool, dict|str]:
+        return await asyncio.to_thread(self.authenticate, username, password, client_host)
+    
+    async def change_password_async(self, username: str, new_password: str) -> tuple[bool, str]:
+        return await asyncio.to_thread(self.change_password, username, new_password)
+    
     def change_password(self, username: str, new_password: str) -> tuple[bool, str]:
         try:
             password_hash = self._hash_password(new_password)
@@ -116,24 +206,14 @@ class UserModel:
                 transaction = conn.begin()
                 try:
                     result = conn.execute(
-                        text("SELECT COUNT(*) FROM \"Users\" WHERE username = :username"),
-                        {"username": username}
+                        UPDATE_PASSWORD_QUERY,
+                        {"username": username, "password_hash": password_hash}
                     )
-                    user_count = result.scalar()
                     
-                    if user_count == 0:
+                    if result.rowcount == 0:
                         transaction.rollback()
                         return False, "Користувача не знайдено"
                     
-                    conn.execute(
-                        text("""
-                        UPDATE "Users" 
-                        SET password_hash = :password_hash
-                        WHERE username = :username
-                        """), 
-                        {"username": username, "password_hash": password_hash}
-                    )
-                    
                     transaction.commit()
                     return True, "Пароль успішно змінено!"
                     
@@ -147,31 +227,11 @@ class UserModel:
         
     def get_all_users(self, search_filter=None):
         try:
-            with self.engine.connect() as cursor:
-                query = """
-                SELECT user_id, username, last_login, failed_attempts 
-                FROM "Users"
-                """
-                
-                params = {}
-                if search_filter:
-                    query += " WHERE username LIKE :search"
-                    params["search"] = f"%{search_filter}%"
-                
-                query += " ORDER BY username"
-                
-                result = cursor.execute(text(query), params)
-                
-                users = []
-                for row in result.fetchall():
-                    users.append({
-                        "user_id": row[0],
-                        "username": row[1],
-                        "last_login": row[2].strftime("%Y-%m-%d %H:%M:%S") if row[2] else "Ніколи",
-                        "failed_attempts": row[3]
-                    })
+            with read_only(self.engine).connect() as cursor:
+                search = f"%{search_filter}%" if search_filter else None
+                result = cursor.execute(ALL_USERS_QUERY, {"search": search})
                 
-                return users
+                return map_rows(UserRecord, result)
                 
         except Exception as e:
             print(f"Error getting users: {e}")
@@ -4,6 +4,7 @@ from PySide6.QtGui import QAction, QCursor
 
 from .archive_source import Ui_MainWindow
 from .archive_table_model import ArchiveTableModel
+from .archive_filter_model import ArchiveFilterProxyModel
 from mvc.views.criminals.filterable_table_view import FilterableTableView
 
 from utils.icon_utils import icon_manager
@@ -25,7 +26,7 @@ class ArchiveView(QMainWindow):
         self.setup_context_menu()
     
     def setup_table_view(self) -> None:
-        self.filterable_table_view = FilterableTableView(self.ui.centralwidget)
+        self.filterable_table_view = FilterableTableView(self.ui.centralwidget, ArchiveFilterProxyModel)
         self.filterable_table_view.setObjectName("tableWidget")
         
         self.filterable_table_view.setGeometry(self.ui.tableWidget.geometry())
@@ -106,10 +107,11 @@ class ArchiveView(QMainWindow):
         if reply == QMessageBox.Yes:
             self.delete_archived_criminal_requested.emit(self.selected_criminal_id)
     
-    def set_archive_data(self, criminals: list) -> None:
+    def set_archive_data(self, criminals: list, fetch_more=None) -> None:
+        """Show the first page of archived criminals; fetch_more(after) loads the following pages on scrolling."""
         self.archive_data = criminals
         
-        model = ArchiveTableModel(criminals)
+        model = ArchiveTableModel(criminals, fetch_more)
         
         self.ui.tableWidget.setModel(model)
         
@@ -1,9 +1,21 @@
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
 
+from utils.format_utils import date_text
+
+SORT_KEYS = [
+    "id_criminal", "first_name", "last_name", "nickname", 
+    "birth_place", "residence", "date_of_birth", "height", "weight", 
+    "group_name", "archive_date"
+]
+
 class ArchiveTableModel(QAbstractTableModel):
-    def __init__(self, data=None):
+    def __init__(self, data=None, fetch_more=None):
         super().__init__()
         self._data = data or []
+        # fetch_more(after) returns the page following the (archive_date, id_criminal) after
+        self._fetch_more = fetch_more
+        self._after = self._page_end(self._data)
+        self._sort_order = None
         self._headers = [
             "ID", 
             "Ім'я", 
@@ -48,7 +60,7 @@ class ArchiveTableModel(QAbstractTableModel):
             elif col == 5:
                 return criminal.get("residence", "")
             elif col == 6:
-                return criminal.get("date_of_birth", "")
+                return date_text(criminal.get("date_of_birth"))
             elif col == 7:
                 height = criminal.get("height")
                 return f"{height} см" if height else ""
@@ -58,7 +70,38 @@ class ArchiveTableModel(QAbstractTableModel):
             elif col == 9:
                 return criminal.get("group_name", "")
             elif col == 10:
-                return criminal.get("archive_date", "")
+                return date_text(criminal.get("archive_date"))
+    
+    def filter_value(self, row, column):
+        """Raw value of a cell for the filter proxy, without display formatting."""
+        return self._data[row].get(SORT_KEYS[column])
+    
+    def _page_end(self, page):
+        if not page:
+            return None
+        last = page[-1]
+        return last.get("archive_date"), last.get("id_criminal")
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return self._fetch_more is not None and self._after is not None and not parent.isValid()
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        
+        page = self._fetch_more(self._after)
+        # An empty page means the archive has been read to the end
+        self._after = self._page_end(page)
+        if not page:
+            return
+        
+        self.beginInsertRows(QModelIndex(), len(self._data), len(self._data) + len(page) - 1)
+        self._data.extend(page)
+        self.endInsertRows()
+        
+        # Fetched rows are appended in archive order; keep the table in the order chosen by the user
+        if self._sort_order is not None:
+            self.sort(*self._sort_order)
     
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole and orientation == Qt.Horizontal:
@@ -68,15 +111,10 @@ class ArchiveTableModel(QAbstractTableModel):
     def sort(self, column, order):
         """Sort table by given column and order."""
         self.layoutAboutToBeChanged.emit()
+        self._sort_order = (column, order)
         
-        sort_keys = [
-            "id_criminal", "first_name", "last_name", "nickname", 
-            "birth_place", "residence", "date_of_birth", "height", "weight", 
-            "group_name", "archive_date"
-        ]
-        
-        if 0 <= column < len(sort_keys):
-            key = sort_keys[column]
+        if 0 <= column < len(SORT_KEYS):
+            key = SORT_KEYS[column]
             reverse = order == Qt.DescendingOrder
             
             self._data.sort(
@@ -90,4 +128,5 @@ class ArchiveTableModel(QAbstractTableModel):
         """Update the model with new data."""
         self.beginResetModel()
         self._data = data
+        self._after = self._page_end(data)
         self.endResetModel()
\ No newline at end of file
@@ -0,0 +1,176 @@
+from PySide6.QtWidgets import (
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QCheckBox,
+    QPushButton, QTableWidget, QTableWidgetItem, QAbstractItemView, QMessageBox
+)
+from PySide6.QtCore import Signal
+
+from mvc.models.associations import RELATION_BIRTHPLACE, RELATION_CRIME, RELATION_GANG, RELATION_RESIDENCE
+
+RELATION_TITLES = (
+    (RELATION_GANG, "Угруповання"),
+    (RELATION_CRIME, "Злочини (місце і дата)"),
+    (RELATION_BIRTHPLACE, "Місце народження"),
+    (RELATION_RESIDENCE, "Місце проживання")
+)
+
+MAX_HOPS = 4
+
+GRAPH_LOADING_TEXT = "Завантаження графа зв'язків..."
+GRAPH_FAILED_TEXT = "Не вдалося завантажити граф зв'язків"
+
+class AssociationView(QMainWindow):
+    associates_requested = Signal(int, int, int)
+    path_requested = Signal(int, int, int)
+    component_requested = Signal(int, int)
+    reload_requested = Signal()
+    
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Зв'язки злочинця")
+        self.resize(800, 600)
+        self._graph_loading = False
+        
+        central_widget = QWidget(self)
+        layout = QVBoxLayout(central_widget)
+        
+        criminal_layout = QHBoxLayout()
+        self.criminal_spinbox = self._id_spinbox(central_widget)
+        self.hops_spinbox = QSpinBox(central_widget)
+        self.hops_spinbox.setRange(1, MAX_HOPS)
+        criminal_layout.addWidget(QLabel("ID злочинця:", central_widget))
+        criminal_layout.addWidget(self.criminal_spinbox)
+        criminal_layout.addWidget(QLabel("Кроків:", central_widget))
+        criminal_layout.addWidget(self.hops_spinbox)
+        criminal_layout.addStretch()
+        layout.addLayout(criminal_layout)
+        
+        relations_layout = QHBoxLayout()
+        self.relation_checkboxes = {}
+        for relation, title in RELATION_TITLES:
+            checkbox = QCheckBox(title, central_widget)
+            checkbox.setChecked(True)
+            relations_layout.addWidget(checkbox)
+            self.relation_checkboxes[relation] = checkbox
+        relations_layout.addStretch()
+        layout.addLayout(relations_layout)
+        
+        buttons_layout = QHBoxLayout()
+        self.associates_button = QPushButton("Знайти зв'язки", central_widget)
+        self.component_button = QPushButton("Усі пов'язані", central_widget)
+        self.target_spinbox = self._id_spinbox(central_widget)
+        self.path_button = QPushButton("Шлях до ID:", central_widget)
+        self.reload_button = QPushButton("Оновити граф", central_widget)
+        buttons_layout.addWidget(self.associates_button)
+        buttons_layout.addWidget(self.component_button)
+        buttons_layout.addWidget(self.path_button)
+        buttons_layout.addWidget(self.target_spinbox)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(self.reload_button)
+        layout.addLayout(buttons_layout)
+        
+        self.summary_label = QLabel(central_widget)
+        layout.addWidget(self.summary_label)
+        
+        self.results_table = QTableWidget(0, 3, central_widget)
+        self.results_table.setHorizontalHeaderLabels(["ID", "Ім'я", ""])
+        self.results_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.results_table.verticalHeader().setVisible(False)
+        self.results_table.horizontalHeader().setStretchLastSection(True)
+        self.results_table.setColumnWidth(0, 60)
+        self.results_table.setColumnWidth(1, 250)
+        layout.addWidget(self.results_table)
+        
+        self.setCentralWidget(central_widget)
+        self.setup_connections()
+    
+    def _id_spinbox(self, parent) -> QSpinBox:
+        spinbox = QSpinBox(parent)
+        spinbox.setRange(1, 2_147_483_647)
+        spinbox.setMinimumWidth(90)
+        return spinbox
+    
+    def setup_connections(self) -> None:
+        self.associates_button.clicked.connect(self.on_find_associates)
+        self.component_button.clicked.connect(self.on_find_component)
+        self.path_button.clicked.connect(self.on_find_path)
+        self.reload_button.clicked.connect(self.reload_requested.emit)
+    
+    def _query_buttons(self) -> tuple:
+        return self.associates_button, self.component_button, self.path_button
+    
+    def show_graph_loading(self) -> None:
+        """Disable the buttons while the controller builds the association graph."""
+        self._graph_loading = True
+        for button in (*self._query_buttons(), self.reload_button):
+            button.setEnabled(False)
+        self.summary_label.setText(GRAPH_LOADING_TEXT)
+    
+    def set_graph_ready(self, ready: bool) -> None:
+        """Enable the buttons once the graph is built; after a failure only reloading is offered."""
+        for button in self._query_buttons():
+            button.setEnabled(ready)
+        self.reload_button.setEnabled(True)
+        if self._graph_loading:
+            self._graph_loading = False
+            self.summary_label.setText("" if ready else GRAPH_FAILED_TEXT)
+    
+    def selected_relations(self) -> int:
+        relations = 0
+        for relation, checkbox in self.relation_checkboxes.items():
+            if checkbox.isChecked():
+                relations |= relation
+        return relations
+    
+    def _check_relations(self) -> bool:
+        if self.selected_relations():
+            return True
+        QMessageBox.warning(self, "Попередження", "Виберіть хоча б один вид зв'язку")
+        return False
+    
+    def on_find_associates(self) -> None:
+        if self._check_relations():
+            self.associates_requested.emit(
+                self.criminal_spinbox.value(), self.hops_spinbox.value(), self.selected_relations()
+            )
+    
+    def on_find_component(self) -> None:
+        if self._check_relations():
+            self.component_requested.emit(self.criminal_spinbox.value(), self.selected_relations())
+    
+    def on_find_path(self) -> None:
+        if self._check_relations():
+            self.path_requested.emit(
+                self.criminal_spinbox.value(), self.target_spinbox.value(), self.selected_relations()
+            )
+    
+    def set_criminal(self, criminal_id: int) -> None:
+        self.criminal_spinbox.setValue(criminal_id)
+        self.summary_label.setText(GRAPH_LOADING_TEXT if self._graph_loading else "")
+        self._set_rows("", [])
+    
+    def _set_rows(self, third_column: str, rows: list) -> None:
+        self.results_table.setHorizontalHeaderLabels(["ID", "Ім'я", third_column])
+        self.results_table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                self.results_table.setItem(row, column, QTableWidgetItem(str(value)))
+    
+    def show_associates(self, associates: list, total: int) -> None:
+        shown = f" (показано {len(associates)})" if total > len(associates) else ""
+        self.summary_label.setText(f"Знайдено пов'язаних злочинців: {total}{shown}")
+        self._set_rows("Кроків", [(a["id"], a["name"], a["hops"]) for a in associates])
+    
+    def show_component(self, members: list, total: int) -> None:
+        shown = f" (показано {len(members)})" if total > len(members) else ""
+        self.summary_label.setText(f"Пов'язаних злочинців разом із вибраним: {total}{shown}")
+        self._set_rows("", [(m["id"], m["name"], "") for m in members])
+    
+    def show_path(self, steps: list | None) -> None:
+        if steps is None:
+            self.summary_label.setText("Зв'язку між злочинцями не знайдено")
+            self._set_rows("Зв'язок з попереднім", [])
+            return
+        
+        self.summary_label.setText(f"Кроків у найкоротшому ланцюжку: {len(steps) - 1}")
+        self._set_rows("Зв'язок з попереднім", [(step["id"], step["name"], step["link"]) for step in steps])
@@ -0,0 +1,129 @@
+from PySide6.QtCore import QSortFilterProxyModel, Qt
+
+from utils.filter_utils import TEXT, compile_filter, is_narrowing
+
+class ColumnFilterProxyModel(QSortFilterProxyModel):
+    """Per-column filtering with filters parsed once into predicates.
+
+    Subclasses map column numbers to filter kinds in column_kinds; columns not listed are
+    filtered as text. Source models provide raw cell values through filter_value(row, column).
+
+    The set of accepted source rows is cached. When a filter only narrows the previous one
+    (a new column filter, or more characters typed into a partial match), just the rows that
+    currently pass are re-tested.
+    """
+    column_kinds = {}
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        
+        self.column_filters = {}
+        self._predicates = {}
+        self._accepted = None
+    
+    def setSourceModel(self, model):
+        old_model = self.sourceModel()
+        if old_model is not None:
+            for signal in self._source_change_signals(old_model):
+                signal.disconnect(self._drop_accepted_rows)
+        
+        self._accepted = None
+        
+        # Connected before QSortFilterProxyModel's own handlers so the cache is dropped
+        # before the proxy re-filters changed rows
+        if model is not None:
+            for signal in self._source_change_signals(model):
+                signal.connect(self._drop_accepted_rows)
+        
+        super().setSourceModel(model)
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Source models sort with their own precomputed keys; the proxy keeps source order
+        # instead of comparing DisplayRole strings row by row
+        model = self.sourceModel()
+        if model is not None:
+            model.sort(column, order)
+    
+    def _source_change_signals(self, model):
+        return (
+            model.modelAboutToBeReset,
+            model.layoutAboutToBeChanged,
+            model.rowsAboutToBeInserted,
+            model.rowsAboutToBeRemoved,
+            model.dataChanged
+        )
+    
+    def _drop_accepted_rows(self, *args):
+        self._accepted = None
+        
+    def setColumnFilter(self, column, text):
+        """Set filter text for a specific column."""
+        kind = self.column_kinds.get(column, TEXT)
+        old_text = self.column_filters.get(column)
+        
+        if (text or None) == old_text:
+            return
+        
+        if not text:
+            del self.column_filters[column]
+            del self._predicates[column]
+            self._accepted = None
+        else:
+            narrowing = self._accepted is not None and is_narrowing(old_text, text, kind)
+            
+            self.column_filters[column] = text
+            self._predicates[column] = compile_filter(text, kind)
+            
+            if narrowing:
+                self._narrow_accepted_rows(column)
+            else:
+                self._accepted = None
+        
+        self._refilter()
+        
+    def clearFilters(self):
+        """Clear all filters."""
+        self.column_filters.clear()
+        self._predicates.clear()
+        self._accepted = None
+        self._refilter()
+    
+    def _refilter(self):
+        # A single layout change is far cheaper than the per-range row removal and
+        # insertion signals invalidateFilter() emits when thousands of rows change
+        self.invalidate()
+    
+    def _value_getter(self):
+        model = self.sourceModel()
+        if hasattr(model, 'filter_value'):
+            return model.filter_value
+        
+        return lambda row, column: model.data(model.index(row, column), Qt.DisplayRole)
+    
+    def _accept_all_rows(self):
+        value = self._value_getter()
+        predicates = list(self._predicates.items())
+        
+        self._accepted = bytearray(
+            all(predicate(value(row, column)) for column, predicate in predicates)
+            for row in range(self.sourceModel().rowCount())
+        )
+    
+    def _narrow_accepted_rows(self, column):
+        value = self._value_getter()
+        predicate = self._predicates[column]
+        accepted = self._accepted
+        
+        for row, is_accepted in enumerate(accepted):
+            if is_accepted and not predicate(value(row, column)):
+                accepted[row] = 0
+        
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._predicates:
+            return True
+        
+        if self._accepted is None:
+            self._accept_all_rows()
+        
+        return source_row < len(self._accepted) and bool(self._accepted[source_row])
\ No newline at end of file
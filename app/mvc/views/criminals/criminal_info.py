@@ -6,7 +6,7 @@ from datetime import datetime
 from .criminals_source import Ui_CriminalsWindow
 from .criminals_table import CriminalTableModel
 from .filterable_table_view import FilterableTableView
-from utils.export_utils import export_data_to_file
+from utils.export_utils import export_batches_to_file
 from utils.icon_utils import icon_manager
 
 class CriminalsView(QMainWindow):
@@ -16,6 +16,7 @@ class CriminalsView(QMainWindow):
     delete_criminal_requested = Signal(int)
     export_criminals_requested = Signal(bool)
     show_criminal_details_requested = Signal(int)
+    show_associations_requested = Signal(int)
     
     def __init__(self) -> None:
         super().__init__()
@@ -85,11 +86,15 @@ class CriminalsView(QMainWindow):
         view_details_action = QAction("Детальна інформація", self)
         view_details_action.triggered.connect(self.on_show_criminal_details)
         
+        associations_action = QAction("Зв'язки", self)
+        associations_action.triggered.connect(lambda: self.show_associations_requested.emit(self.selected_criminal_id))
+        
         context_menu.addAction(edit_action)
         context_menu.addAction(archive_action)
         context_menu.addSeparator()
         context_menu.addAction(delete_action)
         context_menu.addAction(view_details_action)
+        context_menu.addAction(associations_action)
 
         context_menu.exec_(QCursor.pos())
 
@@ -175,8 +180,6 @@ class CriminalsView(QMainWindow):
             self.selected_criminal_id = int(self.ui.tableView.model().data(id_index))
     
     def set_criminals_data(self, criminals) -> None:
-        self.full_data = criminals
-        
         model = CriminalTableModel(criminals)
         
         self.ui.tableView.setModel(model)
@@ -228,9 +231,5 @@ class CriminalsView(QMainWindow):
         dialog.accept()
         self.export_criminals_requested.emit(include_archived)
         
-    def export_criminals_data(self, data) -> None:
-        if not data:
-            QMessageBox.warning(self, "Експорт", "Немає даних для експорту.")
-            return
-        
-        export_data_to_file(data, self, f"злочинці_{datetime.now().strftime('%Y%m%d')}")
\ No newline at end of file
+    def export_criminals_data(self, columns, batches) -> None:
+        export_batches_to_file(columns, batches, self, f"злочинці_{datetime.now().strftime('%Y%m%d')}")
\ No newline at end of file
@@ -1,10 +1,14 @@
-from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QMessageBox
-from PySide6.QtCore import Signal, QDate, QRect
+from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QMessageBox, QListWidgetItem
+from PySide6.QtCore import Signal, QDate, QRect, Qt
 from .criminal_add import Ui_MainWindow
 from ..components.profession_selector import ProfessionSelector
 from ..components.language_selector import LanguageSelector
 from utils.spinbox_utils import safe_set_spinbox_value, safe_get_spinbox_value
 
+LOADING_TEXT = "Завантаження..."
+LOAD_FAILED_TEXT = "Не вдалося завантажити"
+REFERENCE_PARTS = ("cities", "professions", "gangs", "languages")
+
 class CriminalAddForm(QMainWindow):
     save_requested = Signal(dict)
     
@@ -13,6 +17,9 @@ class CriminalAddForm(QMainWindow):
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
         
+        self._pending_reference = set()
+        self._load_generation = 0
+        
         self.setup_custom_components()
         self.setup_connections()
         self.reset_form()
@@ -43,22 +50,91 @@ class CriminalAddForm(QMainWindow):
         self.ui.pushButton.clicked.connect(self.on_save)
     
     def load_reference_data(self, cities, professions, gangs, languages):
-        self.ui.comboBox_5.clear()  
-        self.ui.comboBox_6.clear()  
-        self.ui.comboBox_7.clear()  
+        self.set_reference_data("cities", cities)
+        self.set_reference_data("professions", professions)
+        self.set_reference_data("gangs", gangs)
+        self.set_reference_data("languages", languages)
+    
+    def show_loading_placeholders(self):
+        """Show the form before reference data arrives; each list fills in via set_reference_data.
+
+        Returns the load generation to pass back with the results; results of an earlier
+        load are ignored.
+        """
+        self._load_generation += 1
+        self._pending_reference = set(REFERENCE_PARTS)
+        self.ui.pushButton.setEnabled(False)
+        
+        for combo in (self.ui.comboBox_5, self.ui.comboBox_6, self.ui.comboBox_7, self.ui.comboBox_11):
+            combo.clear()
+            combo.setPlaceholderText(LOADING_TEXT)
+            combo.setEnabled(False)
+        
+        self.profession_selector.load_professions([])
+        self.profession_selector.profession_combo.setPlaceholderText(LOADING_TEXT)
+        self.profession_selector.setEnabled(False)
+        
+        self.language_selector.load_languages([])
+        placeholder = QListWidgetItem(LOADING_TEXT)
+        placeholder.setFlags(Qt.NoItemFlags)
+        self.ui.listWidget.addItem(placeholder)
+        return self._load_generation
+    
+    def _is_stale(self, generation):
+        return generation is not None and generation != self._load_generation
+    
+    def set_reference_data(self, kind, items, generation=None):
+        """Fill one reference list ("cities", "professions", "gangs" or "languages")."""
+        if self._is_stale(generation):
+            return
+        
+        if kind == "cities":
+            self.load_cities(items)
+        elif kind == "professions":
+            self.profession_selector.load_professions(items)
+            self.profession_selector.setEnabled(True)
+        elif kind == "gangs":
+            self.load_gangs(items)
+        elif kind == "languages":
+            self.load_languages(items)
+        
+        self._pending_reference.discard(kind)
+        if not self._pending_reference:
+            self.ui.pushButton.setEnabled(True)
+    
+    def show_load_error(self, generation=None):
+        """Stop waiting for reference lists that failed to load; the error itself is reported by the controller."""
+        if self._is_stale(generation):
+            return
+        
+        if "cities" in self._pending_reference:
+            for combo in (self.ui.comboBox_5, self.ui.comboBox_6, self.ui.comboBox_7):
+                combo.setPlaceholderText(LOAD_FAILED_TEXT)
+        if "professions" in self._pending_reference:
+            self.profession_selector.profession_combo.setPlaceholderText(LOAD_FAILED_TEXT)
+        if "gangs" in self._pending_reference:
+            self.ui.comboBox_11.setPlaceholderText(LOAD_FAILED_TEXT)
+        if "languages" in self._pending_reference:
+            self.ui.listWidget.clear()
+            placeholder = QListWidgetItem(LOAD_FAILED_TEXT)
+            placeholder.setFlags(Qt.NoItemFlags)
+            self.ui.listWidget.addItem(placeholder)
+        
+        self._pending_reference = set()
+        self.ui.pushButton.setEnabled(True)
+    
+    def load_cities(self, cities):
+        for combo in (self.ui.comboBox_5, self.ui.comboBox_6, self.ui.comboBox_7):
+            combo.clear()
+            combo.setEnabled(True)
         
         for city in cities:
             display_text = f"{city['name']}, {city['country']}"
             self.ui.comboBox_5.addItem(display_text, city['id'])
             self.ui.comboBox_6.addItem(display_text, city['id'])
             self.ui.comboBox_7.addItem(display_text, city['id'])
-        
-        self.profession_selector.load_professions(professions)
-        
-        # Load gangs directly
-        self.load_gangs(gangs)
-        
-        # Load languages
+    
+    def load_languages(self, languages):
         self.ui.listWidget.clear()
         if languages:
             print(f"Loading {len(languages)} languages")
@@ -146,6 +222,7 @@ class CriminalAddForm(QMainWindow):
         """Load gangs directly into the existing combobox."""
         combo = self.ui.comboBox_11
         combo.clear()
+        combo.setEnabled(True)
         combo.addItem("Немає", None)
         for gang in gangs:
             combo.addItem(gang["name"], gang["id"])
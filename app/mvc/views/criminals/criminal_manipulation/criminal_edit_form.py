@@ -1,9 +1,10 @@
-from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QMessageBox
-from PySide6.QtCore import Signal, QDate, QRect
+from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QMessageBox, QListWidgetItem
+from PySide6.QtCore import Signal, QDate, QRect, Qt
 from .criminal_edit import Ui_MainWindow
 from ..components.profession_selector import ProfessionSelector
 from ..components.language_selector import LanguageSelector
 from utils.spinbox_utils import set_spinbox_with_data, safe_get_spinbox_value
+from .criminal_add_form import LOADING_TEXT, LOAD_FAILED_TEXT, REFERENCE_PARTS
 
 class CriminalEditForm(QMainWindow):
     update_requested = Signal(int, dict)
@@ -18,6 +19,8 @@ class CriminalEditForm(QMainWindow):
         self.setup_connections()
         
         self.criminal_id = None
+        self._pending_reference = set()
+        self._load_generation = 0
     
     def setup_custom_components(self):
         self.profession_container = QWidget(self.ui.centralwidget)
@@ -43,20 +46,99 @@ class CriminalEditForm(QMainWindow):
         self.ui.pushButton_2.clicked.connect(self.on_update)
     
     def load_reference_data(self, cities, professions, gangs, languages):
-        self.ui.comboBox_8.clear()  
-        self.ui.comboBox_9.clear()  
-        self.ui.comboBox_10.clear()  
+        self.set_reference_data("cities", cities)
+        self.set_reference_data("professions", professions)
+        self.set_reference_data("gangs", gangs)
+        self.set_reference_data("languages", languages)
+    
+    def show_loading_placeholders(self):
+        """Show the form before reference data and the record arrive; see set_reference_data.
+
+        Returns the load generation to pass back with the results, so a record still loading
+        for a previously opened criminal cannot replace this one.
+        """
+        self._load_generation += 1
+        self.criminal_id = None
+        self._pending_reference = set(REFERENCE_PARTS) | {"criminal"}
+        self.ui.pushButton_2.setEnabled(False)
+        
+        for combo in (self.ui.comboBox_8, self.ui.comboBox_9, self.ui.comboBox_10, self.ui.comboBox_12):
+            combo.clear()
+            combo.setPlaceholderText(LOADING_TEXT)
+            combo.setEnabled(False)
+        
+        self.profession_selector.load_professions([])
+        self.profession_selector.clear_selection()
+        self.profession_selector.profession_combo.setPlaceholderText(LOADING_TEXT)
+        self.profession_selector.setEnabled(False)
+        
+        self.language_selector.load_languages([])
+        placeholder = QListWidgetItem(LOADING_TEXT)
+        placeholder.setFlags(Qt.NoItemFlags)
+        self.ui.listWidget_2.addItem(placeholder)
+        return self._load_generation
+    
+    def _is_stale(self, generation):
+        return generation is not None and generation != self._load_generation
+    
+    def set_reference_data(self, kind, items, generation=None):
+        """Fill one reference list ("cities", "professions", "gangs" or "languages")."""
+        if self._is_stale(generation):
+            return
+        
+        if kind == "cities":
+            self.load_cities(items)
+        elif kind == "professions":
+            self.profession_selector.load_professions(items)
+            self.profession_selector.setEnabled(True)
+        elif kind == "gangs":
+            self.load_gangs(items)
+        elif kind == "languages":
+            self.load_languages(items)
+        
+        self._mark_loaded(kind)
+    
+    def _mark_loaded(self, kind):
+        self._pending_reference.discard(kind)
+        if not self._pending_reference:
+            self.ui.pushButton_2.setEnabled(True)
+    
+    def show_load_error(self, generation=None):
+        """Stop waiting for data that failed to load; the error itself is reported by the controller.
+
+        Saving stays disabled unless the record was loaded.
+        """
+        if self._is_stale(generation):
+            return
+        
+        if "cities" in self._pending_reference:
+            for combo in (self.ui.comboBox_8, self.ui.comboBox_9, self.ui.comboBox_10):
+                combo.setPlaceholderText(LOAD_FAILED_TEXT)
+        if "professions" in self._pending_reference:
+            self.profession_selector.profession_combo.setPlaceholderText(LOAD_FAILED_TEXT)
+        if "gangs" in self._pending_reference:
+            self.ui.comboBox_12.setPlaceholderText(LOAD_FAILED_TEXT)
+        if "languages" in self._pending_reference:
+            self.ui.listWidget_2.clear()
+            placeholder = QListWidgetItem(LOAD_FAILED_TEXT)
+            placeholder.setFlags(Qt.NoItemFlags)
+            self.ui.listWidget_2.addItem(placeholder)
+        
+        self._pending_reference = set()
+        self.ui.pushButton_2.setEnabled(self.criminal_id is not None)
+    
+    def load_cities(self, cities):
+        for combo in (self.ui.comboBox_8, self.ui.comboBox_9, self.ui.comboBox_10):
+            combo.clear()
+            combo.setEnabled(True)
         
         for city in cities:
             display_text = f"{city['name']}, {city['country']}"
             self.ui.comboBox_8.addItem(display_text, city['id'])
             self.ui.comboBox_9.addItem(display_text, city['id'])
             self.ui.comboBox_10.addItem(display_text, city['id'])
-        
-        self.profession_selector.load_professions(professions)
-        
-        self.load_gangs(gangs)
-        
+    
+    def load_languages(self, languages):
         self.ui.listWidget_2.clear()
         if languages:
             print(f"Loading {len(languages)} languages")
@@ -64,8 +146,12 @@ class CriminalEditForm(QMainWindow):
         else:
             print("No languages data provided")
     
-    def set_criminal_data(self, criminal_id, data):
+    def set_criminal_data(self, criminal_id, data, generation=None):
+        if not data or self._is_stale(generation):
+            return
+        
         self.criminal_id = criminal_id
+        self._mark_loaded("criminal")
         
         self.ui.lineEdit_17.setText(data.get("first_name", ""))  
         self.ui.lineEdit_11.setText(data.get("last_name", ""))   
@@ -184,6 +270,7 @@ class CriminalEditForm(QMainWindow):
     def load_gangs(self, gangs):
         combo = self.ui.comboBox_12
         combo.clear()
+        combo.setEnabled(True)
         combo.addItem("Немає", None)
         for gang in gangs:
             combo.addItem(gang["name"], gang["id"])
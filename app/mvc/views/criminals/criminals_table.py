@@ -1,90 +1,144 @@
+import numpy as np
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
 
+from utils.format_utils import date_text
+
+SORT_KEYS = [
+    "id_criminal", "first_name", "last_name", "nickname",
+    "date_of_birth", "birth_place", "residence", "height", "weight", "group_name"
+]
+NUMERIC_COLUMNS = {0, 7, 8}
+GROUP_COLUMN = 9
+
 class CriminalTableModel(QAbstractTableModel):
+    """Criminals table stored column by column.
+
+    Display strings are built once when data is loaded, so painting a cell is two list
+    lookups. Sorting argsorts a per-column key array (built on first use) and only
+    permutes the row order; the stored columns are never reordered.
+    """
     def __init__(self, data=None):
         super().__init__()
-        self._data = data or []
         self._headers = [
-            "ID", 
-            "Ім'я", 
-            "Прізвище", 
-            "Кличка", 
-            "Дата народження", 
-            "Місце народження", 
+            "ID",
+            "Ім'я",
+            "Прізвище",
+            "Кличка",
+            "Дата народження",
+            "Місце народження",
             "Місце проживання",
             "Зріст",
             "Вага",
             "Угруповання"
         ]
-    
+        self._load(data or [])
+
+    def _load(self, data):
+        self._row_count = len(data)
+        self._order = list(range(self._row_count))
+        self._sort_keys = {}
+
+        self._fields = {key: [criminal.get(key) for criminal in data] for key in SORT_KEYS}
+        roles = [criminal.get("role") for criminal in data]
+
+        # Few distinct heights, weights and group/role pairs: share their display strings
+        height_text = {}
+        weight_text = {}
+        group_text = {}
+
+        self._display = [
+            [str(value) if value is not None else "" for value in self._fields["id_criminal"]],
+            self._fields["first_name"],
+            self._fields["last_name"],
+            self._fields["nickname"],
+            [date_text(value) for value in self._fields["date_of_birth"]],
+            self._fields["birth_place"],
+            self._fields["residence"],
+            [self._cached_text(height_text, value, "{} см") for value in self._fields["height"]],
+            [self._cached_text(weight_text, value, "{} кг") for value in self._fields["weight"]],
+            [self._group_text(group_text, group, role) for group, role in zip(self._fields["group_name"], roles)]
+        ]
+
+        self._filter_values = [self._fields[key] for key in SORT_KEYS]
+        self._filter_values[GROUP_COLUMN] = self._display[GROUP_COLUMN]
+
+    @staticmethod
+    def _cached_text(cache, value, template):
+        if not value:
+            return ""
+        text = cache.get(value)
+        if text is None:
+            text = cache[value] = template.format(value)
+        return text
+
+    @staticmethod
+    def _group_text(cache, group_name, role):
+        if not group_name:
+            return ""
+        text = cache.get((group_name, role))
+        if text is None:
+            role_info = f" ({role})" if role else ""
+            text = cache[(group_name, role)] = f"{group_name}{role_info}"
+        return text
+
     def rowCount(self, parent=QModelIndex()):
-        return len(self._data)
-    
+        return self._row_count
+
     def columnCount(self, parent=QModelIndex()):
         return len(self._headers)
-    
+
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid() or \
-        not (0 <= index.row() < len(self._data)) or \
-        not (0 <= index.column() < len(self._headers)):
+        if role != Qt.DisplayRole or not index.isValid():
             return None
-        
+
         row = index.row()
         col = index.column()
-        criminal = self._data[row]
-        
-        if role == Qt.DisplayRole:
-            if col == 0:
-                return str(criminal.get("id_criminal", ""))
-            elif col == 1:
-                return criminal.get("first_name", "")
-            elif col == 2: 
-                return criminal.get("last_name", "")
-            elif col == 3:
-                return criminal.get("nickname", "")
-            elif col == 4:
-                return criminal.get("date_of_birth", "")
-            elif col == 5: 
-                return criminal.get("birth_place", "")
-            elif col == 6: 
-                return criminal.get("residence", "")
-            elif col == 7:  
-                return f"{criminal.get('height', '')} см" if criminal.get('height') else ""
-            elif col == 8:
-                return f"{criminal.get('weight', '')} кг" if criminal.get('weight') else ""
-            elif col == 9:
-                if criminal.get("group_name"):
-                    role_info = f" ({criminal.get('role')})" if criminal.get('role') else ""
-                    return f"{criminal.get('group_name')}{role_info}"
-                return ""
-    
+        if not (0 <= row < self._row_count and 0 <= col < len(self._display)):
+            return None
+
+        return self._display[col][self._order[row]]
+
+    def filter_value(self, row, column):
+        """Raw value of a cell for the filter proxy, without display formatting."""
+        return self._filter_values[column][self._order[row]]
+
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole and orientation == Qt.Horizontal:
             return self._headers[section]
         return None
-    
+
+    def _sort_key(self, column):
+        """(values, is_null) arrays for a column, built once per loaded data set."""
+        if column not in self._sort_keys:
+            values = self._fields[SORT_KEYS[column]]
+            nulls = np.fromiter((value is None for value in values), dtype=bool, count=self._row_count)
+
+            if column in NUMERIC_COLUMNS:
+                keys = np.fromiter((value if value is not None else 0 for value in values), dtype=np.float64, count=self._row_count)
+            else:
+                keys = np.array([str(value) if value is not None else "" for value in values])
+
+            self._sort_keys[column] = (keys, nulls)
+        return self._sort_keys[column]
+
     def sort(self, column, order):
         """Sort table by given column and order."""
+        if not (0 <= column < len(SORT_KEYS)) or not self._row_count:
+            return
+
         self.layoutAboutToBeChanged.emit()
-        
-        sort_keys = [
-            "id_criminal", "first_name", "last_name", "nickname", 
-            "date_of_birth", "birth_place", "residence", "height", "weight", "group_name"
-        ]
-        
-        if 0 <= column < len(sort_keys):
-            key = sort_keys[column]
-            reverse = order == Qt.DescendingOrder
-            
-            self._data.sort(
-                key=lambda x: (x.get(key) is None, x.get(key)),
-                reverse=reverse
-            )
-        
+
+        keys, nulls = self._sort_key(column)
+        # Empty values last, as with the (is None, value) sort key used before
+        ordered = np.lexsort((keys, nulls))
+        if order == Qt.DescendingOrder:
+            ordered = ordered[::-1]
+        self._order = ordered.tolist()
+
         self.layoutChanged.emit()
-    
+
     def update_data(self, data):
         """Update the model with new data."""
         self.beginResetModel()
-        self._data = data
-        self.endResetModel()
\ No newline at end of file
+        self._load(data)
+        self.endResetModel()
@@ -1,8 +1,11 @@
 from PySide6.QtWidgets import (QHeaderView, QLineEdit, QWidget, 
                              QHBoxLayout, QVBoxLayout, QApplication)
-from PySide6.QtCore import Qt, Signal, QSize, QRect, QPoint, QEvent
+from PySide6.QtCore import Qt, Signal, QSize, QRect, QPoint, QEvent, QTimer
 from PySide6.QtGui import QPainter, QFontMetrics
 
+# Filters are applied once typing pauses for this long, not on every keystroke
+FILTER_DEBOUNCE_MS = 250
+
 class FilterHeaderView(QHeaderView):
     filterChanged = Signal(int, str)
     
@@ -11,6 +14,7 @@ class FilterHeaderView(QHeaderView):
         
         self.filter_widgets = []
         self.filter_containers = []
+        self.filter_timers = []
         
         self.filter_visible = True
         
@@ -38,9 +42,14 @@ class FilterHeaderView(QHeaderView):
         
         for container in self.filter_containers:
             container.deleteLater()
+        
+        for timer in self.filter_timers:
+            timer.stop()
+            timer.deleteLater()
             
         self.filter_widgets = []
         self.filter_containers = []
+        self.filter_timers = []
         
         if model:
             for col in range(model.columnCount()):
@@ -53,12 +62,19 @@ class FilterHeaderView(QHeaderView):
                 filter_widget = QLineEdit(container)
                 filter_widget.setPlaceholderText("Фільтр...")
                 
-                filter_widget.textChanged.connect(lambda text, col=col: self.filterChanged.emit(col, text))
+                filter_timer = QTimer(self)
+                filter_timer.setSingleShot(True)
+                filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+                filter_timer.timeout.connect(lambda col=col: self._emitFilterChanged(col))
+                
+                filter_widget.textChanged.connect(lambda _, timer=filter_timer: timer.start())
+                filter_widget.returnPressed.connect(lambda col=col: self._emitFilterChanged(col))
                 
                 layout.addWidget(filter_widget)
                 
                 self.filter_widgets.append(filter_widget)
                 self.filter_containers.append(container)
+                self.filter_timers.append(filter_timer)
 
                 tooltip_text = "Фільтрувати за частковим збігом\n"
             
@@ -81,6 +97,11 @@ class FilterHeaderView(QHeaderView):
                 self._updateFilterPosition(col)
 
                 
+    def _emitFilterChanged(self, col):
+        """Emit the current text of a filter once typing has paused or Enter was pressed."""
+        self.filter_timers[col].stop()
+        self.filterChanged.emit(col, self.filter_widgets[col].text())
+                
     def sectionResized(self, logicalIndex, oldSize, newSize):
         """Handle section resize events."""
         super().sectionResized(logicalIndex, oldSize, newSize)
@@ -147,6 +168,10 @@ class FilterHeaderView(QHeaderView):
         if self.filter_widgets:
             for widget in self.filter_widgets:
                 widget.clear()
+            
+            # The caller clears the model filters directly
+            for timer in self.filter_timers:
+                timer.stop()
     
     def eventFilter(self, obj, event):
         """Filter events for child widgets."""
@@ -4,10 +4,11 @@ from .filter_header_view import FilterHeaderView
 from .criminal_filter_model import CriminalFilterProxyModel
 
 class FilterableTableView(QTableView):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, filter_model_class=CriminalFilterProxyModel):
         super().__init__(parent)
         
         self.filter_model = None
+        self.filter_model_class = filter_model_class
         
         self.filter_header = FilterHeaderView(Qt.Horizontal, self)
         self.setHorizontalHeader(self.filter_header)
@@ -20,7 +21,7 @@ class FilterableTableView(QTableView):
         self.setSelectionMode(QTableView.SingleSelection)
         
     def setModel(self, model):
-        self.filter_model = CriminalFilterProxyModel(self)
+        self.filter_model = self.filter_model_class(self)
         self.filter_model.setSourceModel(model)
         
         super().setModel(self.filter_model)
@@ -1,31 +1,396 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
 from bokeh.plotting import figure
-from bokeh.layouts import layout
-from bokeh.models import ColumnDataSource, HoverTool
-from bokeh.embed import file_html
-from bokeh.resources import CDN
-from bokeh.palettes import Category10
+from bokeh.layouts import column
+from bokeh.models import BoxSelectTool, ColumnDataSource, CustomJS, HoverTool, LinearColorMapper, Select
+from bokeh.embed import json_item
+from bokeh.resources import Resources
+from bokeh.palettes import Blues9, Category10
 from bokeh.transform import factor_cmap
 import pandas as pd
-from datetime import datetime
+
+from .dashboard_analytics import (
+    age_group_counts, crime_cube, map_markers, monthly_counts, monthly_counts_from_cube, parse_dates,
+    profession_crime_type_table, top_frequencies, trend_cube, yearly_from_monthly
+)
+
+# Charts in page order, two per row
+CHART_LAYOUT = [
+    "crime_types", "age",
+    "temporal", "gangs",
+    "profession", "language",
+    "profession_crime_type", "crime_map"
+]
+
+# Data cubes shared by the cross-filtered charts; cached and updated like a chart.
+# "criminals" counts each criminal once (by their latest crime), "trends" counts every
+# crime from the daily rollup but has no age dimension.
+CROSS_FILTER = "cross_filter"
+DASHBOARD_PARTS = CHART_LAYOUT + [CROSS_FILTER]
+
+# Named sources whose "count" column follows the selections made in the other charts,
+# totalled over the first of "cubes" the page has
+CROSS_FILTER_BINDINGS = [
+    {"source": "crime_types_source", "dimension": "crime_type", "key": "crime_type", "cubes": ["criminals"]},
+    {"source": "age_source", "dimension": "age_group", "key": "age_group", "cubes": ["criminals"]},
+    {"source": "gangs_source", "dimension": "gang", "key": "name", "cubes": ["criminals"]},
+    {"source": "temporal_monthly_source", "dimension": "month", "key": "month_key",
+     "cubes": ["trends", "criminals"]},
+    {"source": "temporal_yearly_source", "dimension": "month", "key": "year", "per_year": True,
+     "cubes": ["trends", "criminals"]}
+]
+
+CHART_DIMENSIONS = {
+    "crime_types": "crime_type",
+    "age": "age_group",
+    "gangs": "gang",
+    "temporal": "month"
+}
+
+# Crime map: metrics the markers can be sized by, and the visible longitude span above
+# which cities are shown summed per country
+MAP_METRIC_LABELS = {
+    "crimes": "Злочини",
+    "births": "Народжені",
+    "residents": "Мешканці",
+    "gangs": "Бази угруповань"
+}
+MAP_COUNTRY_SPAN = 30
+
+MAP_ZOOM_CALLBACK = """
+const countryView = x_range.end - x_range.start > span;
+countries.visible = countryView;
+cities.visible = !countryView;
+"""
+
+MAP_METRIC_CALLBACK = """
+for (const markers of [countries, cities]) {
+    markers.glyph.size = {field: select.value + "_size"};
+}
+"""
+
+CROSS_FILTER_CALLBACK = """
+if (window.dashboardFilter) {{
+    const keys = source.selected.indices.map(i => source.data[{key}][i]);
+    window.dashboardFilter.select({dimension}, keys, {per_year});
+}}
+"""
+
+CROSS_FILTER_SCRIPT = """
+window.dashboardFilter = {
+    cubes: {},
+    codes: {},
+    selected: {},
+    bindings: BINDINGS,
+    chartDimensions: CHART_DIMENSIONS,
+
+    setCubes(cubes) {
+        this.cubes = {};
+        this.codes = {};
+        this.selected = {};
+        for (const [name, cube] of Object.entries(cubes || {})) {
+            if (!cube) {
+                continue;
+            }
+            this.cubes[name] = cube;
+            this.codes[name] = {};
+            // Codes per label; gangs sharing a name have a code each in the trend cube
+            for (const [dimension, labels] of Object.entries(cube.labels)) {
+                const codes = new Map();
+                labels.forEach((label, code) => codes.set(label, (codes.get(label) || []).concat(code)));
+                this.codes[name][dimension] = codes;
+            }
+        }
+        this.update();
+    },
+
+    // Selections are kept as chart keys (labels, month keys) so they apply to every cube
+    select(dimension, keys, perYear) {
+        if (keys.length === 0) {
+            delete this.selected[dimension];
+        } else {
+            const selected = new Set();
+            for (const key of keys) {
+                if (perYear) {
+                    for (let month = 0; month < 12; month++) {
+                        selected.add(key * 12 + month);
+                    }
+                } else {
+                    selected.add(key);
+                }
+            }
+            this.selected[dimension] = selected;
+        }
+        this.update();
+    },
+
+    clearChart(name) {
+        const dimension = this.chartDimensions[name];
+        if (dimension) {
+            delete this.selected[dimension];
+        }
+    },
+
+    findSource(name) {
+        for (const doc of Bokeh.documents) {
+            const model = doc.get_model_by_name(name);
+            if (model) {
+                return model;
+            }
+        }
+        return null;
+    },
+
+    selectedCodes(name, dimension) {
+        const codes = this.codes[name][dimension];
+        const keys = this.selected[dimension];
+        if (!codes) {
+            return keys;
+        }
+
+        const selected = new Set();
+        for (const key of keys) {
+            for (const code of codes.get(key) || []) {
+                selected.add(code);
+            }
+        }
+        return selected;
+    },
+
+    // Counts per key of one dimension over the rows of a cube matching the selections in
+    // every other dimension that cube has
+    totals(name, dimension) {
+        const cube = this.cubes[name];
+        const filters = Object.keys(this.selected)
+            .filter(other => other !== dimension && other in cube)
+            .map(other => [cube[other], this.selectedCodes(name, other)]);
+        const values = cube[dimension];
+        const labels = cube.labels[dimension];
+        const totals = new Map();
+
+        rows: for (let row = 0; row < cube.count.length; row++) {
+            for (const [column, codes] of filters) {
+                if (!codes.has(column[row])) {
+                    continue rows;
+                }
+            }
+            const key = labels ? labels[values[row]] : values[row];
+            totals.set(key, (totals.get(key) || 0) + cube.count[row]);
+        }
+        return totals;
+    },
+
+    update() {
+        const totalsByCube = {};
+        for (const binding of this.bindings) {
+            const name = binding.cubes.find(cube => cube in this.cubes);
+            const source = this.findSource(binding.source);
+            if (name === undefined || !source) {
+                continue;
+            }
+
+            const id = name + "." + binding.dimension;
+            if (!(id in totalsByCube)) {
+                totalsByCube[id] = this.totals(name, binding.dimension);
+            }
+            const totals = totalsByCube[id];
+
+            const count = Array.from(source.data[binding.key], key => {
+                if (binding.per_year) {
+                    let sum = 0;
+                    for (let month = 0; month < 12; month++) {
+                        sum += totals.get(key * 12 + month) || 0;
+                    }
+                    return sum;
+                }
+                return totals.get(key) || 0;
+            });
+            source.data = Object.assign({}, source.data, {count});
+        }
+    }
+};
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="uk">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{scripts}
+<style>
+    html, body {{ height: 100%; margin: 0; }}
+    #dashboard {{
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        grid-auto-rows: minmax(350px, 1fr);
+        gap: 8px;
+        height: 100%;
+        box-sizing: border-box;
+        padding: 8px;
+    }}
+</style>
+</head>
+<body>
+<div id="dashboard">
+{chart_divs}
+</div>
+<script>
+    {cross_filter_script}
+
+    const chartDocuments = {{}};
+
+    // Replace one chart in place; BokehJS itself stays loaded for the lifetime of the page
+    async function renderChart(name, item) {{
+        const previous = chartDocuments[name];
+        if (previous) {{
+            previous.clear();
+            Bokeh.documents.splice(Bokeh.documents.indexOf(previous), 1);
+        }}
+
+        const target = document.getElementById("chart-" + name);
+        target.replaceChildren();
+        await Bokeh.embed.embed_item(item, target.id);
+        chartDocuments[name] = Bokeh.documents[Bokeh.documents.length - 1];
+    }}
+
+    async function renderCharts(items) {{
+        await Promise.all(Object.entries(items).map(([name, item]) => {{
+            window.dashboardFilter.clearChart(name);
+            return renderChart(name, item);
+        }}));
+        // Freshly rendered charts show unfiltered totals until the selections are applied
+        window.dashboardFilter.update();
+    }}
+
+</script>
+</body>
+</html>
+"""
+
+@lru_cache(maxsize=1)
+def bokeh_script_urls() -> tuple:
+    """file:// URLs of the BokehJS bundle installed with the bokeh package."""
+    return tuple(Path(path).as_uri() for path in Resources(mode="absolute").js_files)
+
+def dashboard_base_url() -> str:
+    """Base URL for the page, so the web view may load the local BokehJS files."""
+    return bokeh_script_urls()[0].rsplit("/", 1)[0] + "/"
+
+def _script_json(value) -> str:
+    # Safe to embed inside a <script> element
+    return json.dumps(value, ensure_ascii=False).replace("</", "<\\/")
+
+def cross_filter_script() -> str:
+    """JavaScript defining window.dashboardFilter for the page's bindings and charts."""
+    return (CROSS_FILTER_SCRIPT
+        .replace("BINDINGS", _script_json(CROSS_FILTER_BINDINGS))
+        .replace("CHART_DIMENSIONS", _script_json(CHART_DIMENSIONS)))
 
 class CriminalDashboard:
-    def __init__(self, data: dict) -> None:
-        self.df = pd.DataFrame(data)
+    def __init__(self, data: dict, frequencies: dict | None = None,
+                 chart_cache: dict | None = None, chart_versions: dict | None = None) -> None:
+        self.data = data
+        self.frequencies = frequencies or {}
         self.charts = {}
+        
+        # chart name -> (version token, serialized chart), kept by the caller between renders
+        self.chart_cache = chart_cache if chart_cache is not None else {}
+        self.chart_versions = chart_versions or {}
+        self._df = None
+        self._trend_cube = None
+        
+        self.chart_builders = {
+            'crime_types': self.create_crime_types_chart,
+            'temporal': self.create_temporal_trends_chart,
+            'age': self.create_age_distribution_chart,
+            'profession': self.create_profession_chart,
+            'gangs': self.create_gang_chart,
+            'language': self.create_language_chart,
+            'profession_crime_type': self.create_profession_crime_type_chart,
+            'crime_map': self.create_crime_map_chart
+        }
+    
+    @property
+    def df(self) -> pd.DataFrame:
+        # Built only when a chart that reads the export rows has to be recomputed
+        if self._df is None:
+            self._df = pd.DataFrame(self.data)
+        return self._df
+    
+    @property
+    def crime_trends_cube(self) -> dict | None:
+        # Every crime per (crime type, gang, month), when the dashboard was given the rollup trends
+        if self._trend_cube is None:
+            self._trend_cube = trend_cube(self.frequencies.get('crime_trends'))
+        return self._trend_cube
+    
+    def create_dashboard(self) -> str:
+        """Page shell: local BokehJS scripts and an empty cell per chart.
+        
+        The charts are not inlined, as setHtml cannot show pages over 2 MB; once the page
+        has loaded, create_update_script(DASHBOARD_PARTS) renders them into it.
+        """
+        scripts = "\n".join(f'<script src="{url}"></script>' for url in bokeh_script_urls())
+        chart_divs = "\n".join(f'<div id="chart-{name}"></div>' for name in CHART_LAYOUT)
+        
+        return PAGE_TEMPLATE.format(
+            title="Дашборд злочинців",
+            scripts=scripts,
+            chart_divs=chart_divs,
+            cross_filter_script=cross_filter_script()
+        )
+    
+    def create_update_script(self, names) -> str:
+        """JavaScript that re-renders the given charts in an already loaded dashboard page."""
+        script = ""
+        if CROSS_FILTER in names:
+            script += f"window.dashboardFilter.setCubes({_script_json(self.get_chart_item(CROSS_FILTER))});"
+        
+        charts = [name for name in names if name in CHART_LAYOUT]
+        return script + f"renderCharts({_script_json(self.get_chart_items(charts))});"
+    
+    def get_chart_items(self, names) -> dict:
+        return {name: self.get_chart_item(name) for name in names}
+    
+    def get_chart_item(self, name: str) -> dict:
+        """Reuse the cached chart while its data version is unchanged, otherwise rebuild it."""
+        token = self.chart_versions.get(name)
+        cached = self.chart_cache.get(name)
+        if token is not None and cached is not None and cached[0] == token:
+            return cached[1]
+        
+        if name == CROSS_FILTER:
+            item = {"criminals": self.create_crime_cube(), "trends": self.crime_trends_cube}
+        else:
+            chart = self.chart_builders[name]()
+            chart.sizing_mode = 'stretch_both'
+            self.charts[name] = chart
+            item = json_item(chart)
+        
+        if token is not None:
+            self.chart_cache[name] = (token, item)
+        return item
     
-    def create_dashboard(self) -> None:
-        self.charts['crime_types'] = self.create_crime_types_chart()
-        self.charts['temporal'] = self.create_temporal_trends_chart()
-        self.charts['age'] = self.create_age_distribution_chart()
-        self.charts['profession'] = self.create_profession_chart()
-        
-        dashboard = layout([
-            [self.charts['crime_types'], self.charts['age']],
-            [self.charts['temporal'], self.charts['profession']]
-        ], sizing_mode='stretch_both')
-        
-        html = file_html(dashboard, CDN, "Дашборд злочинців")
-        return html
+    def create_crime_cube(self) -> dict | None:
+        """Criminals cube for the page's cross-filter, or None when the export has no such columns."""
+        columns = ['Тип злочину', 'Дата народження', 'Угруповання', 'Дата останньої справи']
+        if len(self.data) == 0 or not all(column in self.df.columns for column in columns):
+            return None
+        
+        return crime_cube(*(self.df[column] for column in columns))
+    
+    def add_cross_filter(self, source: ColumnDataSource, dimension: str, key: str, per_year: bool = False) -> None:
+        """Report selections made in this source to the page's cross-filter."""
+        source.selected.js_on_change('indices', CustomJS(
+            args=dict(source=source),
+            code=CROSS_FILTER_CALLBACK.format(
+                dimension=json.dumps(dimension),
+                key=json.dumps(key),
+                per_year=json.dumps(per_year)
+            )
+        ))
     
     def create_empty_chart(self, message: str) -> None:
         p = figure(height=350, tools="")
@@ -47,18 +412,18 @@ class CriminalDashboard:
             if len(crime_counts) == 0:
                 return self.create_empty_chart("Немає даних про типи злочинів")
             
-            source = ColumnDataSource(crime_counts)
+            source = ColumnDataSource(crime_counts, name="crime_types_source")
+            self.add_cross_filter(source, "crime_type", "crime_type")
             
             p = figure(
                 x_range=crime_counts['crime_type'].tolist(),
                 height=350,
                 title="Розподіл за типами злочинів",
                 toolbar_location="right",
-                tools="pan,box_zoom,reset,save"
+                tools="pan,box_zoom,tap,reset,save"
             )
             
-            color_palette = Category10[len(crime_counts) if len(crime_counts) < 10 else 10]
-            color_mapper = factor_cmap('crime_type', palette=color_palette, factors=crime_counts['crime_type'].tolist())
+            color_mapper = factor_cmap('crime_type', palette=Category10[10][:len(crime_counts)], factors=crime_counts['crime_type'].tolist())
             
             bars = p.vbar(
                 x='crime_type',
@@ -82,32 +447,26 @@ class CriminalDashboard:
         else:
             return self.create_empty_chart("Немає даних про типи злочинів")
     
-    def create_temporal_trends_chart(self) -> figure:
+    def get_monthly_crime_counts(self) -> pd.DataFrame | None:
+        """Crimes per month from the daily rollup, or from each criminal's latest crime without it."""
+        if self.crime_trends_cube is not None:
+            return monthly_counts_from_cube(self.crime_trends_cube)
+        
         if 'Дата останньої справи' in self.df.columns and not self.df['Дата останньої справи'].isna().all():
-            self.df['date'] = pd.to_datetime(self.df['Дата останньої справи'], errors='coerce')
-            
-            df_dates = self.df[self.df['date'].notna()].copy()
-            
-            if len(df_dates) == 0:
+            return monthly_counts(parse_dates(self.df['Дата останньої справи']))
+        return None
+    
+    def create_temporal_trends_chart(self) -> figure:
+        monthly = self.get_monthly_crime_counts()
+        if monthly is not None:
+            if len(monthly) == 0:
                 return self.create_empty_chart("Немає даних про дати злочинів")
-                
-            df_dates['year'] = df_dates['date'].dt.year
-            df_dates['month'] = df_dates['date'].dt.month
-            df_dates['year_month'] = df_dates['date'].dt.to_period('M')
             
-            yearly_counts = df_dates.groupby('year').size().reset_index()
-            yearly_counts.columns = ['year', 'count']
-            yearly_counts = yearly_counts.sort_values('year')
-            yearly_counts['date'] = pd.to_datetime(yearly_counts['year'].astype(str) + '-01-01')
+            yearly = yearly_from_monthly(monthly)
             
-            if len(df_dates) >= 10: 
-                monthly_counts = df_dates.groupby('year_month').size().reset_index()
-                monthly_counts.columns = ['year_month', 'count']
-                monthly_counts = monthly_counts.sort_values('year_month')
-                monthly_counts['date'] = monthly_counts['year_month'].dt.to_timestamp()
-                monthly_counts['month_year_str'] = monthly_counts['date'].dt.strftime('%b %Y')
-                
-                monthly_source = ColumnDataSource(monthly_counts)
+            if monthly['count'].sum() >= 10: 
+                monthly_source = ColumnDataSource(monthly, name="temporal_monthly_source")
+                self.add_cross_filter(monthly_source, "month", "month_key")
                 p = figure(
                     height=350, 
                     title="Динаміка злочинності за часом",
@@ -116,7 +475,7 @@ class CriminalDashboard:
                     tools="pan,box_zoom,wheel_zoom,reset,save"
                 )
                 
-                yearly_source = ColumnDataSource(yearly_counts)
+                yearly_source = ColumnDataSource(yearly, name="temporal_yearly_source")
                 yearly_line = p.line('date', 'count', source=yearly_source, 
                               line_width=2, line_color="navy", alpha=0.7,
                               legend_label="Річна кількість")
@@ -126,6 +485,7 @@ class CriminalDashboard:
                               legend_label="Помісячна кількість")
                 monthly_points = p.scatter('date', 'count', source=monthly_source, 
                                  size=6, color="#cc3333", alpha=0.5)
+                p.add_tools(BoxSelectTool(renderers=[monthly_points], dimensions="width"))
                 
                 hover = HoverTool(
                     tooltips=[
@@ -138,7 +498,8 @@ class CriminalDashboard:
                 p.add_tools(hover)
                 
             else:
-                source = ColumnDataSource(yearly_counts)
+                source = ColumnDataSource(yearly, name="temporal_yearly_source")
+                self.add_cross_filter(source, "month", "year", per_year=True)
                 
                 p = figure(
                     height=350, 
@@ -152,6 +513,7 @@ class CriminalDashboard:
                              line_color="navy", legend_label="Кількість злочинів")
                 points = p.scatter('date', 'count', source=source, size=8, 
                                   color="navy", alpha=0.7)
+                p.add_tools(BoxSelectTool(renderers=[points], dimensions="width"))
                 
                 hover = HoverTool(
                     renderers=[points],
@@ -181,35 +543,20 @@ class CriminalDashboard:
     
     def create_age_distribution_chart(self) -> figure:
         if 'Дата народження' in self.df.columns and not self.df['Дата народження'].isna().all():
-            df_valid = self.df.copy()
-            df_valid['birth_date'] = pd.to_datetime(df_valid['Дата народження'], errors='coerce')
-            
-            df_valid = df_valid[df_valid['birth_date'].notna()]
+            age_counts = age_group_counts(self.df['Дата народження'])
             
-            if len(df_valid) == 0:
+            if len(age_counts) == 0:
                 return self.create_empty_chart("Немає даних про вік злочинців")
             
-            today = datetime.now()
-            df_valid['age'] = df_valid['birth_date'].apply(lambda x: today.year - x.year - 
-                                                       ((today.month, today.day) < (x.month, x.day)))
-            
-            age_bins = [0, 18, 25, 35, 45, 55, 65, 100]
-            age_labels = ["До 18", "18-25", "26-35", "36-45", "46-55", "56-65", "65+"]
-            
-            df_valid['age_group'] = pd.cut(df_valid['age'], bins=age_bins, labels=age_labels, right=False)
-            
-            age_counts = df_valid['age_group'].value_counts().reset_index()
-            age_counts.columns = ['age_group', 'count']
-            age_counts = age_counts.sort_values('age_group')
-            
-            source = ColumnDataSource(age_counts)
+            source = ColumnDataSource(age_counts, name="age_source")
+            self.add_cross_filter(source, "age_group", "age_group")
             
             p = figure(
                 y_range=age_counts['age_group'].tolist(),
                 height=350,
                 title="Віковий розподіл злочинців",
                 toolbar_location="right",
-                tools="pan,box_zoom,reset,save"
+                tools="pan,box_zoom,tap,reset,save"
             )
             
             bars = p.hbar(
@@ -234,50 +581,184 @@ class CriminalDashboard:
             return self.create_empty_chart("Немає даних про вік злочинців")
     
     def create_profession_chart(self) -> figure:
-        if 'Професії' in self.df.columns and not self.df['Професії'].isna().all():
-            all_professions = []
-            for prof_str in self.df['Професії'].dropna():
-                if prof_str and isinstance(prof_str, str):
-                    professions = [p.strip() for p in prof_str.split(',')]
-                    all_professions.extend(professions)
-            
-            if not all_professions:
-                return self.create_empty_chart("Немає даних про професії злочинців")
-            
-            profession_counts = pd.Series(all_professions).value_counts().reset_index()
-            profession_counts.columns = ['profession', 'count']
-            
-            profession_counts = profession_counts.head(10)
-            source = ColumnDataSource(profession_counts)
-            
-            p = figure(
-                y_range=profession_counts['profession'].tolist(),
-                height=350,
-                title="Розподіл злочинців за професіями (топ 10)",
-                toolbar_location="right",
-                tools="pan,box_zoom,reset,save"
-            )
-            
-            color_palette = Category10[len(profession_counts) if len(profession_counts) < 10 else 10]
-            color_mapper = factor_cmap('profession', palette=color_palette, factors=profession_counts['profession'].tolist())
-            
-            bars = p.hbar(
-                y='profession',
-                right='count',
-                height=0.7,
-                source=source,
-                line_color='white',
-                fill_color=color_mapper
-            )
-            
-            p.xgrid.grid_line_color = None
-            p.x_range.start = 0
-            
-            p.add_tools(HoverTool(tooltips=[
-                ("Професія", "@profession"),
-                ("Кількість", "@count")
-            ]))
-            
-            return p
+        return self.create_frequency_chart(
+            self.frequencies.get('professions'),
+            "Розподіл злочинців за професіями (топ 10)",
+            "Професія",
+            "Немає даних про професії злочинців"
+        )
+    
+    def create_language_chart(self) -> figure:
+        return self.create_frequency_chart(
+            self.frequencies.get('languages'),
+            "Розподіл злочинців за мовами (топ 10)",
+            "Мова",
+            "Немає даних про мови злочинців"
+        )
+    
+    def create_gang_chart(self) -> figure:
+        if 'Угруповання' in self.df.columns:
+            gangs = self.df['Угруповання']
+            gang_counts = gangs[gangs.notna() & (gangs != '')].value_counts()
+            frequencies = [{'name': name, 'count': count} for name, count in gang_counts.items()]
         else:
-            return self.create_empty_chart("Немає даних про професії злочинців")
\ No newline at end of file
+            frequencies = []
+        
+        return self.create_frequency_chart(
+            frequencies,
+            "Розподіл злочинців за угрупованнями (топ 10)",
+            "Угруповання",
+            "Немає даних про угруповання злочинців",
+            source_name="gangs_source",
+            dimension="gang"
+        )
+    
+    def create_frequency_chart(self, frequencies, title: str, label: str, empty_message: str,
+                               source_name: str | None = None, dimension: str | None = None) -> figure:
+        counts = top_frequencies(frequencies, 10)
+        
+        if len(counts) == 0:
+            return self.create_empty_chart(empty_message)
+        
+        source = ColumnDataSource(counts, name=source_name)
+        if dimension is not None:
+            self.add_cross_filter(source, dimension, "name")
+        
+        p = figure(
+            y_range=counts['name'].tolist(),
+            height=350,
+            title=title,
+            toolbar_location="right",
+            tools="pan,box_zoom,tap,reset,save" if dimension is not None else "pan,box_zoom,reset,save"
+        )
+        
+        color_mapper = factor_cmap('name', palette=Category10[10][:len(counts)], factors=counts['name'].tolist())
+        
+        bars = p.hbar(
+            y='name',
+            right='count',
+            height=0.7,
+            source=source,
+            line_color='white',
+            fill_color=color_mapper
+        )
+        
+        p.xgrid.grid_line_color = None
+        p.x_range.start = 0
+        
+        p.add_tools(HoverTool(tooltips=[
+            (label, "@name"),
+            ("Кількість", "@count")
+        ]))
+        
+        return p
+    
+    def create_profession_crime_type_chart(self) -> figure:
+        professions = top_frequencies(self.frequencies.get('professions'), 10)
+        crosstab = profession_crime_type_table(
+            self.frequencies.get('profession_crime_types'),
+            professions['name'].tolist()
+        )
+        
+        if len(crosstab) == 0:
+            return self.create_empty_chart("Немає даних про професії та типи злочинів")
+        
+        source = ColumnDataSource(crosstab)
+        
+        p = figure(
+            x_range=sorted(crosstab['crime_type'].unique().tolist()),
+            y_range=list(reversed(professions['name'].tolist())),
+            height=350,
+            title="Професії та типи злочинів",
+            toolbar_location="right",
+            tools="pan,box_zoom,reset,save"
+        )
+        
+        color_mapper = LinearColorMapper(palette=list(reversed(Blues9)), low=0, high=crosstab['count'].max())
+        
+        cells = p.rect(
+            x='crime_type',
+            y='profession',
+            width=1,
+            height=1,
+            source=source,
+            line_color='white',
+            fill_color={'field': 'count', 'transform': color_mapper}
+        )
+        
+        p.grid.grid_line_color = None
+        p.axis.axis_line_color = None
+        p.xaxis.major_label_orientation = 1.0
+        
+        p.add_tools(HoverTool(tooltips=[
+            ("Професія", "@profession"),
+            ("Тип злочину", "@crime_type"),
+            ("Кількість", "@count")
+        ]))
+        
+        return p
+    
+    def create_crime_map_chart(self):
+        """Per-city counts at the cities' coordinates, summed per country when zoomed out.
+        
+        Both levels are aggregated in the database (migrations/007_city_map_counts.sql),
+        so the page draws one marker per city or country whatever the number of records.
+        """
+        counts = self.frequencies.get('city_counts')
+        if not counts:
+            return self.create_empty_chart("Немає даних для карти злочинів")
+        
+        cities = map_markers(counts['cities'])
+        countries = map_markers(counts['countries'])
+        if len(cities) == 0:
+            return self.create_empty_chart("Немає координат міст для карти злочинів")
+        
+        title = "Карта злочинів"
+        unlocated = sum(city['crimes'] for city in counts['cities'] if city['latitude'] is None)
+        if unlocated:
+            title += f" ({unlocated} злочинів у містах без координат)"
+        
+        p = figure(
+            height=350,
+            title=title,
+            match_aspect=True,
+            toolbar_location="right",
+            tools="pan,wheel_zoom,box_zoom,reset,save",
+            active_scroll="wheel_zoom"
+        )
+        
+        country_view = cities['longitude'].max() - cities['longitude'].min() > MAP_COUNTRY_SPAN
+        country_markers = p.scatter(
+            'longitude', 'latitude', size='crimes_size', source=ColumnDataSource(countries),
+            fill_color="#1f77b4", fill_alpha=0.5, line_color="white", visible=country_view
+        )
+        city_markers = p.scatter(
+            'longitude', 'latitude', size='crimes_size', source=ColumnDataSource(cities),
+            fill_color="#cc3333", fill_alpha=0.5, line_color="white", visible=not country_view
+        )
+        
+        metric_tooltips = [(label, f"@{metric}") for metric, label in MAP_METRIC_LABELS.items()]
+        p.add_tools(HoverTool(renderers=[country_markers], tooltips=[("Країна", "@name")] + metric_tooltips))
+        p.add_tools(HoverTool(renderers=[city_markers], tooltips=[("Місто", "@name, @country")] + metric_tooltips))
+        
+        p.x_range.js_on_change('end', CustomJS(
+            args=dict(x_range=p.x_range, countries=country_markers, cities=city_markers, span=MAP_COUNTRY_SPAN),
+            code=MAP_ZOOM_CALLBACK
+        ))
+        
+        p.xaxis.axis_label = "Довгота"
+        p.yaxis.axis_label = "Широта"
+        p.grid.grid_line_alpha = 0.3
+        
+        select = Select(
+            value="crimes",
+            options=[(metric, label) for metric, label in MAP_METRIC_LABELS.items()],
+            sizing_mode="stretch_width"
+        )
+        select.js_on_change('value', CustomJS(
+            args=dict(select=select, countries=country_markers, cities=city_markers),
+            code=MAP_METRIC_CALLBACK
+        ))
+        
+        p.sizing_mode = 'stretch_both'
+        return column(select, p)
\ No newline at end of file
@@ -0,0 +1,200 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%Y-%m-%d"
+AGE_BINS = [0, 18, 25, 35, 45, 55, 65, 100]
+AGE_LABELS = ["До 18", "18-25", "26-35", "36-45", "46-55", "56-65", "65+"]
+
+def parse_dates(values) -> pd.Series:
+    """Parse "YYYY-MM-DD" strings; empty or malformed values are dropped."""
+    return pd.to_datetime(pd.Series(values), format=DATE_FORMAT, errors='coerce').dropna()
+
+def ages_at(birth_dates: pd.Series, today: datetime) -> np.ndarray:
+    """Whole years between each birth date and today."""
+    years = today.year - birth_dates.dt.year.to_numpy()
+    month_day = birth_dates.dt.month.to_numpy() * 100 + birth_dates.dt.day.to_numpy()
+    # One year less for everyone whose birthday is still ahead this year
+    return years - (month_day > today.month * 100 + today.day)
+
+def age_group_counts(birth_dates, today: datetime | None = None) -> pd.DataFrame:
+    """Number of people per age group, in AGE_LABELS order. Empty if no date is valid."""
+    parsed = parse_dates(birth_dates)
+    if parsed.empty:
+        return pd.DataFrame({'age_group': [], 'count': []})
+
+    ages = ages_at(parsed, today or datetime.now())
+    # Ages outside AGE_BINS fall into bin 0 or len(AGE_BINS) and are left out
+    bins = np.digitize(ages, AGE_BINS)
+    counts = np.bincount(bins, minlength=len(AGE_BINS) + 1)[1:len(AGE_BINS)]
+
+    return pd.DataFrame({'age_group': AGE_LABELS, 'count': counts})
+
+def _yearly_frame(years: np.ndarray, counts: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({
+        'year': years,
+        'count': counts,
+        'date': pd.to_datetime({'year': years, 'month': 1, 'day': 1})
+    })
+
+def _monthly_frame(months: np.ndarray, counts: np.ndarray) -> pd.DataFrame:
+    month_start = pd.to_datetime({'year': months // 12, 'month': months % 12 + 1, 'day': 1})
+
+    return pd.DataFrame({
+        'month_key': months,
+        'count': counts,
+        'date': month_start,
+        'month_year_str': month_start.dt.strftime('%b %Y')
+    })
+
+def yearly_counts(dates: pd.Series) -> pd.DataFrame:
+    """Count of parsed dates per year, with the first day of each year for the x axis."""
+    years, counts = np.unique(dates.dt.year.to_numpy(), return_counts=True)
+    return _yearly_frame(years, counts)
+
+def monthly_counts(dates: pd.Series) -> pd.DataFrame:
+    """Count of parsed dates per calendar month, in chronological order."""
+    month_index = dates.dt.year.to_numpy() * 12 + dates.dt.month.to_numpy() - 1
+    months, counts = np.unique(month_index, return_counts=True)
+    return _monthly_frame(months, counts)
+
+def yearly_from_monthly(monthly: pd.DataFrame) -> pd.DataFrame:
+    """Sum a monthly_counts frame into a yearly_counts frame."""
+    totals = monthly.groupby(monthly['month_key'].to_numpy() // 12)['count'].sum()
+    return _yearly_frame(totals.index.to_numpy(), totals.to_numpy())
+
+def top_frequencies(frequencies, limit: int) -> pd.DataFrame:
+    """The most common names from [{"name", "count"}] rows, as a name/count frame."""
+    counts = pd.DataFrame(frequencies or [], columns=['name', 'count'])
+    return counts.sort_values('count', ascending=False, kind='stable').head(limit).reset_index(drop=True)
+
+def profession_crime_type_table(counts, professions) -> pd.DataFrame:
+    """Profession x crime type counts restricted to the given professions."""
+    table = pd.DataFrame(counts or [], columns=['profession', 'crime_type', 'count'])
+    return table[table['profession'].isin(professions)].reset_index(drop=True)
+
+CUBE_DIMENSIONS = ["crime_type", "age_group", "gang", "month"]
+
+def _codes(values) -> tuple[np.ndarray, list]:
+    codes, labels = pd.factorize(pd.Series(values).fillna(""))
+    return codes, labels.tolist()
+
+def _keyed_codes(keys, labels) -> tuple[np.ndarray, list]:
+    """One code per distinct key, labelled by the key's label; keys may share a label."""
+    codes, _ = pd.factorize(pd.Series(keys), use_na_sentinel=False)
+    return codes, pd.Series(labels).fillna("").groupby(codes).first().tolist()
+
+def _age_group_codes(birth_dates, today: datetime) -> np.ndarray:
+    """Index into AGE_LABELS for every row; -1 for unknown or out of range ages."""
+    parsed = pd.to_datetime(pd.Series(birth_dates), format=DATE_FORMAT, errors='coerce')
+    valid = parsed.notna().to_numpy()
+
+    codes = np.full(len(parsed), -1, dtype=np.int64)
+    groups = np.digitize(ages_at(parsed[valid], today), AGE_BINS) - 1
+    codes[valid] = np.where((groups >= 0) & (groups < len(AGE_LABELS)), groups, -1)
+    return codes
+
+def _month_codes(dates) -> np.ndarray:
+    """year * 12 + month - 1 for every row (month_key in monthly_counts); -1 if unknown."""
+    parsed = pd.to_datetime(pd.Series(dates), format=DATE_FORMAT, errors='coerce')
+    valid = parsed.notna().to_numpy()
+
+    codes = np.full(len(parsed), -1, dtype=np.int64)
+    codes[valid] = parsed[valid].dt.year.to_numpy() * 12 + parsed[valid].dt.month.to_numpy() - 1
+    return codes
+
+def crime_cube(crime_types, birth_dates, gangs, crime_dates, today: datetime | None = None) -> dict:
+    """Row counts per (crime type, age group, gang, month) combination.
+
+    All four inputs are per-criminal columns of equal length. Dimensions are integer codes:
+    crime types and gangs index into "labels", age groups into AGE_LABELS, months are
+    month keys; -1 marks an unknown age or date. Only combinations that occur are listed,
+    so cross-filtered totals are sums over a few thousand cube rows instead of every record.
+    """
+    crime_codes, crime_labels = _codes(crime_types)
+    gang_codes, gang_labels = _codes(gangs)
+    age_codes = _age_group_codes(birth_dates, today or datetime.now())
+    month_codes = _month_codes(crime_dates)
+
+    # Pack the four codes into one integer per row so combinations are counted with one np.unique
+    month_offset = (month_codes.min() if len(month_codes) else 0) - 1
+    month_span = (month_codes.max() if len(month_codes) else 0) - month_offset + 1
+    age_span = len(AGE_LABELS) + 1
+    gang_span = len(gang_labels) or 1
+
+    packed = ((crime_codes * age_span + age_codes + 1) * gang_span + gang_codes) * month_span + (month_codes - month_offset)
+    combinations, counts = np.unique(packed, return_counts=True)
+
+    months = combinations % month_span + month_offset
+    combinations //= month_span
+    gang = combinations % gang_span
+    combinations //= gang_span
+    age = combinations % age_span - 1
+    crime = combinations // age_span
+
+    return {
+        "crime_type": crime.tolist(),
+        "age_group": age.tolist(),
+        "gang": gang.tolist(),
+        "month": months.tolist(),
+        "count": counts.tolist(),
+        "labels": {
+            "crime_type": crime_labels,
+            "age_group": AGE_LABELS,
+            "gang": gang_labels
+        }
+    }
+
+def trend_cube(trends) -> dict | None:
+    """Crime counts per (crime type, gang, month) from CrimeModel.get_crime_trends rows.
+
+    Same layout as crime_cube, but counting every crime rather than each criminal's
+    latest one. None when there are no trends to show.
+    """
+    if not trends:
+        return None
+
+    frame = pd.DataFrame(trends)
+    crime_codes, crime_labels = _codes(frame['crime_type'])
+    gang_codes, gang_labels = _keyed_codes(frame['gang_id'], frame['gang'])
+    months = _month_codes(frame['period'])
+
+    return {
+        "crime_type": crime_codes.tolist(),
+        "gang": gang_codes.tolist(),
+        "month": months.tolist(),
+        "count": frame['count'].astype(np.int64).tolist(),
+        "labels": {
+            "crime_type": crime_labels,
+            "gang": gang_labels
+        }
+    }
+
+def monthly_counts_from_cube(cube: dict) -> pd.DataFrame:
+    """Total of a trend cube per month, as a monthly_counts frame."""
+    months, positions = np.unique(np.asarray(cube["month"]), return_inverse=True)
+    counts = np.bincount(positions, weights=cube["count"]).astype(np.int64)
+    return _monthly_frame(months, counts)
+
+MAP_METRICS = ["crimes", "births", "residents", "gangs"]
+MAP_MIN_SIZE = 6
+MAP_MAX_SIZE = 40
+
+def map_markers(counts, max_size: float = MAP_MAX_SIZE) -> pd.DataFrame:
+    """Located per-city or per-country rows of CityModel counts, one marker each.
+
+    Adds a "<metric>_size" column per MAP_METRICS: marker areas grow with the count,
+    the largest count of a metric getting max_size pixels; zero counts get no marker.
+    """
+    frame = pd.DataFrame([dict(row) for row in counts or []])
+    if frame.empty:
+        return pd.DataFrame(columns=['name', 'latitude', 'longitude'] + MAP_METRICS)
+
+    frame = frame[frame['latitude'].notna() & frame['longitude'].notna()].reset_index(drop=True)
+    for metric in MAP_METRICS:
+        values = frame[metric].to_numpy(dtype=np.float64)
+        peak = values.max() if len(values) else 0
+        scaled = np.sqrt(values / peak) if peak > 0 else values
+        frame[f'{metric}_size'] = np.where(values > 0, MAP_MIN_SIZE + (max_size - MAP_MIN_SIZE) * scaled, 0)
+    return frame
@@ -1,9 +1,10 @@
+from PySide6.QtCore import QUrl
 from PySide6.QtWidgets import QMainWindow, QVBoxLayout
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtWebEngineCore import QWebEngineSettings
 
 from .dashboard_source import Ui_DashboardWindow
-from .bokeh_dashboard import CriminalDashboard
+from .bokeh_dashboard import DASHBOARD_PARTS, CriminalDashboard, dashboard_base_url
 
 class DashboardView(QMainWindow):
     def __init__(self) -> None:
@@ -17,22 +18,68 @@ class DashboardView(QMainWindow):
         self.web_view = QWebEngineView()
         self.web_view.settings().setAttribute(QWebEngineSettings.WebGLEnabled, True)
         self.web_view.settings().setAttribute(QWebEngineSettings.JavascriptEnabled, True)
+        self.web_view.settings().setAttribute(QWebEngineSettings.LocalContentCanAccessFileUrls, True)
+        self.web_view.loadFinished.connect(self._on_load_finished)
         
         self.dashboard_layout.addWidget(self.web_view)
         
+        self._chart_cache = {}
+        self._rendered_versions = None
+        self._showing_dashboard = False
+        self._dashboard_ready = False
+        self._pending_script = None
+        
         self.setWindowTitle("Дашборд злочинців")
     
-    def set_dashboard_data(self, data: dict) -> None:
+    def set_dashboard_data(self, data: dict, frequencies: dict | None = None,
+                           chart_versions: dict | None = None) -> None:
         if not data:
             self._show_no_data_message()
             return
         
-        dashboard = CriminalDashboard(data)
-        dashboard_html = dashboard.create_dashboard()
+        # Nothing changed since the page was rendered
+        if chart_versions is not None and chart_versions == self._rendered_versions:
+            return
+        
+        dashboard = CriminalDashboard(data, frequencies, self._chart_cache, chart_versions)
+        
+        if self._dashboard_ready:
+            # BokehJS is already loaded in the page: re-render only the charts that changed
+            self.web_view.page().runJavaScript(
+                dashboard.create_update_script(self._changed_charts(chart_versions))
+            )
+        else:
+            # The page is only a shell under setHtml's 2 MB limit; the charts and cubes,
+            # several MB for large datasets, are rendered into it once it has loaded
+            self._showing_dashboard = True
+            self._dashboard_ready = False
+            self._pending_script = dashboard.create_update_script(DASHBOARD_PARTS)
+            self.web_view.setHtml(dashboard.create_dashboard(), QUrl(dashboard_base_url()))
+        
+        self._rendered_versions = chart_versions
+    
+    def _changed_charts(self, chart_versions) -> list:
+        if chart_versions is None or self._rendered_versions is None:
+            return DASHBOARD_PARTS
+        
+        return [
+            name for name in DASHBOARD_PARTS
+            if chart_versions.get(name) != self._rendered_versions.get(name)
+        ]
+    
+    def _on_load_finished(self, ok: bool) -> None:
+        self._dashboard_ready = ok and self._showing_dashboard
         
-        self.web_view.setHtml(dashboard_html)
+        # A load replaced by a newer one also finishes, with ok False; the newer one runs the script
+        if self._dashboard_ready and self._pending_script is not None:
+            self.web_view.page().runJavaScript(self._pending_script)
+            self._pending_script = None
     
     def _show_no_data_message(self) -> None:
+        self._rendered_versions = None
+        self._showing_dashboard = False
+        self._dashboard_ready = False
+        self._pending_script = None
         self.web_view.setHtml("""
         <html>
         <body style="display: flex; justify-content: center; align-items: center; height: 100%; font-family: Arial, sans-serif;">
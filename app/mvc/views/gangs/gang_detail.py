@@ -0,0 +1,66 @@
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QFormLayout, QLabel, QTableView, QAbstractItemView
+from PySide6.QtCore import Qt
+
+from .gang_member_table_model import GangMemberTableModel
+from utils.format_utils import date_text
+
+class GangDetailView(QMainWindow):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Інформація про угруповання")
+        self.resize(800, 600)
+        
+        central_widget = QWidget(self)
+        layout = QVBoxLayout(central_widget)
+        
+        self.info_labels = {}
+        info_layout = QFormLayout()
+        for key, title in (
+            ("name", "Назва:"),
+            ("founding_date", "Дата заснування:"),
+            ("main_activity", "Основна діяльність:"),
+            ("status", "Статус:"),
+            ("base_location", "Місце бази:"),
+            ("member_count", "Кількість заарештованих членів:")
+        ):
+            label = QLabel(central_widget)
+            label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            info_layout.addRow(title, label)
+            self.info_labels[key] = label
+        layout.addLayout(info_layout)
+        
+        self.members_table = QTableView(central_widget)
+        self.members_table.setSortingEnabled(True)
+        self.members_table.verticalHeader().setVisible(False)
+        self.members_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.members_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        layout.addWidget(self.members_table)
+        
+        self.setCentralWidget(central_widget)
+    
+    def set_gang_data(self, gang, member_count, members, fetch_page=None) -> None:
+        """Show a gang and its first member page; fetch_page loads further pages and other orders."""
+        if not gang:
+            return
+        
+        self.info_labels["name"].setText(gang.get("name") or "")
+        self.info_labels["founding_date"].setText(date_text(gang.get("founding_date")))
+        self.info_labels["main_activity"].setText(gang.get("main_activity") or "")
+        self.info_labels["status"].setText(gang.get("status") or "")
+        self.info_labels["base_location"].setText(gang.get("base_location") or "")
+        self.info_labels["member_count"].setText(str(member_count))
+        
+        model = GangMemberTableModel(members, fetch_page, member_count)
+        
+        # The first page comes sorted by last name; set the indicator before the model so
+        # the table does not request that order again
+        self.members_table.horizontalHeader().setSortIndicator(2, Qt.AscendingOrder)
+        self.members_table.setModel(model)
+        
+        self.members_table.setColumnWidth(0, 60)
+        self.members_table.setColumnWidth(1, 140)
+        self.members_table.setColumnWidth(2, 140)
+        self.members_table.setColumnWidth(3, 120)
+        self.members_table.setColumnWidth(4, 100)
+        self.members_table.setColumnWidth(5, 70)
+        self.members_table.setColumnWidth(6, 70)
@@ -1,19 +1,25 @@
 from PySide6.QtWidgets import QMainWindow, QMessageBox, QMenu, QAbstractItemView, QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel
-from PySide6.QtCore import Signal, Qt
+from PySide6.QtCore import Signal, Qt, QTimer
 from PySide6.QtGui import QAction, QCursor
 from datetime import datetime
 
 from .gangs_source import Ui_MainWindow
 from .gang_table_model import GangTableModel
+from .gang_filter_model import GangFilterProxyModel
 from mvc.views.criminals.filterable_table_view import FilterableTableView
-from utils.export_utils import export_data_to_file
+from utils.export_utils import export_batches_to_file
 from utils.icon_utils import icon_manager
 
+# How long the pointer rests on a gang before its members are prefetched
+HOVER_PREFETCH_MS = 150
+
 class GangsView(QMainWindow):
     add_gang_requested = Signal()
     edit_gang_requested = Signal(int)
     delete_gang_requested = Signal(int)
     export_gangs_requested = Signal()
+    show_gang_details_requested = Signal(int)
+    gang_hovered = Signal(int)
     
     def __init__(self) -> None:
         super().__init__()
@@ -22,7 +28,7 @@ class GangsView(QMainWindow):
         self.setup_icons()
         self.original_table_view = self.ui.tableView
         
-        self.filterable_table_view = FilterableTableView(self.ui.centralwidget)
+        self.filterable_table_view = FilterableTableView(self.ui.centralwidget, GangFilterProxyModel)
         self.filterable_table_view.setObjectName("tableView")
         
         self.filterable_table_view.setGeometry(self.original_table_view.geometry())
@@ -32,6 +38,12 @@ class GangsView(QMainWindow):
         self.original_table_view.setVisible(False)
         
         self.selected_gang_id = None
+        self.hovered_gang_id = None
+        
+        self.hover_timer = QTimer(self)
+        self.hover_timer.setSingleShot(True)
+        self.hover_timer.setInterval(HOVER_PREFETCH_MS)
+        self.hover_timer.timeout.connect(lambda: self.gang_hovered.emit(self.hovered_gang_id))
         
         self.setup_connections()
         self.setup_context_menu()
@@ -56,6 +68,10 @@ class GangsView(QMainWindow):
         self.ui.pushButton_2.clicked.connect(self.on_export_gangs)
         
         self.ui.tableView.clicked.connect(self.on_table_clicked)
+        self.ui.tableView.doubleClicked.connect(self.on_show_gang_details)
+        
+        self.ui.tableView.setMouseTracking(True)
+        self.ui.tableView.entered.connect(self.on_table_hovered)
     
     def setup_context_menu(self) -> None:
         self.ui.tableView.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -66,12 +82,16 @@ class GangsView(QMainWindow):
             return
             
         context_menu = QMenu()
+        view_details_action = QAction("Детальна інформація", self)
+        view_details_action.triggered.connect(self.on_show_gang_details)
+        
         edit_action = QAction("Редагувати", self)
         edit_action.triggered.connect(self.on_edit_gang)
         
         delete_action = QAction("Видалити", self)
         delete_action.triggered.connect(self.on_delete_gang)
         
+        context_menu.addAction(view_details_action)
         context_menu.addAction(edit_action)
         context_menu.addSeparator()
         context_menu.addAction(delete_action)
@@ -91,6 +111,13 @@ class GangsView(QMainWindow):
                 self.ui.tableView.setFilterVisible(True)
                 self.ui.pushButton.setText("Сховати фільтри")
 
+    def on_show_gang_details(self) -> None:
+        if self.selected_gang_id is None:
+            QMessageBox.warning(self, "Попередження", "Виберіть угруповання для перегляду")
+            return
+        
+        self.show_gang_details_requested.emit(self.selected_gang_id)
+    
     def on_add_gang(self) -> None:
         self.add_gang_requested.emit()
     
@@ -117,9 +144,9 @@ class GangsView(QMainWindow):
         if reply == QMessageBox.Yes:
             self.delete_gang_requested.emit(self.selected_gang_id)
     
-    def on_table_clicked(self, index) -> None:
+    def gang_id_at(self, index) -> int | None:
         if not index.isValid():
-            return
+            return None
             
         if hasattr(self.ui.tableView, 'filter_model') and self.ui.tableView.filter_model:
             source_index = self.ui.tableView.filter_model.mapToSource(index)
@@ -128,10 +155,25 @@ class GangsView(QMainWindow):
             source_model = self.ui.tableView.sourceModel()
             if source_model:
                 id_index = source_model.index(source_row, 0)
-                self.selected_gang_id = int(source_model.data(id_index))
-        else:
-            id_index = self.ui.tableView.model().index(index.row(), 0)
-            self.selected_gang_id = int(self.ui.tableView.model().data(id_index))
+                return int(source_model.data(id_index))
+            return None
+        
+        id_index = self.ui.tableView.model().index(index.row(), 0)
+        return int(self.ui.tableView.model().data(id_index))
+    
+    def on_table_clicked(self, index) -> None:
+        gang_id = self.gang_id_at(index)
+        if gang_id is not None:
+            self.selected_gang_id = gang_id
+    
+    def on_table_hovered(self, index) -> None:
+        gang_id = self.gang_id_at(index)
+        if gang_id is None or gang_id == self.hovered_gang_id:
+            return
+        
+        # Restarted on every row change, so sweeping across the list prefetches nothing
+        self.hovered_gang_id = gang_id
+        self.hover_timer.start()
     
     def set_gangs_data(self, gangs: list) -> None:
         self.full_data = gangs
@@ -154,6 +196,7 @@ class GangsView(QMainWindow):
         self.ui.tableView.setSelectionMode(QAbstractItemView.SingleSelection)
         
         self.selected_gang_id = None
+        self.hovered_gang_id = None
         
     def on_export_gangs(self) -> None:
         dialog = QDialog(self)
@@ -182,12 +225,8 @@ class GangsView(QMainWindow):
         dialog.accept()
         self.export_gangs_requested.emit()
         
-    def export_gangs_data(self, data: list) -> None:
-        if not data:
-            QMessageBox.warning(self, "Експорт", "Немає даних для експорту.")
-            return
-        
-        export_data_to_file(data, self, f"угруповання_{datetime.now().strftime('%Y%m%d')}")
+    def export_gangs_data(self, columns, batches) -> None:
+        export_batches_to_file(columns, batches, self, f"угруповання_{datetime.now().strftime('%Y%m%d')}")
     
     def closeEvent(self, event) -> None:
         event.accept()
\ No newline at end of file
@@ -0,0 +1,109 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# Member sort keys of CriminalGroupModel.get_members_page by column; height and weight
+# are not indexed per gang, so those columns keep the current order
+SORT_KEYS = ["id", "first_name", "last_name", "nickname", "role", None, None]
+
+class GangMemberTableModel(QAbstractTableModel):
+    """Members of one gang, loaded a page at a time and sorted by the database.
+
+    fetch_page(sort_key, descending, after) returns the members following the member record
+    after in that order, or the first page when after is None.
+    """
+    def __init__(self, data=None, fetch_page=None, total=0):
+        super().__init__()
+        self._data = data or []
+        self._fetch_page = fetch_page
+        self._total = total
+        self._sort_key = "last_name"
+        self._descending = False
+        self._exhausted = not self._data
+        self._headers = [
+            "ID", 
+            "Ім'я", 
+            "Прізвище", 
+            "Кличка", 
+            "Роль",
+            "Зріст",
+            "Вага"
+        ]
+    
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._data)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._headers)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or \
+        not (0 <= index.row() < len(self._data)) or \
+        not (0 <= index.column() < len(self._headers)):
+            return None
+        
+        row = index.row()
+        col = index.column()
+        member = self._data[row]
+        
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return str(member.get("id", ""))
+            elif col == 1:
+                return member.get("first_name", "")
+            elif col == 2:
+                return member.get("last_name", "")
+            elif col == 3:
+                return member.get("nickname", "")
+            elif col == 4:
+                return member.get("role", "")
+            elif col == 5:
+                height = member.get("height")
+                return f"{height} см" if height else ""
+            elif col == 6:
+                weight = member.get("weight")
+                return f"{weight} кг" if weight else ""
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._headers[section]
+        return None
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return (
+            self._fetch_page is not None and not self._exhausted
+            and len(self._data) < self._total and not parent.isValid()
+        )
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        
+        page = self._fetch_page(self._sort_key, self._descending, self._data[-1])
+        if not page:
+            # Members left the gang since it was counted
+            self._exhausted = True
+            return
+        
+        self.beginInsertRows(QModelIndex(), len(self._data), len(self._data) + len(page) - 1)
+        self._data.extend(page)
+        self.endInsertRows()
+    
+    def sort(self, column, order):
+        """Reload the first page in the order of the column."""
+        if not (0 <= column < len(SORT_KEYS)) or SORT_KEYS[column] is None or self._fetch_page is None:
+            return
+        
+        sort_key = SORT_KEYS[column]
+        descending = order == Qt.DescendingOrder
+        if (sort_key, descending) == (self._sort_key, self._descending):
+            return
+        
+        self._sort_key = sort_key
+        self._descending = descending
+        self.update_data(self._fetch_page(sort_key, descending, None))
+    
+    def update_data(self, data):
+        """Update the model with new data."""
+        self.beginResetModel()
+        self._data = data
+        self._exhausted = not data
+        self.endResetModel()
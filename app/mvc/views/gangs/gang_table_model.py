@@ -1,5 +1,12 @@
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
 
+from utils.format_utils import date_text
+
+SORT_KEYS = [
+    "id", "name", "founding_date", "number_of_members", 
+    "main_activity", "base_location", "active_members", "leader_name"
+]
+
 class GangTableModel(QAbstractTableModel):
     def __init__(self, data=None):
         super().__init__()
@@ -37,7 +44,7 @@ class GangTableModel(QAbstractTableModel):
             elif col == 1:
                 return gang.get("name", "")
             elif col == 2: 
-                return gang.get("founding_date", "")
+                return date_text(gang.get("founding_date"))
             elif col == 3:
                 return str(gang.get("number_of_members", ""))
             elif col == 4:
@@ -49,6 +56,10 @@ class GangTableModel(QAbstractTableModel):
             elif col == 7:
                 return gang.get("leader_name", "Невідомо")
     
+    def filter_value(self, row, column):
+        """Raw value of a cell for the filter proxy, without display formatting."""
+        return self._data[row].get(SORT_KEYS[column])
+    
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole and orientation == Qt.Horizontal:
             return self._headers[section]
@@ -58,13 +69,8 @@ class GangTableModel(QAbstractTableModel):
         """Sort table by given column and order."""
         self.layoutAboutToBeChanged.emit()
         
-        sort_keys = [
-            "id", "name", "founding_date", "number_of_members", 
-            "main_activity", "base_location", "active_members", "leader_name"
-        ]
-        
-        if 0 <= column < len(sort_keys):
-            key = sort_keys[column]
+        if 0 <= column < len(SORT_KEYS):
+            key = SORT_KEYS[column]
             reverse = order == Qt.DescendingOrder
             
             self._data.sort(
@@ -6,10 +6,29 @@ class NavigationService(QObject):
         super().__init__()
         self.current_view = None
         self.views = {}
+        self.view_factories = {}
         self.window_transitions = {}
+        self._app = None
         
     def register_view(self, view_name: str, view: QMainWindow) -> None:
         self.views[view_name] = view
+    
+    def register_view_factory(self, view_name: str, factory) -> None:
+        """Register a callable that builds the view the first time it is navigated to or requested."""
+        self.view_factories[view_name] = factory
+    
+    def has_view(self, view_name: str) -> bool:
+        return view_name in self.views or view_name in self.view_factories
+    
+    def get_view(self, view_name: str) -> QMainWindow | None:
+        """Return the view, building it from its factory if this is the first request."""
+        if view_name not in self.views and view_name in self.view_factories:
+            view = self.view_factories.pop(view_name)()
+            self.views[view_name] = view
+            if self._app is not None:
+                self._install_close_handler(view_name, view)
+        
+        return self.views.get(view_name)
         
     def register_transition(self, from_view: str, to_view: str, 
                            condition_func=None, before_show_func=None) -> None:
@@ -27,13 +46,13 @@ class NavigationService(QObject):
             from_view = self.current_view
             
         if from_view is None:
-            if to_view in self.views:
-                self.views[to_view].show()
+            if self.has_view(to_view):
+                self.get_view(to_view).show()
                 self.current_view = to_view
                 return True
             return False
             
-        if to_view not in self.views:
+        if not self.has_view(to_view):
             return False
             
         if from_view in self.window_transitions:
@@ -48,23 +67,32 @@ class NavigationService(QObject):
                     if transition['before_show']:
                         transition['before_show']()
                     
-                    self.views[to_view].show()
+                    self.get_view(to_view).show()
                     self.current_view = to_view
                     return True
         
         if from_view in self.views:
             self.views[from_view].hide()
         
-        self.views[to_view].show()
+        self.get_view(to_view).show()
         self.current_view = to_view
         return True
     
     def setup_close_handlers(self, app):
+        """Close handlers for the views built so far; views built later get theirs on creation."""
+        self._app = app
+        
+        for view_name, view in self.views.items():
+            self._install_close_handler(view_name, view)
+    
+    def _install_close_handler(self, view_name: str, view: QMainWindow) -> None:
         view_parents = {
             'criminal_add': 'criminals',
             'criminal_edit': 'criminals',
             'criminal_detail': 'criminals',
+            'associations': 'criminals',
             
+            'gang_detail': 'gangs',
             'gang_add': 'gangs',
             'gang_edit': 'gangs',
             
@@ -75,27 +103,24 @@ class NavigationService(QObject):
             'users': 'main',
             'change_password': 'main',
         }
+        app = self._app
         
-        if 'main' in self.views:
-            main_view = self.views['main']
-            main_view.closeEvent = lambda _: app.quit()
-            
-        for view_name, view in self.views.items():
-            if view_name != 'main':
-                def create_close_handler(view_name):
-                    def handle_close(event):
-                        if view_name == 'login':
-                            app.quit()
-                            event.accept()
-                        elif view_name in view_parents and view_parents[view_name] in self.views:
-                            parent_view = view_parents[view_name]
-                            self.navigate_to(parent_view, view_name)
-                            event.ignore()
-                        elif 'main' in self.views:
-                            self.navigate_to('main', view_name)
-                            event.ignore()  
-                        else:
-                            event.accept()
-                    return handle_close
-                
-                view.closeEvent = create_close_handler(view_name)
\ No newline at end of file
+        if view_name == 'main':
+            view.closeEvent = lambda _: app.quit()
+            return
+        
+        def handle_close(event):
+            if view_name == 'login':
+                app.quit()
+                event.accept()
+            elif view_name in view_parents and self.has_view(view_parents[view_name]):
+                parent_view = view_parents[view_name]
+                self.navigate_to(parent_view, view_name)
+                event.ignore()
+            elif self.has_view('main'):
+                self.navigate_to('main', view_name)
+                event.ignore()  
+            else:
+                event.accept()
+        
+        view.closeEvent = handle_close
\ No newline at end of file
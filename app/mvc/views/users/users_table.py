@@ -1,5 +1,7 @@
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
 
+from utils.format_utils import date_text
+
 class UsersTableModel(QAbstractTableModel):
     def __init__(self, data: list = None, current_username: str = None) -> None:
         super().__init__()
@@ -29,7 +31,7 @@ class UsersTableModel(QAbstractTableModel):
             elif col == 1:
                 return user.get("username", "")
             elif col == 2:
-                return user.get("last_login", "")
+                return date_text(user.get("last_login"), "Ніколи")
             elif col == 3:
                 return str(user.get("failed_attempts", "0"))
     
@@ -49,8 +51,9 @@ class UsersTableModel(QAbstractTableModel):
             key = sort_keys[column]
             reverse = order == Qt.DescendingOrder
             
+            # Users who never logged in have no last_login; they sort after everyone else
             self._data.sort(
-                key=lambda x: (x.get(key) is None, x.get(key)),
+                key=lambda x: (x.get(key) is None, x.get(key) if x.get(key) is not None else ""),
                 reverse=reverse
             )
         
@@ -0,0 +1,119 @@
+"""AssociationGraph queries against a plain breadth-first search over random graphs.
+
+Run from the app directory: python -m pytest tests
+"""
+import random
+from collections import deque
+from datetime import date, timedelta
+
+import pytest
+
+from mvc.models.association_graph import AssociationGraph
+from mvc.models.associations import (
+    ALL_RELATIONS, RELATION_BIRTHPLACE, RELATION_CRIME, RELATION_GANG, RELATION_RESIDENCE
+)
+
+RELATIONS = [RELATION_GANG, RELATION_CRIME, RELATION_BIRTHPLACE, RELATION_RESIDENCE]
+RELATION_MASKS = [ALL_RELATIONS, RELATION_GANG, RELATION_GANG | RELATION_CRIME, RELATION_RESIDENCE]
+
+def random_memberships(rng, criminal_ids):
+    """(id_criminal, relation, key, day) rows with few keys, so criminals share attributes."""
+    rows = []
+    for criminal_id in criminal_ids:
+        for _ in range(rng.randrange(3)):
+            relation = rng.choice(RELATIONS)
+            day = rng.randrange(3) if relation == RELATION_CRIME else 0
+            rows.append((criminal_id, relation, rng.randrange(1, 6), day))
+    return rows
+
+def attribute(relation, key, day):
+    """A membership as decode_attribute returns it."""
+    return (relation, key, date(1970, 1, 1) + timedelta(days=day) if relation == RELATION_CRIME else None)
+
+class PlainGraph:
+    """Criminal ids and their attributes, searched one criminal at a time."""
+    def __init__(self, criminal_ids, rows):
+        self.attributes = {criminal_id: set() for criminal_id in criminal_ids}
+        for criminal_id, relation, key, day in rows:
+            if criminal_id in self.attributes:
+                self.attributes[criminal_id].add(attribute(relation, key, day))
+
+    def update(self, criminal_ids, rows):
+        existing = {row[0] for row in rows if row[1] == 0}
+        for criminal_id in criminal_ids:
+            self.attributes.pop(criminal_id, None)
+            if criminal_id in existing:
+                self.attributes[criminal_id] = {
+                    attribute(relation, key, day)
+                    for member, relation, key, day in rows if member == criminal_id and relation != 0
+                }
+
+    def distances(self, source, relations):
+        distances = {source: 0}
+        queue = deque([source])
+        while queue:
+            criminal_id = queue.popleft()
+            shared = {item for item in self.attributes[criminal_id] if item[0] & relations}
+            for other, items in self.attributes.items():
+                if other not in distances and shared & items:
+                    distances[other] = distances[criminal_id] + 1
+                    queue.append(other)
+        return distances
+
+def check_queries(graph, plain, rng):
+    criminal_ids = sorted(plain.attributes)
+    for relations in RELATION_MASKS:
+        for source in rng.sample(criminal_ids, min(8, len(criminal_ids))):
+            distances = plain.distances(source, relations)
+
+            assert sorted(graph.component(source, relations)) == sorted(distances)
+            for hops in (1, 2, 3):
+                expected = {other: hop for other, hop in distances.items() if 0 < hop <= hops}
+                assert graph.neighbourhood(source, hops, relations) == expected
+
+            for target in rng.sample(criminal_ids, min(8, len(criminal_ids))):
+                path = graph.shortest_path(source, target, relations)
+                if target not in distances:
+                    assert path is None
+                    continue
+
+                assert len(path) == distances[target] + 1
+                assert path[0] == (source, None) and path[-1][0] == target
+                for (previous, _), (criminal_id, link) in zip(path, path[1:]):
+                    assert link[0] & relations
+                    assert link in plain.attributes[previous] and link in plain.attributes[criminal_id]
+
+@pytest.mark.parametrize("seed", range(20))
+def test_queries_match_plain_search(seed):
+    rng = random.Random(seed)
+    criminal_ids = rng.sample(range(1, 200), 40)
+    rows = random_memberships(rng, criminal_ids)
+
+    graph = AssociationGraph.from_rows([[(criminal_id, 0, 0, 0) for criminal_id in criminal_ids], rows])
+    plain = PlainGraph(criminal_ids, rows)
+    check_queries(graph, plain, rng)
+
+    # Changed, deleted and new criminals go to the overlay, then into the CSR arrays
+    changed = rng.sample(criminal_ids, 10) + rng.sample(range(200, 220), 5)
+    kept = [criminal_id for criminal_id in changed if rng.random() < 0.8]
+    update_rows = [(criminal_id, 0, 0, 0) for criminal_id in kept] + random_memberships(rng, kept)
+
+    graph.update_criminals(changed, update_rows)
+    plain.update(changed, update_rows)
+    check_queries(graph, plain, rng)
+
+    graph.compact()
+    check_queries(graph, plain, rng)
+
+def test_trail_stops_only_at_the_source():
+    # Criminal 3 has node index 2, and is reached through attribute 2 (gang 20 sorts after gang 10, residence 5)
+    graph = AssociationGraph(
+        [1, 2, 3, 4],
+        [1, 2, 2, 3, 3, 4],
+        [RELATION_GANG, RELATION_GANG, RELATION_RESIDENCE, RELATION_RESIDENCE, RELATION_GANG, RELATION_GANG],
+        [10, 10, 5, 5, 20, 20],
+        [0] * 6
+    )
+
+    assert [step[0] for step in graph.shortest_path(1, 3)] == [1, 2, 3]
+    assert [step[0] for step in graph.shortest_path(1, 4)] == [1, 2, 3, 4]
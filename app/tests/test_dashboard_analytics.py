@@ -0,0 +1,17 @@
+"""Dashboard cubes built from model rows.
+
+Run from the app directory: python -m pytest tests
+"""
+from mvc.views.dashboard.dashboard_analytics import trend_cube
+
+def test_trend_cube_keeps_gangs_sharing_a_name_apart():
+    cube = trend_cube([
+        {"period": "2020-01-01", "crime_type": "Грабіж", "gang_id": 1, "gang": "Вовки", "count": 1},
+        {"period": "2020-02-01", "crime_type": "Грабіж", "gang_id": 2, "gang": "Вовки", "count": 2},
+        {"period": "2020-02-01", "crime_type": "Крадіжка", "gang_id": None, "gang": None, "count": 3},
+        {"period": "2020-03-01", "crime_type": "Крадіжка", "gang_id": 1, "gang": "Вовки", "count": 4}
+    ])
+
+    assert cube["gang"] == [0, 1, 2, 0]
+    assert cube["labels"]["gang"] == ["Вовки", "Вовки", ""]
+    assert cube["count"] == [1, 2, 3, 4]
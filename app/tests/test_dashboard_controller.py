@@ -0,0 +1,85 @@
+"""DashboardController's handling of data that needs a migration, with stand-ins for the models.
+
+Run from the app directory: python -m pytest tests
+"""
+from sqlalchemy import exc
+
+from mvc.controllers.dashboardcontroller import DashboardController
+
+class DriverError(Exception):
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+class FakeCrimes:
+    def __init__(self, error=None):
+        self.error = error
+        self.queries = 0
+
+    def get_crime_trends(self, period, dimensions):
+        self.queries += 1
+        if self.error is not None:
+            raise self.error
+        return [{"period": "2020-01-01", "count": 1}]
+
+class FakeCities:
+    def __init__(self, error=None):
+        self.error = error
+
+    def get_city_counts(self):
+        if self.error is not None:
+            raise self.error
+        return [{"id": 1, "criminals": 1}]
+
+    def get_country_counts(self):
+        return [{"id": 1, "criminals": 1}]
+
+class FakeCriminals:
+    def get_profession_frequencies(self, include_archived=False):
+        return []
+
+    def get_language_frequencies(self, include_archived=False):
+        return []
+
+    def get_profession_crime_type_counts(self, include_archived=False):
+        return []
+
+class FakeVersions:
+    def get_versions(self):
+        return {"Crimes": 1}
+
+def make_controller(crimes, cities=None):
+    controller = DashboardController(FakeCriminals(), cities or FakeCities(), crimes, FakeVersions())
+    controller.refresh_data_versions()
+    return controller
+
+def test_missing_rollup_is_not_cached():
+    crimes = FakeCrimes(exc.ProgrammingError("SELECT", {}, DriverError("42P01")))
+    controller = make_controller(crimes)
+    assert controller._cached("crime_trends", controller._get_crime_trends) is None
+
+    # Once the migration is applied the trends are read without waiting for a data change
+    crimes.error = None
+    assert controller._cached("crime_trends", controller._get_crime_trends)
+    assert controller._cached("crime_trends", controller._get_crime_trends)
+    assert crimes.queries == 2
+
+def test_other_database_errors_are_reported():
+    errors = []
+    crimes = FakeCrimes(exc.OperationalError("SELECT", {}, DriverError("08006")))
+    controller = make_controller(crimes)
+    controller.operation_error.connect(errors.append)
+    assert controller.get_dashboard_frequencies() == {}
+    assert errors and "08006" in errors[0]
+
+def test_missing_city_counts_only_hide_the_map():
+    errors = []
+    cities = FakeCities(exc.ProgrammingError("SELECT", {}, DriverError("42P01")))
+    controller = make_controller(FakeCrimes(), cities)
+    controller.operation_error.connect(errors.append)
+    assert controller.get_dashboard_frequencies()["city_counts"] is None
+    assert not errors
+
+    cities.error = exc.OperationalError("SELECT", {}, DriverError("08006"))
+    assert controller.get_dashboard_frequencies() == {}
+    assert errors
@@ -0,0 +1,186 @@
+"""DataService caching, cache invalidation, account access and batch streaming, with in-memory
+stand-ins for the models.
+
+Run from the app directory: python -m pytest tests
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from mvc.models.data_service import DataService, DataServiceClient, DataServiceError
+
+class FakeUsers:
+    def __init__(self):
+        self.client_hosts = []
+
+    def authenticate(self, username, password, client_host=None):
+        self.client_hosts.append(client_host)
+        if password != "secret":
+            return False, "wrong password"
+        return True, {"user_id": 1, "username": username}
+
+    def create_user(self, username, password):
+        return True, "created"
+
+    def change_password(self, username, new_password):
+        return True, "changed"
+
+    def get_all_users(self, search_filter=None):
+        return [{"user_id": 1, "username": "admin"}]
+
+    def delete_user(self, user_id):
+        return True, "deleted"
+
+class FakeCities:
+    def __init__(self):
+        self.queries = 0
+
+    def get_city_by_id(self, city_id):
+        self.queries += 1
+        return {"id": city_id, "name": "x" * 1000}
+
+class FakeCriminals:
+    def __init__(self):
+        self.queries = 0
+
+        self.closed = False
+
+    def iter_criminals(self, batches=1):
+        self.queries += 1
+        try:
+            for batch in range(batches):
+                yield [{"id": batch * 2 + 1}, {"id": batch * 2 + 2}]
+        finally:
+            self.closed = True
+
+    def update_criminal(self, criminal_id, data):
+        return True
+
+class FakeVersions:
+    def get_versions(self):
+        return {"Cities": 1}
+
+def make_service(**options):
+    models = {
+        "users": FakeUsers(), "cities": FakeCities(), "criminals": FakeCriminals(),
+        "data_versions": FakeVersions()
+    }
+    return DataService(models, **options), models
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_reads_are_cached_until_a_write():
+    async def scenario():
+        service, models = make_service()
+        await service.call("cities", "get_city_by_id", [1], {})
+        await service.call("cities", "get_city_by_id", [1], {})
+        assert models["cities"].queries == 1
+
+        await service.call("criminals", "update_criminal", [1, {}], {})
+        await service.call("cities", "get_city_by_id", [1], {})
+        assert models["cities"].queries == 2
+    run(scenario())
+
+def test_logins_keep_the_cache():
+    async def scenario():
+        service, models = make_service()
+        await service.call("cities", "get_city_by_id", [1], {})
+        await service.call("users", "authenticate", ["admin", "wrong"], {}, {"username": None})
+        await service.call("cities", "get_city_by_id", [1], {})
+        assert models["cities"].queries == 1
+    run(scenario())
+
+def test_batches_are_streamed_not_cached():
+    async def scenario():
+        service, models = make_service()
+        batches = [batch async for batch in service.stream("criminals", "iter_criminals", [2], {})]
+        assert batches == [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}]]
+        assert [batch async for batch in service.stream("criminals", "iter_criminals", [], {})]
+        assert models["criminals"].queries == 2
+        assert not service._cache
+
+        with pytest.raises(DataServiceError):
+            await service.call("criminals", "iter_criminals", [], {})
+    run(scenario())
+
+def test_clients_read_batches_as_they_arrive():
+    async def scenario():
+        service, models = make_service()
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = os.path.join(directory, "data.sock")
+            server = await asyncio.start_unix_server(service._handle_client, path=socket_path)
+            async with server:
+                criminals = DataServiceClient(socket_path).models()["criminals"]
+
+                def read_all():
+                    return list(criminals.iter_criminals(3))
+                assert len(await asyncio.to_thread(read_all)) == 3
+
+                def read_first():
+                    batches = criminals.iter_criminals(10 ** 9)
+                    first = next(batches)
+                    batches.close()
+                    return first
+                models["criminals"].closed = False
+                assert await asyncio.to_thread(read_first) == [{"id": 1}, {"id": 2}]
+
+                # Closing the stream early stops the query in the service as well
+                for _ in range(100):
+                    if models["criminals"].closed:
+                        break
+                    await asyncio.sleep(0.05)
+                assert models["criminals"].closed
+    run(scenario())
+
+def test_cache_drops_least_recently_used_results():
+    async def scenario():
+        # Each city encodes to a little over 1000 bytes, so four fit
+        service, models = make_service(max_cache_bytes=4500)
+        for city_id in (1, 2, 3, 4):
+            await service.call("cities", "get_city_by_id", [city_id], {})
+        await service.call("cities", "get_city_by_id", [1], {})
+        await service.call("cities", "get_city_by_id", [5], {})
+        assert service._cache_bytes <= 4500
+        assert models["cities"].queries == 5
+
+        await service.call("cities", "get_city_by_id", [1], {})
+        assert models["cities"].queries == 5
+        await service.call("cities", "get_city_by_id", [2], {})
+        assert models["cities"].queries == 6
+    run(scenario())
+
+def test_account_methods_need_a_login():
+    async def scenario():
+        service, _ = make_service()
+        session = {"username": None}
+        with pytest.raises(DataServiceError):
+            await service.call("users", "get_all_users", [], {}, session)
+        with pytest.raises(DataServiceError):
+            await service.call("users", "delete_user", [1], {}, session)
+        with pytest.raises(DataServiceError):
+            await service.call("users", "create_user", ["new", "pw"], {}, session)
+
+        assert (await service.call("users", "authenticate", ["admin", "secret"], {}, session))[0]
+        assert session["username"] == "admin"
+        assert await service.call("users", "get_all_users", [], {}, session)
+        assert (await service.call("users", "change_password", ["admin", "pw"], {}, session))[0]
+        with pytest.raises(DataServiceError):
+            await service.call("users", "change_password", ["other", "pw"], {}, session)
+    run(scenario())
+
+def test_logins_are_limited_per_client_not_per_service():
+    async def scenario():
+        service, models = make_service()
+        await service.call("users", "authenticate", ["admin", "wrong"], {"client_host": "spoofed"}, {"username": None, "client_host": "uid:1000"})
+        await service.call("users", "authenticate", ["admin", "wrong"], {}, None)
+        assert models["users"].client_hosts == ["uid:1000", ""]
+    run(scenario())
+
+def test_registration_can_be_allowed():
+    async def scenario():
+        service, _ = make_service(allow_registration=True)
+        assert (await service.call("users", "create_user", ["new", "pw"], {}, {"username": None}))[0]
+    run(scenario())
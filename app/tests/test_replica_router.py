@@ -0,0 +1,113 @@
+"""ReplicaRouter health checks and the replica lag measure.
+
+The lag tests run the lag expression on the database in TEST_DATABASE_URI (any server will
+do; the replica's WAL positions are passed in) and are skipped without one.
+
+Run from the app directory: python -m pytest tests
+"""
+import os
+import threading
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from mvc.models.database import MAX_REPLICA_LAG, REPLICA_LAG_EXPRESSION, ReplicaRouter
+
+class FakeConnection:
+    def __init__(self, lag):
+        self.lag = lag
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement):
+        return self
+
+    def scalar(self):
+        return self.lag
+
+class FakeReplica:
+    """Replica engine answering the lag query with a fixed value, or failing to connect."""
+    def __init__(self, lag=0, down=False):
+        self.lag = lag
+        self.down = down
+        self.connects = 0
+        self.connected = threading.Event()
+
+    def execution_options(self, **options):
+        return self
+
+    def connect(self):
+        self.connects += 1
+        self.connected.set()
+        if self.down:
+            raise exc.OperationalError("connect", {}, Exception("timeout expired"))
+        return FakeConnection(self.lag)
+
+    def dispose(self):
+        pass
+
+def make_router(*replicas, interval=60):
+    router = ReplicaRouter(create_engine("sqlite://"), replicas, health_check_interval=interval)
+    assert router.health_checked.wait(5)
+    return router
+
+def test_connect_uses_the_result_of_the_background_check():
+    healthy, lagging, down = FakeReplica(0), FakeReplica(MAX_REPLICA_LAG + 1), FakeReplica(down=True)
+    router = make_router(healthy, lagging, down)
+    try:
+        checks = down.connects
+        for _ in range(3):
+            with router.connect() as conn:
+                assert conn.lag == 0
+
+        # Only the background check contacts replicas that are down or behind
+        assert down.connects == checks
+        assert lagging.connects == 1
+    finally:
+        router.dispose()
+
+def test_reads_go_to_the_primary_until_replicas_are_checked():
+    blocked = threading.Event()
+
+    class SlowReplica(FakeReplica):
+        def connect(self):
+            blocked.wait(5)
+            return super().connect()
+
+    router = ReplicaRouter(create_engine("sqlite://"), [SlowReplica()], health_check_interval=60)
+    try:
+        with router.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        blocked.set()
+        router.dispose()
+
+@pytest.fixture
+def database():
+    uri = os.getenv("TEST_DATABASE_URI")
+    if not uri:
+        pytest.skip("TEST_DATABASE_URI is not set")
+    engine = create_engine(uri)
+    yield engine
+    engine.dispose()
+
+def replica_lag(database, received_lsn, replayed_lsn, replayed_seconds_ago):
+    query = text("SELECT " + REPLICA_LAG_EXPRESSION.format(
+        received_lsn="CAST(:received AS pg_lsn)",
+        replayed_lsn="CAST(:replayed AS pg_lsn)",
+        replayed_at="now() - make_interval(secs => :seconds_ago)"
+    ))
+    with database.connect() as conn:
+        params = {"received": received_lsn, "replayed": replayed_lsn, "seconds_ago": replayed_seconds_ago}
+        return float(conn.execute(query, params).scalar())
+
+def test_caught_up_replica_of_an_idle_primary_has_no_lag(database):
+    # The last commit is an hour old, but there is no WAL left to replay
+    assert replica_lag(database, "0/3000060", "0/3000060", 3600) == 0
+
+def test_replica_replaying_behind_lags_by_the_age_of_its_last_commit(database):
+    assert replica_lag(database, "0/3000060", "0/3000000", 30) == pytest.approx(30, abs=1)
@@ -0,0 +1,43 @@
+import asyncio
+
+try:
+    import qasync
+except ImportError:
+    qasync = None
+
+def create_event_loop(app):
+    """Install an asyncio event loop driven by the Qt event loop. Returns None if qasync is not installed."""
+    if qasync is None:
+        return None
+    
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    return loop
+
+def is_async_available() -> bool:
+    """True when coroutines can be scheduled on a running Qt-integrated loop."""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+def run_async(coro, on_result=None, on_error=None) -> asyncio.Task:
+    """Schedule a coroutine on the Qt event loop and deliver its result to callbacks on the GUI thread."""
+    task = asyncio.ensure_future(coro)
+    
+    def _on_done(finished_task):
+        if finished_task.cancelled():
+            return
+        
+        error = finished_task.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                print(f"Async task failed: {error}")
+        elif on_result:
+            on_result(finished_task.result())
+    
+    task.add_done_callback(_on_done)
+    return task
\ No newline at end of file
@@ -1,14 +1,11 @@
+import csv
 import os
-import pandas as pd
 from datetime import datetime
 from PySide6.QtWidgets import QFileDialog, QMessageBox
 from PySide6.QtCore import QCoreApplication
 
-def export_data_to_file(data, parent_widget=None, default_filename=None):
-    if not data:
-        QMessageBox.warning(parent_widget, "Експорт", "Немає даних для експорту.")
-        return False
-    
+def _ask_export_path(parent_widget, default_filename):
+    """File chosen in the save dialog, with .csv added unless it is an Excel file; None if cancelled."""
     if default_filename is None:
         default_filename = f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
@@ -20,21 +17,64 @@ def export_data_to_file(data, parent_widget=None, default_filename=None):
         file_filter
     )
     
+    if not file_path:
+        return None
+    
+    if not file_path.lower().endswith(('.xlsx', '.csv')):
+        file_path += '.csv'
+    return file_path
+
+def _write_csv(file_path, columns, batches):
+    rows = 0
+    with open(file_path, 'w', newline='', encoding='utf-8-sig') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows(batch)
+            rows += len(batch)
+    return rows
+
+def _write_xlsx(file_path, columns, batches):
+    from openpyxl import Workbook
+    
+    # A write-only workbook streams rows to disk instead of keeping every cell in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(columns)
+    
+    rows = 0
+    for batch in batches:
+        for row in batch:
+            sheet.append(row)
+        rows += len(batch)
+    
+    workbook.save(file_path)
+    return rows
+
+def export_batches_to_file(columns, batches, parent_widget=None, default_filename=None):
+    """Write rows as they are read, one batch of value tuples at a time, so memory use does not grow with the export.
+    
+    batches is read only after a file is chosen (e.g. a model's iter_*_for_export generator).
+    """
+    file_path = _ask_export_path(parent_widget, default_filename)
     if not file_path:
         return False
     
     try:
-        df = pd.DataFrame(data)
-        
         if file_path.lower().endswith('.xlsx'):
-            df.to_excel(file_path, index=False, engine='openpyxl')
+            rows = _write_xlsx(file_path, columns, batches)
         else:
-            if not file_path.lower().endswith('.csv'):
-                file_path += '.csv'
-            df.to_csv(file_path, index=False, encoding='utf-8-sig')
-        
-        QMessageBox.information(parent_widget, "Експорт", f"Дані успішно експортовано у файл:\n{file_path}")
-        return True
+            rows = _write_csv(file_path, columns, batches)
     except Exception as e:
+        if os.path.exists(file_path):
+            os.remove(file_path)
         QMessageBox.critical(parent_widget, "Помилка експорту", f"Помилка при експорті даних: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+    
+    if not rows:
+        os.remove(file_path)
+        QMessageBox.warning(parent_widget, "Експорт", "Немає даних для експорту.")
+        return False
+    
+    QMessageBox.information(parent_widget, "Експорт", f"Дані успішно експортовано у файл:\n{file_path}")
+    return True
\ No newline at end of file
@@ -0,0 +1,130 @@
+TEXT = "text"
+DATE = "date"
+NUMBER = "number"
+
+def _is_range(filter_text: str) -> bool:
+    return '-' in filter_text and not filter_text.startswith('>') and not filter_text.startswith('<')
+
+def _split_range(filter_text: str) -> tuple[str, str] | None:
+    # "2000-01-01 - 2005-12-31" is split on the spaced dash, "170-180" on the single dash
+    if ' - ' in filter_text:
+        start, end = filter_text.split(' - ', 1)
+    else:
+        parts = filter_text.split('-')
+        if len(parts) != 2:
+            return None
+        start, end = parts
+    return start.strip(), end.strip()
+
+def _parse_number(text: str) -> float | None:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def _contains(needle: str):
+    def predicate(value) -> bool:
+        return value is not None and needle in str(value).lower()
+    return predicate
+
+def _compile_ordered(filter_text: str, to_text):
+    """Range and >/< filters compared as strings (text and ISO dates)."""
+    if _is_range(filter_text):
+        bounds = _split_range(filter_text)
+        if bounds is None:
+            return None
+
+        start, end = bounds
+        if start and end:
+            return lambda value: value is not None and start <= to_text(value) <= end
+        if start:
+            return lambda value: value is not None and to_text(value) >= start
+        if end:
+            return lambda value: value is not None and to_text(value) <= end
+        return lambda value: value is not None
+
+    if filter_text.startswith('>'):
+        bound = filter_text[1:].strip()
+        return lambda value: value is not None and to_text(value) > bound
+
+    if filter_text.startswith('<'):
+        bound = filter_text[1:].strip()
+        return lambda value: value is not None and to_text(value) < bound
+
+    return None
+
+def _compile_text(filter_text: str):
+    to_text = lambda value: str(value).lower()
+
+    if _is_range(filter_text):
+        return _compile_ordered(filter_text, to_text) or _contains(filter_text)
+    return _contains(filter_text)
+
+def _compile_date(filter_text: str):
+    predicate = _compile_ordered(filter_text, str) or _contains(filter_text)
+    return lambda value: bool(value) and predicate(value)
+
+def _compile_number(filter_text: str):
+    fallback = _contains(filter_text)
+
+    if _is_range(filter_text):
+        bounds = _split_range(filter_text)
+        low = high = None
+        if bounds is not None:
+            low = _parse_number(bounds[0]) if bounds[0] else 0.0
+            high = _parse_number(bounds[1]) if bounds[1] else float('inf')
+        if low is None or high is None:
+            predicate = fallback
+        else:
+            predicate = lambda value: low <= value <= high
+    elif filter_text.startswith('>'):
+        bound = _parse_number(filter_text[1:].strip())
+        predicate = fallback if bound is None else (lambda value: value > bound)
+    elif filter_text.startswith('<'):
+        bound = _parse_number(filter_text[1:].strip())
+        predicate = fallback if bound is None else (lambda value: value < bound)
+    elif filter_text.isdigit():
+        expected = float(filter_text)
+        predicate = lambda value: value == expected
+    else:
+        predicate = fallback
+
+    # Empty and zero values are shown as blank cells and never match a numeric filter
+    return lambda value: bool(value) and predicate(value)
+
+def _is_substring_filter(filter_text: str, kind: str) -> bool:
+    if kind == TEXT:
+        return not _is_range(filter_text)
+    if filter_text.startswith('>') or filter_text.startswith('<') or _is_range(filter_text):
+        return False
+    return kind != NUMBER or not filter_text.isdigit()
+
+def is_narrowing(old_text: str | None, new_text: str, kind: str = TEXT) -> bool:
+    """True if every value matching new_text also matches old_text.
+
+    Holds when a column gets its first filter, or when a partial-match filter is extended
+    by typing more characters. Ranges and comparisons can widen as they are typed.
+    """
+    if not old_text:
+        return True
+
+    old_text = old_text.strip().lower()
+    new_text = new_text.strip().lower()
+    return (new_text.startswith(old_text)
+            and _is_substring_filter(old_text, kind)
+            and _is_substring_filter(new_text, kind))
+
+_COMPILERS = {
+    TEXT: _compile_text,
+    DATE: _compile_date,
+    NUMBER: _compile_number
+}
+
+def compile_filter(filter_text: str, kind: str = TEXT):
+    """Parse a column filter once into a predicate over raw cell values.
+
+    Supported syntax (same as the filter tooltips): partial match, "a - b" / "a-b" ranges,
+    ">x" and "<x". Text columns compare lowercased strings, date columns compare ISO dates
+    (date objects or "YYYY-MM-DD" strings) and numeric columns compare numbers.
+    """
+    return _COMPILERS.get(kind, _compile_text)(filter_text.strip().lower())
@@ -0,0 +1,17 @@
+from datetime import date, datetime
+
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def date_text(value, empty: str = "") -> str:
+    """Display text for a date or datetime kept in a model record.
+
+    Strings are shown as they are; rows from the data service carry dates already formatted.
+    """
+    if not value:
+        return empty
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+    if isinstance(value, date):
+        return value.strftime(DATE_FORMAT)
+    return value
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""Load city coordinates for the dashboard crime map from a local gazetteer file.
+
+The file is UTF-8 CSV with a header naming at least the columns city, country, latitude
+and longitude (degrees, WGS 84). Rows are matched to "Cities" and "Countries" by name,
+case-insensitively; cities the file does not list keep their coordinates and are reported.
+data/gazetteer.csv lists the regional centres of Ukraine and the larger cities of Poland.
+
+Needs migrations/007_city_map_counts.sql; uses the DB_* settings from .env.
+Run from the app directory: python -m utils.gazetteer [FILE]
+"""
+import csv
+import sys
+from pathlib import Path
+
+GAZETTEER_COLUMNS = ("city", "country", "latitude", "longitude")
+DEFAULT_GAZETTEER = Path(__file__).resolve().parent.parent / "data" / "gazetteer.csv"
+
+def read_gazetteer(path) -> list:
+    """(city, country, latitude, longitude) of every row; ValueError names the first bad line."""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        missing = [column for column in GAZETTEER_COLUMNS if column not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"{path}: missing columns: {', '.join(missing)}")
+
+        entries = []
+        for line, row in enumerate(reader, start=2):
+            try:
+                latitude, longitude = float(row["latitude"]), float(row["longitude"])
+            except (TypeError, ValueError):
+                raise ValueError(f"{path}:{line}: invalid coordinates") from None
+
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValueError(f"{path}:{line}: coordinates out of range")
+            if not row["city"] or not row["country"]:
+                raise ValueError(f"{path}:{line}: city and country are required")
+
+            entries.append((row["city"], row["country"], latitude, longitude))
+
+        return entries
+
+def main() -> int:
+    from dotenv import load_dotenv
+    from mvc.models.cities import CityModel
+    from mvc.models.database import DatabaseConnector, database_uri
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_GAZETTEER
+    try:
+        entries = read_gazetteer(path)
+    except (OSError, ValueError) as e:
+        print(e)
+        return 1
+
+    load_dotenv()
+    db_connector = DatabaseConnector()
+    if not db_connector.connect_engine(database_uri()):
+        print("Could not connect to database. Please check your connection settings.")
+        return 1
+
+    try:
+        city_model = CityModel(db_connector.engine)
+        updated = city_model.set_coordinates(entries)
+        missing = city_model.get_cities_without_coordinates()
+    finally:
+        db_connector.close()
+
+    print(f"{updated} cities updated from {len(entries)} gazetteer entries")
+    if missing:
+        print(f"{len(missing)} cities without coordinates: {'; '.join(city['display_name'] for city in missing)}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
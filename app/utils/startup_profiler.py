@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+
+# STARTUP_PROFILE=1 prints the report once the first window is shown; "exit" also quits
+# the application right after, for benchmarks/startup_benchmark.py
+PROFILE_MODE = os.getenv("STARTUP_PROFILE", "")
+
+# Imports faster than this (cumulative) are left out of the report
+REPORT_THRESHOLD = 0.005
+
+class StartupProfiler:
+    """Time from the start of main.py to the first window, with a per-module import breakdown.
+
+    Imports are timed by wrapping each loader's exec_module, like `python -X importtime`:
+    "self" excludes the imports made by the module, "cumulative" includes them.
+    """
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.imports = []
+        self.marks = []
+        self._stack = []
+        
+    def install(self) -> None:
+        sys.meta_path.insert(0, _ImportTimer(self))
+    
+    def mark(self, label: str) -> None:
+        self.marks.append((label, time.perf_counter() - self.start))
+    
+    def time_exec(self, name: str, exec_module):
+        def timed_exec_module(module):
+            self._stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - started
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                self.imports.append((name, elapsed - children, elapsed, len(self._stack)))
+        
+        return timed_exec_module
+    
+    def report(self, stream=None) -> None:
+        stream = stream or sys.stderr
+        
+        print("startup profile:", file=stream)
+        for label, elapsed in self.marks:
+            print(f"{elapsed:9.3f} s  {label}", file=stream)
+        
+        print("import time: self [us] | cumulative | imported package", file=stream)
+        for name, self_time, cumulative, depth in self.imports:
+            if cumulative >= REPORT_THRESHOLD:
+                print(f"import time: {self_time * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {'  ' * depth}{name}",
+                      file=stream)
+        stream.flush()
+
+class _ImportTimer:
+    """Meta path entry that finds specs through the other finders and times their loaders."""
+    def __init__(self, profiler: StartupProfiler) -> None:
+        self.profiler = profiler
+    
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            
+            loader = spec.loader
+            # Built-in and frozen modules are loaded by shared importer classes; those are not timed
+            if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+                loader.exec_module = self.profiler.time_exec(fullname, loader.exec_module)
+            return spec
+        
+        return None
+
+_profiler = None
+
+def install() -> None:
+    """Start profiling if STARTUP_PROFILE is set; call before the application's imports."""
+    global _profiler
+    if PROFILE_MODE and _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+
+def mark(label: str) -> None:
+    if _profiler is not None:
+        _profiler.mark(label)
+
+def first_window_shown(app) -> None:
+    """Report once the event loop has painted the first window."""
+    if _profiler is None:
+        return
+    
+    from PySide6.QtCore import QTimer
+    
+    def _report():
+        mark("first window shown")
+        _profiler.report()
+        if PROFILE_MODE == "exit":
+            app.quit()
+    
+    QTimer.singleShot(0, _report)
\ No newline at end of file